@@ -1,6 +1,8 @@
-from fastapi import APIRouter, HTTPException, status
+from fastapi import APIRouter, Depends, HTTPException, status
 from fastapi.responses import JSONResponse
+from sqlalchemy.ext.asyncio import AsyncSession
 
+from app.db.db_session import get_async_db_session
 from app.models.dto import LoginRequest, SignUpRequest
 from app.services.auth_services import authenticate_user, register_user
 
@@ -8,9 +10,11 @@ router = APIRouter()
 
 
 @router.post("/login")
-async def login(request: LoginRequest) -> JSONResponse:
+async def login(
+    request: LoginRequest, db: AsyncSession = Depends(get_async_db_session)
+) -> JSONResponse:
     try:
-        access_token = authenticate_user(request.email, request.password)
+        access_token = await authenticate_user(db, request.email, request.password)
         return JSONResponse(
             status_code=status.HTTP_200_OK,
             content={
@@ -23,9 +27,13 @@ async def login(request: LoginRequest) -> JSONResponse:
 
 
 @router.post("/sign-up")
-async def sign_up(request: SignUpRequest) -> JSONResponse:
+async def sign_up(
+    request: SignUpRequest, db: AsyncSession = Depends(get_async_db_session)
+) -> JSONResponse:
     try:
-        new_user = register_user(request.name, request.email, request.password)
+        new_user = await register_user(
+            db, request.name, request.email, request.password
+        )
         return JSONResponse(
             status_code=status.HTTP_201_CREATED,
             content={
@@ -1,8 +1,25 @@
-from fastapi import APIRouter, Depends, File, HTTPException, UploadFile, status
-from fastapi.responses import JSONResponse, StreamingResponse
-from typing import Dict, List
+import base64
+
+from fastapi import (
+    APIRouter,
+    Depends,
+    File,
+    HTTPException,
+    Request,
+    UploadFile,
+    status,
+)
+from fastapi.responses import (
+    FileResponse,
+    JSONResponse,
+    Response,
+    StreamingResponse,
+)
+from sqlalchemy.ext.asyncio import AsyncSession
+from typing import Dict, List, Optional
 
 from app.auth.jwt_handler import get_access_token
+from app.db.db_session import get_async_db_session
 from app.models.dto import FileDownloadDTO, FileUploadDTO, file_upload_dto
 from app.models.response_models import (
     KyberKeyResponse,
@@ -18,6 +35,13 @@ from app.services.file_services import (
     retrieve_received_files,
     retrieve_shared_files,
 )
+from app.utils.wire_format import (
+    PACKED_FORMAT_NAME,
+    PACKED_MEDIA_TYPE,
+    accepts_packed,
+    encode_kyber_ciphertext,
+    encode_kyber_public_key,
+)
 
 
 router = APIRouter()
@@ -27,19 +51,35 @@ kyber_sk_details: Dict[str, str] = {}
 
 @router.get("/kyber-key", response_model=List[KyberKeyResponse])
 async def get_kyber_key(
+    request: Request,
     tokenPayload: str = Depends(get_access_token),
 ) -> JSONResponse:
     try:
         email = tokenPayload.get("email")
-        kyber_key_details = get_kyber_key_details()
+        kyber_key_details = await get_kyber_key_details()
         kyber_sk_details[email] = kyber_key_details["s"]
 
+        if accepts_packed(request):
+            return Response(
+                status_code=status.HTTP_200_OK,
+                content=encode_kyber_public_key(
+                    kyber_key_details["t"],
+                    base64.b64decode(kyber_key_details["seed"]),
+                ),
+                media_type=PACKED_MEDIA_TYPE,
+            )
+
         return JSONResponse(
             status_code=status.HTTP_200_OK,
-            content={"t": kyber_key_details["t"], "seed": kyber_key_details["seed"]},
+            content={
+                "t": kyber_key_details["t"].tolist(),
+                "seed": kyber_key_details["seed"],
+            },
         )
     except ValueError as error:
         raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(error))
+    except HTTPException as error:
+        raise error
     except Exception:
 
         raise HTTPException(
@@ -52,11 +92,13 @@ async def get_kyber_key(
 async def upload_files(
     encrypted_file_buffers: List[UploadFile] = File(..., alias="EncryptedFileBuffers"),
     file_upload_dto: FileUploadDTO = Depends(file_upload_dto),
+    db: AsyncSession = Depends(get_async_db_session),
     tokenPayload: str = Depends(get_access_token),
 ) -> JSONResponse:
     try:
         user_email = tokenPayload.get("email")
-        await process_upload_files(
+        rejected_files = await process_upload_files(
+            db,
             encrypted_file_buffers,
             file_upload_dto,
             kyber_sk_details[user_email],
@@ -64,10 +106,12 @@ async def upload_files(
         )
         return JSONResponse(
             status_code=status.HTTP_200_OK,
-            content={"message": "Successful"},
+            content={"message": "Successful", "rejectedFiles": rejected_files},
         )
     except ValueError as error:
         raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(error))
+    except HTTPException as error:
+        raise error
     except Exception:
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
@@ -80,25 +124,82 @@ import json
 
 @router.post("/download", response_class=StreamingResponse)
 async def download_file(
-    file_download_dto: FileDownloadDTO, tokenPayload: str = Depends(get_access_token)
+    request: Request,
+    file_download_dto: FileDownloadDTO,
+    db: AsyncSession = Depends(get_async_db_session),
+    tokenPayload: str = Depends(get_access_token),
 ) -> StreamingResponse:
     try:
         downloaded_file_data = await process_download_file(
-            file_download_dto, tokenPayload.get("email")
+            db,
+            file_download_dto,
+            tokenPayload.get("email"),
+            request.headers.get("range"),
+            request.headers.get("x-download-session"),
         )
-        kyber_public_key_data = json.dumps(downloaded_file_data["kyber_public_key"])
+        kyber_public_key = downloaded_file_data["kyber_public_key"]
+
+        if accepts_packed(request):
+            kyber_public_key_data = base64.b64encode(
+                encode_kyber_ciphertext(
+                    kyber_public_key["u"],
+                    kyber_public_key["v"],
+                    kyber_public_key["iv"],
+                    kyber_public_key["wrapped_key"],
+                )
+            ).decode("utf-8")
+        else:
+            kyber_public_key_data = {
+                "u": kyber_public_key["u"].tolist(),
+                "v": kyber_public_key["v"].tolist(),
+                "iv": kyber_public_key["iv"],
+            }
+            if kyber_public_key["wrapped_key"]:
+                kyber_public_key_data["wrappedKey"] = kyber_public_key["wrapped_key"]
+            kyber_public_key_data = json.dumps(kyber_public_key_data)
+
+        headers = {
+            "Content-Disposition": f'attachment; filename="{downloaded_file_data["file_name"]}"',
+            "X-Array-Data": kyber_public_key_data,
+            "X-Array-Format": (
+                PACKED_FORMAT_NAME if accepts_packed(request) else "json"
+            ),
+            "X-File-Codec": downloaded_file_data["codec"],
+            "X-File-Format": downloaded_file_data["storage_format"],
+            "Access-Control-Expose-Headers": "Content-Disposition, Content-Length, Content-Range, X-Array-Data, X-Array-Format, X-Download-Session, X-File-Codec, X-File-Format",
+        }
+        if file_download_dto.wrap_key:
+            headers["Accept-Ranges"] = "bytes"
+        if downloaded_file_data["download_session"]:
+            headers["X-Download-Session"] = downloaded_file_data["download_session"]
+        if downloaded_file_data["content_range"]:
+            start, end, size = downloaded_file_data["content_range"]
+            headers["Content-Range"] = f"bytes {start}-{end}/{size}"
+            headers["Content-Length"] = str(end - start + 1)
+            return StreamingResponse(
+                downloaded_file_data["file_data"],
+                status_code=status.HTTP_206_PARTIAL_CONTENT,
+                media_type="application/octet-stream",
+                headers=headers,
+            )
+        if downloaded_file_data["file_path"]:
+            return FileResponse(
+                downloaded_file_data["file_path"],
+                media_type="application/octet-stream",
+                headers=headers,
+            )
 
         return StreamingResponse(
-            iter([downloaded_file_data["file_data"]]),
+            downloaded_file_data["file_data"],
             media_type="application/octet-stream",
-            headers={
-                "Content-Disposition": f'attachment; filename="{downloaded_file_data["file_name"]}"',
-                "X-Array-Data": kyber_public_key_data,
-                "Access-Control-Expose-Headers": "Content-Disposition, X-Array-Data",
-            },
+            headers=headers,
         )
-    except (ValueError, HTTPException) as error:
-        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(error.detail))
+    except HTTPException as error:
+        if error.status_code == status.HTTP_404_NOT_FOUND:
+            raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(error.detail))
+        raise error
+    except ValueError as error:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(error))
     except Exception as error:
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
@@ -108,14 +209,20 @@ async def download_file(
 
 @router.get("/activity", response_model=List[ActivitiesResponse])
 async def get_activity(
+    cursor: Optional[str] = None,
+    limit: Optional[int] = None,
+    db: AsyncSession = Depends(get_async_db_session),
     tokenPayload: str = Depends(get_access_token),
 ) -> JSONResponse:
     try:
-        file_activities = get_files_actitvity(tokenPayload.get("email"))
+        file_activities, next_cursor = await get_files_actitvity(
+            db, tokenPayload.get("email"), cursor, limit
+        )
         return JSONResponse(
             status_code=status.HTTP_200_OK,
             content={
                 "activities": file_activities,
+                "nextCursor": next_cursor,
             },
         )
     except ValueError as error:
@@ -129,20 +236,24 @@ async def get_activity(
 
 @router.get("/received-files", response_model=List[ReceivedFilesResponse])
 async def get_received_files(
+    cursor: Optional[str] = None,
+    limit: Optional[int] = None,
+    db: AsyncSession = Depends(get_async_db_session),
     tokenPayload: str = Depends(get_access_token),
 ) -> JSONResponse:
     try:
-        received_files: list = retrieve_received_files(tokenPayload.get("email"))
+        received_files, next_cursor = await retrieve_received_files(
+            db, tokenPayload.get("email"), cursor, limit
+        )
         return JSONResponse(
             status_code=status.HTTP_200_OK,
             content={
                 "receivedFiles": received_files,
+                "nextCursor": next_cursor,
             },
         )
     except ValueError as error:
-        raise HTTPException(
-            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail=str(error)
-        )
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(error))
     except Exception as error:
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
@@ -152,20 +263,24 @@ async def get_received_files(
 
 @router.get("/shared-files", response_model=List[SharedFilesResponse])
 async def get_shared_files(
+    cursor: Optional[str] = None,
+    limit: Optional[int] = None,
+    db: AsyncSession = Depends(get_async_db_session),
     tokenPayload: str = Depends(get_access_token),
 ) -> JSONResponse:
     try:
-        shared_files: list = retrieve_shared_files(tokenPayload.get("email"))
+        shared_files, next_cursor = await retrieve_shared_files(
+            db, tokenPayload.get("email"), cursor, limit
+        )
         return JSONResponse(
             status_code=status.HTTP_200_OK,
             content={
                 "sharedFiles": shared_files,
+                "nextCursor": next_cursor,
             },
         )
     except ValueError as error:
-        raise HTTPException(
-            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail=str(error)
-        )
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(error))
     except Exception as error:
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
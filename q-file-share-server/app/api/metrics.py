@@ -0,0 +1,35 @@
+from fastapi import APIRouter, Depends, status
+from fastapi.responses import JSONResponse
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.auth.jwt_handler import get_access_token
+from app.db.config import async_engine, engine, get_pool_stats
+from app.db.db_session import get_async_db_session
+from app.quantum_protocols.matrix_cache import matrix_cache
+from app.services.crypto_executor import crypto_executor
+from app.services.file_services import get_storage_stats
+from app.services.file_sweeper import file_sweeper
+from app.services.kyber_key_pool import kyber_key_pool
+
+router = APIRouter()
+
+
+@router.get("")
+async def get_metrics(
+    db: AsyncSession = Depends(get_async_db_session),
+    tokenPayload: str = Depends(get_access_token),
+) -> JSONResponse:
+    return JSONResponse(
+        status_code=status.HTTP_200_OK,
+        content={
+            "cryptoExecutor": crypto_executor.stats(),
+            "kyberKeyPool": kyber_key_pool.stats(),
+            "matrixCache": (
+                None if crypto_executor.mode == "process" else matrix_cache.stats()
+            ),
+            "storage": await get_storage_stats(db),
+            "fileSweeper": file_sweeper.stats(),
+            "databasePool": get_pool_stats(async_engine),
+            "backgroundDatabasePool": get_pool_stats(engine),
+        },
+    )
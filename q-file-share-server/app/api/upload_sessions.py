@@ -0,0 +1,139 @@
+from fastapi import APIRouter, Depends, HTTPException, Request, status
+from fastapi.responses import JSONResponse
+from sqlalchemy.ext.asyncio import AsyncSession
+from typing import Optional
+
+from app.api.file import kyber_sk_details
+from app.auth.jwt_handler import get_access_token
+from app.db.db_session import get_async_db_session
+from app.models.dto import UploadSessionDTO
+from app.services.upload_session_services import (
+    create_upload_session,
+    delete_upload_session,
+    finalize_upload_session,
+    get_upload_session_status,
+    write_upload_chunk,
+)
+
+router = APIRouter()
+
+
+@router.post("")
+async def create_session(
+    upload_session_dto: UploadSessionDTO,
+    db: AsyncSession = Depends(get_async_db_session),
+    tokenPayload: str = Depends(get_access_token),
+) -> JSONResponse:
+    try:
+        user_email = tokenPayload.get("email")
+        if user_email not in kyber_sk_details:
+            raise ValueError("Kyber key not found, please request a new key")
+
+        upload_session = await create_upload_session(
+            db, upload_session_dto, kyber_sk_details[user_email], user_email
+        )
+        return JSONResponse(status_code=status.HTTP_201_CREATED, content=upload_session)
+    except ValueError as error:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(error))
+    except HTTPException as error:
+        raise error
+    except Exception:
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail="An unexpected error occurred.",
+        )
+
+
+@router.get("/{upload_id}")
+async def get_session(
+    upload_id: str,
+    db: AsyncSession = Depends(get_async_db_session),
+    tokenPayload: str = Depends(get_access_token),
+) -> JSONResponse:
+    try:
+        upload_session = await get_upload_session_status(
+            db, upload_id, tokenPayload.get("email")
+        )
+        return JSONResponse(status_code=status.HTTP_200_OK, content=upload_session)
+    except HTTPException as error:
+        raise error
+    except Exception:
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail="An unexpected error occurred.",
+        )
+
+
+@router.put("/{upload_id}/chunks/{chunk_number}")
+async def put_chunk(
+    request: Request,
+    upload_id: str,
+    chunk_number: int,
+    offset: Optional[int] = None,
+    db: AsyncSession = Depends(get_async_db_session),
+    tokenPayload: str = Depends(get_access_token),
+) -> JSONResponse:
+    try:
+        upload_session = await write_upload_chunk(
+            db,
+            upload_id,
+            chunk_number,
+            offset,
+            request.stream(),
+            tokenPayload.get("email"),
+        )
+        return JSONResponse(status_code=status.HTTP_200_OK, content=upload_session)
+    except ValueError as error:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(error))
+    except HTTPException as error:
+        raise error
+    except Exception:
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail="An unexpected error occurred.",
+        )
+
+
+@router.post("/{upload_id}/finalize")
+async def finalize_session(
+    upload_id: str,
+    db: AsyncSession = Depends(get_async_db_session),
+    tokenPayload: str = Depends(get_access_token),
+) -> JSONResponse:
+    try:
+        rejected_files = await finalize_upload_session(
+            db, upload_id, tokenPayload.get("email")
+        )
+        return JSONResponse(
+            status_code=status.HTTP_200_OK,
+            content={"message": "Successful", "rejectedFiles": rejected_files},
+        )
+    except ValueError as error:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(error))
+    except HTTPException as error:
+        raise error
+    except Exception:
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail="An unexpected error occurred.",
+        )
+
+
+@router.delete("/{upload_id}")
+async def delete_session(
+    upload_id: str,
+    db: AsyncSession = Depends(get_async_db_session),
+    tokenPayload: str = Depends(get_access_token),
+) -> JSONResponse:
+    try:
+        await delete_upload_session(db, upload_id, tokenPayload.get("email"))
+        return JSONResponse(
+            status_code=status.HTTP_200_OK, content={"message": "Successful"}
+        )
+    except HTTPException as error:
+        raise error
+    except Exception:
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail="An unexpected error occurred.",
+        )
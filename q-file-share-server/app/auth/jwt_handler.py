@@ -5,12 +5,17 @@ from fastapi import HTTPException, Request, status
 
 from datetime import datetime, timezone, timedelta
 from dotenv import load_dotenv
+from typing import Optional
 
 load_dotenv()
 
 SECRET_KEY = os.getenv("SECRET_KEY")
 ALGORITHM = os.getenv("ALGORITHM")
 ACCESS_TOKEN_EXPIRE_MINUTES = int(os.getenv("ACCESS_TOKEN_EXPIRE_MINUTES", 30))
+DOWNLOAD_SESSION_TTL = int(os.getenv("DOWNLOAD_SESSION_TTL", 60 * 60))
+
+# Signed with a derived key so a download session can never pass as an access token.
+DOWNLOAD_SESSION_KEY = f"{SECRET_KEY}:download-session"
 
 
 def create_access_token(data: dict) -> str:
@@ -49,3 +54,27 @@ def get_access_token(request: Request) -> dict:
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="Cannot validate token",
         )
+
+
+def create_download_session_token(file_id: str, email: str) -> str:
+    expiration_time = datetime.now(timezone.utc) + timedelta(
+        seconds=DOWNLOAD_SESSION_TTL
+    )
+
+    return jwt.encode(
+        {"fileId": file_id, "email": email, "exp": int(expiration_time.timestamp())},
+        DOWNLOAD_SESSION_KEY,
+        algorithm=ALGORITHM,
+    )
+
+
+def is_download_session_valid(token: Optional[str], file_id: str, email: str) -> bool:
+    if not token:
+        return False
+
+    try:
+        payload = jwt.decode(token, DOWNLOAD_SESSION_KEY, algorithms=[ALGORITHM])
+    except jwt.InvalidTokenError:
+        return False
+
+    return payload.get("fileId") == file_id and payload.get("email") == email
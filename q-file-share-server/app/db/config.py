@@ -1,16 +1,77 @@
 import os
 
 from dotenv import load_dotenv
-from sqlalchemy import create_engine
+from sqlalchemy import URL, create_engine, make_url
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
 from sqlalchemy.orm import sessionmaker, declarative_base
 
+from app.db.pool import (
+    InstrumentedAsyncQueuePool,
+    InstrumentedPool,
+    InstrumentedQueuePool,
+)
+
 load_dotenv()
 
-DATABASE_URL = (
+DATABASE_URL = os.getenv("DATABASE_URL") or (
     f"postgresql+psycopg2://{os.getenv('DATABASE_USER')}:{os.getenv('DATABASE_PASSWORD')}"
     f"@{os.getenv('DATABASE_HOST')}:{os.getenv('DATABASE_PORT')}/{os.getenv('DATABASE_NAME')}"
 )
 
-engine = create_engine(DATABASE_URL)
+ASYNC_DRIVERS = {"postgresql": "asyncpg", "sqlite": "aiosqlite"}
+
+DATABASE_POOL_SIZE = int(os.getenv("DATABASE_POOL_SIZE", 5))
+DATABASE_MAX_OVERFLOW = int(os.getenv("DATABASE_MAX_OVERFLOW", 10))
+DATABASE_POOL_TIMEOUT = float(os.getenv("DATABASE_POOL_TIMEOUT", 30))
+DATABASE_POOL_RECYCLE = int(os.getenv("DATABASE_POOL_RECYCLE", 1800))
+DATABASE_POOL_PRE_PING = os.getenv("DATABASE_POOL_PRE_PING", "true").lower() == "true"
+
+
+def get_async_database_url(database_url: str) -> URL:
+    url = make_url(database_url)
+    backend_name = url.get_backend_name()
+    if backend_name not in ASYNC_DRIVERS:
+        return url
+
+    return url.set(drivername=f"{backend_name}+{ASYNC_DRIVERS[backend_name]}")
+
+
+ASYNC_DATABASE_URL = os.getenv("ASYNC_DATABASE_URL") or get_async_database_url(
+    DATABASE_URL
+)
+
+
+def get_engine_options(database_url, poolclass=InstrumentedQueuePool) -> dict:
+    url = make_url(database_url)
+    if url.get_backend_name() == "sqlite" and url.database in (None, "", ":memory:"):
+        return {}
+
+    return {
+        "poolclass": poolclass,
+        "pool_size": DATABASE_POOL_SIZE,
+        "max_overflow": DATABASE_MAX_OVERFLOW,
+        "pool_timeout": DATABASE_POOL_TIMEOUT,
+        "pool_recycle": DATABASE_POOL_RECYCLE,
+        "pool_pre_ping": DATABASE_POOL_PRE_PING,
+    }
+
+
+def get_pool_stats(engine) -> dict:
+    if isinstance(engine.pool, InstrumentedPool):
+        return engine.pool.stats()
+
+    return {"status": engine.pool.status()}
+
+
+engine = create_engine(DATABASE_URL, **get_engine_options(DATABASE_URL))
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+
+async_engine = create_async_engine(
+    ASYNC_DATABASE_URL,
+    **get_engine_options(ASYNC_DATABASE_URL, InstrumentedAsyncQueuePool),
+)
+AsyncSessionLocal = async_sessionmaker(
+    async_engine, autoflush=False, expire_on_commit=False
+)
+
 Base = declarative_base()
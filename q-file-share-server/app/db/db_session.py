@@ -1,4 +1,6 @@
-from .config import SessionLocal
+from contextlib import contextmanager
+
+from .config import AsyncSessionLocal, SessionLocal
 
 def get_db_session():
     db = SessionLocal()
@@ -6,3 +8,11 @@ def get_db_session():
         yield db
     finally:
         db.close()
+
+
+db_session_scope = contextmanager(get_db_session)
+
+
+async def get_async_db_session():
+    async with AsyncSessionLocal() as db:
+        yield db
@@ -0,0 +1,56 @@
+import time
+import threading
+
+from sqlalchemy import exc
+from sqlalchemy.pool import AsyncAdaptedQueuePool, QueuePool
+
+
+class InstrumentedPool:
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self._stats_lock = threading.Lock()
+        self.checkouts = 0
+        self.timeouts = 0
+        self.total_wait_seconds = 0.0
+        self.max_wait_seconds = 0.0
+
+    def connect(self):
+        started_at = time.perf_counter()
+        try:
+            return super().connect()
+        except exc.TimeoutError:
+            with self._stats_lock:
+                self.timeouts += 1
+            raise
+        finally:
+            wait_seconds = time.perf_counter() - started_at
+            with self._stats_lock:
+                self.checkouts += 1
+                self.total_wait_seconds += wait_seconds
+                self.max_wait_seconds = max(self.max_wait_seconds, wait_seconds)
+
+    def stats(self) -> dict:
+        with self._stats_lock:
+            return {
+                "size": self.size(),
+                "checkedOut": self.checkedout(),
+                "checkedIn": self.checkedin(),
+                "overflow": max(self.overflow(), 0),
+                "maxOverflow": self._max_overflow,
+                "checkouts": self.checkouts,
+                "timeouts": self.timeouts,
+                "averageWaitMs": (
+                    self.total_wait_seconds / self.checkouts * 1000
+                    if self.checkouts
+                    else 0.0
+                ),
+                "maxWaitMs": self.max_wait_seconds * 1000,
+            }
+
+
+class InstrumentedQueuePool(InstrumentedPool, QueuePool):
+    pass
+
+
+class InstrumentedAsyncQueuePool(InstrumentedPool, AsyncAdaptedQueuePool):
+    pass
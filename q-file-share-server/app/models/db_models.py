@@ -1,8 +1,32 @@
 import uuid
 
+from datetime import timezone
+
 from app.db.config import Base
 
-from sqlalchemy import Column, Integer, String, LargeBinary, Boolean, TIMESTAMP, func
+from sqlalchemy import (
+    Column,
+    Integer,
+    BigInteger,
+    String,
+    LargeBinary,
+    Boolean,
+    TIMESTAMP,
+    Index,
+    UniqueConstraint,
+    func,
+)
+from sqlalchemy.types import TypeDecorator
+
+
+class UTCTimestamp(TypeDecorator):
+    impl = TIMESTAMP
+    cache_ok = True
+
+    def process_bind_param(self, value, dialect):
+        if value is not None and value.tzinfo is not None:
+            value = value.astimezone(timezone.utc).replace(tzinfo=None)
+        return value
 
 
 class Users(Base):
@@ -12,8 +36,8 @@ class Users(Base):
     name = Column(String, index=True)
     email = Column(String, unique=True, index=True)
     password_hash = Column(String)
-    created_at = Column(TIMESTAMP)
-    updated_at = Column(TIMESTAMP)
+    created_at = Column(UTCTimestamp)
+    updated_at = Column(UTCTimestamp)
 
 
 class Files(Base):
@@ -21,24 +45,97 @@ class Files(Base):
 
     id = Column(Integer, primary_key=True, index=True)
     file_id = Column(String, unique=True, nullable=False)
-    file_data = Column(LargeBinary, nullable=False)
+    file_data = Column(LargeBinary, nullable=True)
     iv = Column(String, nullable=False)
+    storage_pointer = Column(String, nullable=True)
+    size = Column(BigInteger, nullable=True)
+    ref_count = Column(Integer, nullable=False, default=0)
+    codec = Column(String, nullable=True)
+    original_size = Column(BigInteger, nullable=True)
+    storage_format = Column(String, nullable=True)
+
+
+class FileKeys(Base):
+    __tablename__ = "FileKeys"
+    __table_args__ = (UniqueConstraint("file_id", "relationship_hash"),)
+
+    id = Column(Integer, primary_key=True, index=True)
+    file_id = Column(String, nullable=False)
+    relationship_hash = Column(String, nullable=False)
+    wrapped_key = Column(String, nullable=False)
+    created_at = Column(UTCTimestamp, server_default=func.now())
+
+
+class DeletedBlobs(Base):
+    __tablename__ = "DeletedBlobs"
+
+    id = Column(Integer, primary_key=True, index=True)
+    file_id = Column(String, nullable=False, index=True)
+    storage_pointer = Column(String, nullable=False)
+    size = Column(BigInteger, nullable=True)
+    deleted_at = Column(UTCTimestamp, server_default=func.now())
 
 
 class FileLogs(Base):
     __tablename__ = "FileLogs"
+    __table_args__ = (
+        Index("ix_FileLogs_from_email_sent_on_id", "from_email", "sent_on", "id"),
+        Index("ix_FileLogs_to_email_sent_on_id", "to_email", "sent_on", "id"),
+        Index(
+            "ix_FileLogs_from_email_status_sent_on_id",
+            "from_email",
+            "status",
+            "sent_on",
+            "id",
+        ),
+        Index(
+            "ix_FileLogs_to_email_status_sent_on_id",
+            "to_email",
+            "status",
+            "sent_on",
+            "id",
+        ),
+    )
 
     id = Column(Integer, primary_key=True, index=True)
     name = Column(String, index=True, nullable=False)
     size = Column(Integer, nullable=False)
     from_email = Column(String)
     to_email = Column(String)
-    sent_on = Column(TIMESTAMP)
-    expiry = Column(TIMESTAMP)
+    sent_on = Column(UTCTimestamp)
+    expiry = Column(UTCTimestamp)
     download_count = Column(Integer, default=10)
     updated_download_count = Column(Integer, default=10)
     file_id = Column(String)
     public_id = Column(String, unique=True, nullable=False, default=lambda: str(uuid.uuid4()))
     is_anonymous = Column(Boolean, default=False)
     status = Column(String, default="active")
-    updated_at = Column(TIMESTAMP, onupdate=func.now())
+    updated_at = Column(UTCTimestamp, onupdate=func.now())
+
+
+class UploadSessions(Base):
+    __tablename__ = "UploadSessions"
+
+    id = Column(Integer, primary_key=True, index=True)
+    public_id = Column(
+        String, unique=True, nullable=False, default=lambda: str(uuid.uuid4())
+    )
+    user_email = Column(String, nullable=False)
+    upload_details = Column(String, nullable=False)
+    wrapped_shared_key = Column(String, nullable=False)
+    total_size = Column(BigInteger, nullable=False)
+    chunk_size = Column(Integer, nullable=False)
+    status = Column(String, default="open")
+    created_at = Column(UTCTimestamp)
+    updated_at = Column(UTCTimestamp)
+
+
+class UploadChunks(Base):
+    __tablename__ = "UploadChunks"
+    __table_args__ = (UniqueConstraint("session_id", "chunk_number"),)
+
+    id = Column(Integer, primary_key=True, index=True)
+    session_id = Column(Integer, nullable=False)
+    chunk_number = Column(Integer, nullable=False)
+    offset = Column(BigInteger, nullable=False)
+    size = Column(Integer, nullable=False)
@@ -29,9 +29,25 @@ class FileUploadDTO(BaseModel):
     anonymous: bool
     
     
+class UploadSessionDTO(BaseModel):
+    init_vector: str
+    file_name: str
+    file_size: int
+    file_type: str
+    file_signature: str
+    dl_public_key: str
+    kyber_key: str
+    recipient_email: str
+    expiration: int
+    download_count: int
+    anonymous: bool
+    total_size: int
+
+
 class FileDownloadDTO(BaseModel):
     file_id: str
     kyber_key_pair: str
+    wrap_key: bool = False
 
 
 def file_upload_dto(
@@ -1,6 +1,6 @@
 import numpy as np
 
-from typing import List, Tuple
+from typing import List, Optional, Sequence, Tuple
 
 from .parameters import N, Q, GAMMA1, GAMMA2, BETA
 
@@ -10,50 +10,84 @@ from .generators import (
 )
 
 from .helpers import (
+    PolyMatrix,
+    PolyVec,
     encode_polynomial_coefficients,
     high_bits,
-    multiply_matrix_poly_vector,
-    multiply_polynomial_with_poly_vector,
     subtract_polynomial_vectors,
+    to_poly,
+    to_poly_matrix,
+    to_poly_vector,
 )
 
+from .ntt import inverse_ntt, multiply_ntt, multiply_ntt_matrix_vector, ntt
+
 
 class Dilithium:
+    def prepare_public_key(
+        self, public_key: Tuple[List[List[List[int]]], List[List[int]]]
+    ) -> Tuple[PolyMatrix, PolyVec]:
+        A = to_poly_matrix(public_key[0])
+        t = to_poly_vector(public_key[1])
+        if A.shape[0] != t.shape[0]:
+            raise ValueError("Invalid Dilithium public key shape.")
+
+        return ntt(A, Q), ntt(t, Q)
+
     def verify_dilthium_signature(
         self,
         message: bytes,
         signature: Tuple[List[List[int]], str],
         public_key: Tuple[List[List[List[int]]], List[List[int]]],
     ):
+        return self.verify_dilithium_signatures([(message, signature)], public_key)[0]
+
+    def verify_dilithium_signatures(
+        self,
+        signed_messages: Sequence[Tuple[bytes, Tuple[List[List[int]], str]]],
+        public_key,
+        prepared_public_key: Optional[Tuple[PolyMatrix, PolyVec]] = None,
+    ) -> List[bool]:
+        results = [False] * len(signed_messages)
         try:
-            A = public_key[0]
-            t = public_key[1]
-            z = signature[0]
-            cp = signature[1]
+            A_hat, t_hat = prepared_public_key or self.prepare_public_key(public_key)
+        except Exception as error:
+            print(f"Error during signature verification: {error}")
+            return results
 
-            c: List[int] = get_polynomial_challenge(cp)
+        indices, z_vectors, challenges = [], [], []
+        for index, (_, signature) in enumerate(signed_messages):
+            try:
+                z = to_poly_vector(signature[0])
+                if z.shape[0] != A_hat.shape[1]:
+                    raise ValueError("Invalid signature shape.")
+                challenges.append(to_poly(get_polynomial_challenge(signature[1])))
+                z_vectors.append(z)
+                indices.append(index)
+            except Exception as error:
+                print(f"Error during signature verification: {error}")
 
-            w1 = subtract_polynomial_vectors(
-                multiply_matrix_poly_vector(A, z, Q),
-                multiply_polynomial_with_poly_vector(c, t, Q),
-            )
-            w1 = [
-                [high_bits(coefficient, 2 * GAMMA2) for coefficient in polynomial]
-                for polynomial in w1
-            ]
+        if not indices:
+            return results
 
-            cp_v: bytes = generate_poly_buffer(
-                message,
-                np.array(
-                    [encode_polynomial_coefficients(polynomial, N) for polynomial in w1]
+        z_batch = np.stack(z_vectors)
+        w1_batch = high_bits(
+            subtract_polynomial_vectors(
+                inverse_ntt(multiply_ntt_matrix_vector(A_hat, ntt(z_batch, Q), Q), Q),
+                inverse_ntt(
+                    multiply_ntt(ntt(np.stack(challenges), Q)[:, None, :], t_hat, Q), Q
                 ),
-            )
+            ),
+            2 * GAMMA2,
+        )
+        is_z_bounded = np.any(z_batch.max(axis=2) < GAMMA1 - BETA, axis=1)
 
-            return (
-                any(max(polynomial) < GAMMA1 - BETA for polynomial in z)
-                and len(cp_v) == len(cp)
-                and all(value == cp[i] for i, value in enumerate(cp_v))
+        for batch_index, index in enumerate(indices):
+            message, signature = signed_messages[index]
+            cp = bytes(signature[1])
+            cp_v: bytes = generate_poly_buffer(
+                message, encode_polynomial_coefficients(w1_batch[batch_index], N)
             )
-        except Exception as error:
-            print(f"Error during signature verification: {error}")
-            return False
+            results[index] = bool(is_z_bounded[batch_index]) and cp_v == cp
+
+        return results
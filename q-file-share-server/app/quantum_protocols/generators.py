@@ -1,8 +1,9 @@
 import math
 import hashlib
 import secrets
+import numpy as np
 
-from typing import List
+from typing import Callable, List, Optional
 
 from .parameters import N, Q_K, TAU
 
@@ -20,8 +21,8 @@ GEN_NBLOCKS = math.ceil(
 )
 
 
-def expand_a(seed: bytes, k: int, l: int, q: int) -> List[List[List[int]]]:
-    A = [[[] for _ in range(l)] for _ in range(k)]
+def expand_a(seed: bytes, k: int, l: int, q: int) -> np.ndarray:
+    A = np.zeros((k, l, N), dtype=np.int64)
 
     for i in range(k):
         base = i << 8
@@ -34,8 +35,8 @@ def expand_a(seed: bytes, k: int, l: int, q: int) -> List[List[List[int]]]:
     return A
 
 
-def expand_a_kyber(seed: bytes, k: int, l: int, q: int) -> list:
-    A = [[[] for _ in range(l)] for _ in range(k)]
+def expand_a_kyber(seed: bytes, k: int, l: int, q: int) -> np.ndarray:
+    A = np.zeros((k, l, N), dtype=np.int64)
 
     for i in range(k):
         for j in range(l):
@@ -44,8 +45,10 @@ def expand_a_kyber(seed: bytes, k: int, l: int, q: int) -> list:
     return A
 
 
-def get_random_vectors(l: int, n: int) -> List[List[int]]:
-    return [[random_int(-n, n + 1) for _ in range(N)] for _ in range(l)]
+def get_random_vectors(l: int, n: int) -> np.ndarray:
+    return np.array(
+        [[random_int(-n, n + 1) for _ in range(N)] for _ in range(l)], dtype=np.int64
+    )
 
 
 def generate_poly_buffer(message: bytes, coefficient_bytes: bytes) -> bytes:
@@ -82,86 +85,102 @@ def get_random_seed() -> bytes:
     return secrets.token_bytes(SEED_LENGTH)
 
 
-def generate_sample_noise_polynomial(eta: int) -> List[int]:
-    return [secure_sample_centered_binomial(eta) for _ in range(N)]
+def generate_sample_noise_polynomial(
+    eta: int, seed: Optional[bytes] = None, nonce: int = 0
+) -> np.ndarray:
+    return generate_sample_noise_poly_vector(1, eta, seed, nonce)[0]
 
 
-def generate_sample_noise_poly_vector(size: int, eta: int) -> List[List[int]]:
-    return [generate_sample_noise_polynomial(eta) for _ in range(size)]
+def generate_sample_noise_poly_vector(
+    size: int, eta: int, seed: Optional[bytes] = None, nonce: int = 0
+) -> np.ndarray:
+    if seed is None:
+        random_bytes = secrets.token_bytes(size * N * 2 * eta // 8)
+    else:
+        random_bytes = b"".join(
+            get_noise_prf_stream(seed, nonce + index, N * 2 * eta // 8)
+            for index in range(size)
+        )
 
+    return sample_centered_binomial(random_bytes, eta, size * N).reshape(size, N)
 
-def get_uniform_polynomial(seed: bytes, nonce: bytes, q: int) -> List[int]:
-    buffer_length = UNIFORM_NBLOCKS * STREAM128_BLOCKBYTES
-    shake = hashlib.shake_128()
+
+def get_noise_prf_stream(seed: bytes, nonce: int, length: int) -> bytes:
+    shake = hashlib.shake_256()
     shake.update(seed)
-    shake.update(nonce)
+    shake.update(bytes([nonce & 0xFF]))
+    return shake.digest(length)
 
-    buffer = shake.digest(buffer_length)
-    return reject_uniform_sampling([0] * N, buffer, buffer_length, q)
 
+def sample_centered_binomial(random_bytes: bytes, eta: int, count: int) -> np.ndarray:
+    bits = np.unpackbits(
+        np.frombuffer(random_bytes, dtype=np.uint8), bitorder="little"
+    )[: count * 2 * eta]
+    bit_counts = bits.reshape(count, 2, eta).sum(axis=2, dtype=np.int64)
+
+    return bit_counts[:, 0] - bit_counts[:, 1]
 
-def get_uniform_polynomial_kyber(seed: bytes, nonce: bytes, q: int) -> List[int]:
-    buffer_length = GEN_NBLOCKS * STREAM128_BLOCKBYTES
-    shake = hashlib.shake_128()
-    shake.update(seed)
-    shake.update(nonce)
 
-    buffer = shake.digest(buffer_length)
-    return reject_uniform_sampling_k([0] * N, buffer, buffer_length, q)
+def get_uniform_polynomial(seed: bytes, nonce: bytes, q: int) -> np.ndarray:
+    return squeeze_uniform_polynomial(
+        seed, nonce, q, UNIFORM_NBLOCKS, reject_uniform_sampling
+    )
 
 
-def reject_uniform_sampling(
-    polynomial: List[List[int]], buffer: bytes, buffer_length: int, q: int
-) -> List[int]:
-    ctr = 0
-    pos = 0
+def get_uniform_polynomial_kyber(seed: bytes, nonce: bytes, q: int) -> np.ndarray:
+    return squeeze_uniform_polynomial(
+        seed, nonce, q, GEN_NBLOCKS, reject_uniform_sampling_k
+    )
 
-    while ctr < N and pos + 3 <= buffer_length:
-        b = buffer[pos] | (buffer[pos + 1] << 8) | (buffer[pos + 2] << 16)
-        b &= 0x7FFFFF
-        pos += 3
 
-        if b < q:
-            polynomial[ctr] = b
-            ctr += 1
+def squeeze_uniform_polynomial(
+    seed: bytes, nonce: bytes, q: int, nblocks: int, sampler: Callable
+) -> np.ndarray:
+    buffer_length = nblocks * STREAM128_BLOCKBYTES
+    shake = hashlib.shake_128()
+    shake.update(seed)
+    shake.update(nonce)
+
+    coefficients = sampler(shake.digest(buffer_length), q)
+    while len(coefficients) < N:
+        buffer_length += STREAM128_BLOCKBYTES
+        coefficients = sampler(shake.digest(buffer_length), q)
 
-    return polynomial
+    return coefficients
 
 
-def reject_uniform_sampling_k(
-    polynomial: List[List[int]], buffer: bytes, buffer_length: int, q: int
-) -> List[int]:
-    ctr = 0
-    pos = 0
+def get_buffer_triplets(buffer: bytes) -> np.ndarray:
+    triplet_count = len(buffer) // 3
+    return (
+        np.frombuffer(buffer, dtype=np.uint8, count=triplet_count * 3)
+        .reshape(triplet_count, 3)
+        .astype(np.int64)
+    )
 
-    val0 = 0
-    val1 = 0
 
-    while ctr < N and pos + 3 <= buffer_length:
-        val0 = ((buffer[pos + 0] >> 0) | (buffer[pos + 1] << 8)) & 0xFFF
-        val1 = ((buffer[pos + 1] >> 4) | (buffer[pos + 2] << 4)) & 0xFFF
-        pos += 3
+def reject_uniform_sampling(buffer: bytes, q: int) -> np.ndarray:
+    triplets = get_buffer_triplets(buffer)
+    candidates = (
+        triplets[:, 0] | (triplets[:, 1] << 8) | (triplets[:, 2] << 16)
+    ) & 0x7FFFFF
 
-        if val0 < q:
-            polynomial[ctr] = val0
-            ctr += 1
+    return candidates[candidates < q][:N]
 
-        if ctr < N and val1 < q:
-            polynomial[ctr] = val1
-            ctr += 1
 
-    return polynomial
+def reject_uniform_sampling_k(buffer: bytes, q: int) -> np.ndarray:
+    triplets = get_buffer_triplets(buffer)
+    candidates = np.stack(
+        (
+            (triplets[:, 0] | (triplets[:, 1] << 8)) & 0xFFF,
+            ((triplets[:, 1] >> 4) | (triplets[:, 2] << 4)) & 0xFFF,
+        ),
+        axis=1,
+    ).reshape(-1)
+
+    return candidates[candidates < q][:N]
 
 
 def random_int(min_val: int, max_val: int) -> int:
     range_val = max_val - min_val
     random_value = secrets.randbelow(range_val)
     return min_val + random_value
-
-
-def secure_sample_centered_binomial(eta: int) -> int:
-    a = [secrets.randbelow(2) for _ in range(eta)]
-    b = [secrets.randbelow(2) for _ in range(eta)]
-
-    result = sum(a_i - b_i for a_i, b_i in zip(a, b))
-    return result
@@ -1,6 +1,5 @@
 import math
-
-from typing import List
+import numpy as np
 
 from .parameters import Q_K, K_K, ETA_K
 
@@ -11,14 +10,22 @@ from .generators import (
     generate_sample_noise_poly_vector,
 )
 
+from .matrix_cache import expand_a_kyber_cached
+
 from .helpers import (
+    POLY_DTYPE,
+    Poly,
+    PolyVec,
     add_polynomials,
     add_polynomial_vectors,
     multiply_matrix_poly_vector,
+    multiply_ntt_matrix_poly_vector,
     multiply_poly_vectors,
     subtract_polynomials,
     reduce_coefficients_mod_q,
     reduce_poly_vector,
+    to_poly,
+    to_poly_vector,
 )
 
 
@@ -30,29 +37,33 @@ class Kyber:
         s = generate_sample_noise_poly_vector(K_K, ETA_K)
         e = generate_sample_noise_poly_vector(K_K, ETA_K)
 
-        t = add_polynomial_vectors(multiply_matrix_poly_vector(A, s, Q_K), e)
-        t = [reduce_coefficients_mod_q(polynomial, Q_K) for polynomial in t]
+        t = reduce_poly_vector(
+            add_polynomial_vectors(multiply_matrix_poly_vector(A, s, Q_K), e), Q_K
+        )
 
         return {"public_key": {"t": t, "seed": seed}, "secret_key": s}
 
-    def cpa_encrypt(self, t: List[List[int]], seed: bytes) -> dict:
-        m1 = get_random_seed()
-        m1 = [int(bit) for byte in m1 for bit in f"{byte:08b}"]
-        m = [value * math.ceil(Q_K / 2) for value in m1]
+    def cpa_encrypt(self, t: PolyVec, seed: bytes) -> dict:
+        m1 = np.unpackbits(np.frombuffer(get_random_seed(), dtype=np.uint8)).astype(
+            POLY_DTYPE
+        )
+        m = m1 * math.ceil(Q_K / 2)
 
-        A = expand_a_kyber(seed, K_K, K_K, Q_K)
+        A_hat = expand_a_kyber_cached(seed, K_K, K_K, Q_K, ntt_domain=True)
 
         r = generate_sample_noise_poly_vector(K_K, ETA_K)
         e1 = generate_sample_noise_poly_vector(K_K, ETA_K)
         e2 = generate_sample_noise_polynomial(ETA_K)
 
         u = reduce_poly_vector(
-            add_polynomial_vectors(multiply_matrix_poly_vector(A, r, Q_K, True), e1),
+            add_polynomial_vectors(
+                multiply_ntt_matrix_poly_vector(A_hat, r, Q_K, True), e1
+            ),
             Q_K,
         )
         v = reduce_coefficients_mod_q(
             add_polynomials(
-                (add_polynomials(multiply_poly_vectors(t, r, Q_K), e2)),
+                add_polynomials(multiply_poly_vectors(to_poly_vector(t), r, Q_K), e2),
                 m,
             ),
             Q_K,
@@ -60,13 +71,15 @@ class Kyber:
 
         return {"u": u, "v": v, "key": m1}
 
-    def cpa_decrypt(self, s: List[List[int]], uv: dict) -> list:
+    def cpa_decrypt(self, s: PolyVec, uv: dict) -> Poly:
         mn = reduce_coefficients_mod_q(
-            subtract_polynomials(uv["v"], multiply_poly_vectors(s, uv["u"], Q_K)), Q_K
+            subtract_polynomials(
+                to_poly(uv["v"]), multiply_poly_vectors(s, to_poly_vector(uv["u"]), Q_K)
+            ),
+            Q_K,
         )
 
         ceil_qk = math.ceil(Q_K / 2)
-        return [
-            (ceil_qk if abs(m - ceil_qk) < min(abs(m), abs(m - Q_K)) else 0) // ceil_qk
-            for m in mn
-        ]
+        return np.where(
+            np.abs(mn - ceil_qk) < np.minimum(np.abs(mn), np.abs(mn - Q_K)), 1, 0
+        ).astype(POLY_DTYPE)
@@ -0,0 +1,92 @@
+import os
+import threading
+import numpy as np
+
+from collections import OrderedDict
+from dotenv import load_dotenv
+from typing import Callable, Hashable
+
+from .generators import expand_a_kyber
+from .ntt import ntt
+
+load_dotenv()
+
+MATRIX_CACHE_MAX_ENTRIES = int(os.getenv("MATRIX_CACHE_MAX_ENTRIES", 256))
+MATRIX_CACHE_MAX_BYTES = int(os.getenv("MATRIX_CACHE_MAX_BYTES", 64 * 1024 * 1024))
+
+
+class MatrixCache:
+    def __init__(self, max_entries: int, max_bytes: int):
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self._entries: "OrderedDict[Hashable, np.ndarray]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.current_bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def get_or_create(
+        self, key: Hashable, factory: Callable[[], np.ndarray]
+    ) -> np.ndarray:
+        with self._lock:
+            matrix = self._entries.get(key)
+            if matrix is not None:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return matrix
+            self.misses += 1
+
+        matrix = factory()
+        matrix.setflags(write=False)
+
+        if self.max_entries < 1 or matrix.nbytes > self.max_bytes:
+            return matrix
+
+        with self._lock:
+            if key not in self._entries:
+                self._entries[key] = matrix
+                self.current_bytes += matrix.nbytes
+
+            while (
+                len(self._entries) > self.max_entries
+                or self.current_bytes > self.max_bytes
+            ):
+                _, evicted = self._entries.popitem(last=False)
+                self.current_bytes -= evicted.nbytes
+                self.evictions += 1
+
+            return self._entries.get(key, matrix)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            self.current_bytes = 0
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "entries": len(self._entries),
+                "bytes": self.current_bytes,
+                "max_entries": self.max_entries,
+                "max_bytes": self.max_bytes,
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+            }
+
+
+matrix_cache = MatrixCache(MATRIX_CACHE_MAX_ENTRIES, MATRIX_CACHE_MAX_BYTES)
+
+
+def expand_a_kyber_cached(
+    seed: bytes, k: int, l: int, q: int, ntt_domain: bool = False
+) -> np.ndarray:
+    return matrix_cache.get_or_create(
+        ("kyber", bytes(seed), k, l, q, ntt_domain),
+        lambda: (
+            ntt(expand_a_kyber(seed, k, l, q), q)
+            if ntt_domain
+            else expand_a_kyber(seed, k, l, q)
+        ),
+    )
@@ -0,0 +1,91 @@
+import numpy as np
+
+from functools import lru_cache
+from typing import Tuple
+
+from .parameters import N
+
+LOG_N = N.bit_length() - 1
+
+
+def bit_reverse(value: int, bits: int) -> int:
+    return int(f"{value:0{bits}b}"[::-1], 2)
+
+
+def get_primitive_root_of_unity(order: int, q: int) -> int:
+    if (q - 1) % order != 0:
+        raise ValueError(f"Modulus {q} does not support an NTT of order {order}.")
+
+    for candidate in range(2, q):
+        root = pow(candidate, (q - 1) // order, q)
+        if pow(root, order // 2, q) == q - 1:
+            return root
+
+    raise ValueError(f"No primitive root of unity of order {order} modulo {q}.")
+
+
+@lru_cache(maxsize=None)
+def get_ntt_tables(q: int) -> Tuple[np.ndarray, np.ndarray, int]:
+    psi = get_primitive_root_of_unity(2 * N, q)
+    zetas = np.array(
+        [pow(psi, bit_reverse(i, LOG_N), q) for i in range(N)], dtype=np.int64
+    )
+    inverse_zetas = (q - zetas) % q
+    n_inverse = pow(N, -1, q)
+
+    return zetas, inverse_zetas, n_inverse
+
+
+def ntt(polynomials, q: int) -> np.ndarray:
+    zetas, _, _ = get_ntt_tables(q)
+    a = np.mod(np.asarray(polynomials, dtype=np.int64)[..., ::-1], q)
+    batch_shape = a.shape[:-1]
+
+    length = N // 2
+    while length > 0:
+        groups = N // (2 * length)
+        a = a.reshape(batch_shape + (groups, 2, length))
+        t = (zetas[groups : 2 * groups, None] * a[..., 1, :]) % q
+        a = np.stack(((a[..., 0, :] + t) % q, (a[..., 0, :] - t) % q), axis=-2)
+        length >>= 1
+
+    return a.reshape(batch_shape + (N,))
+
+
+def inverse_ntt(polynomials_hat, q: int) -> np.ndarray:
+    _, inverse_zetas, n_inverse = get_ntt_tables(q)
+    a = np.asarray(polynomials_hat, dtype=np.int64)
+    batch_shape = a.shape[:-1]
+
+    length = 1
+    while length < N:
+        groups = N // (2 * length)
+        a = a.reshape(batch_shape + (groups, 2, length))
+        t = a[..., 0, :]
+        u = a[..., 1, :]
+        zeta = inverse_zetas[2 * groups - 1 : groups - 1 : -1, None]
+        a = np.stack(((t + u) % q, (zeta * (t - u)) % q), axis=-2)
+        length <<= 1
+
+    a = (a.reshape(batch_shape + (N,)) * n_inverse) % q
+    return a[..., ::-1]
+
+
+def multiply_ntt(polynomial_hat1, polynomial_hat2, q: int) -> np.ndarray:
+    return (np.asarray(polynomial_hat1) * np.asarray(polynomial_hat2)) % q
+
+
+def multiply_ntt_matrix_vector(
+    matrix_hat, poly_vector_hat, q: int, transpose: bool = False
+) -> np.ndarray:
+    matrix_hat = np.asarray(matrix_hat)
+    if transpose:
+        matrix_hat = matrix_hat.swapaxes(0, 1)
+
+    products = (matrix_hat * np.asarray(poly_vector_hat)[..., None, :, :]) % q
+    return products.sum(axis=-2) % q
+
+
+def multiply_ntt_vectors(poly_vector_hat1, poly_vector_hat2, q: int) -> np.ndarray:
+    products = (np.asarray(poly_vector_hat1) * np.asarray(poly_vector_hat2)) % q
+    return products.sum(axis=-2) % q
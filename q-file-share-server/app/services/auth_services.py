@@ -1,32 +1,32 @@
+import asyncio
+
 from datetime import datetime, timezone
+from sqlalchemy import select
 
 from app.models.db_models import Users
-from app.db.db_session import get_db_session
 from app.auth.password_handler import hash_password, verify_password
 from app.auth.jwt_handler import create_access_token
 
 
-def authenticate_user(user_email: str, password: str) -> str:
-    db = next(get_db_session())
-    user = db.query(Users).filter(Users.email == user_email).first()
+async def authenticate_user(db, user_email: str, password: str) -> str:
+    user = await db.scalar(select(Users).where(Users.email == user_email))
 
     if not user:
         raise ValueError("Email not registered. Please check the email address.")
 
-    if not verify_password(password, user.password_hash):
+    if not await asyncio.to_thread(verify_password, password, user.password_hash):
         raise ValueError("Incorrect password. Kindly try again.")
 
     return create_access_token({"email": user.email})
 
 
-def register_user(name: str, user_email: str, password: str) -> Users:
-    db = next(get_db_session())
-    existing_user = db.query(Users).filter(Users.email == user_email).first()
+async def register_user(db, name: str, user_email: str, password: str) -> Users:
+    existing_user = await db.scalar(select(Users).where(Users.email == user_email))
 
     if existing_user:
         raise ValueError("A user with this email already exists.")
 
-    hashed_password = hash_password(password)
+    hashed_password = await asyncio.to_thread(hash_password, password)
     new_user = Users(
         name=name,
         email=user_email,
@@ -37,8 +37,8 @@ def register_user(name: str, user_email: str, password: str) -> Users:
 
     try:
         db.add(new_user)
-        db.commit()
-        db.refresh(new_user)
+        await db.commit()
+        await db.refresh(new_user)
 
         return new_user
     except Exception as exception:
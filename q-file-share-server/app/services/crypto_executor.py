@@ -0,0 +1,175 @@
+import os
+import time
+import asyncio
+import threading
+
+from concurrent.futures import Executor, Future, ProcessPoolExecutor
+from concurrent.futures import ThreadPoolExecutor, wait
+from dotenv import load_dotenv
+from fastapi import HTTPException, status
+from typing import Callable, Optional
+
+from app.quantum_protocols.ntt import get_ntt_tables
+from app.quantum_protocols.parameters import Q, Q_K
+
+load_dotenv()
+
+CRYPTO_EXECUTOR_MODE = os.getenv("CRYPTO_EXECUTOR_MODE", "process")
+CRYPTO_EXECUTOR_WORKERS = int(os.getenv("CRYPTO_EXECUTOR_WORKERS", os.cpu_count() or 1))
+CRYPTO_EXECUTOR_MAX_QUEUE = int(os.getenv("CRYPTO_EXECUTOR_MAX_QUEUE", 64))
+CRYPTO_EXECUTOR_TIMEOUT = float(os.getenv("CRYPTO_EXECUTOR_TIMEOUT", 30))
+
+EXECUTOR_MODES = ("process", "thread", "sync")
+
+
+def warm_up_worker() -> None:
+    get_ntt_tables(Q)
+    get_ntt_tables(Q_K)
+
+
+class CryptoExecutor:
+    def __init__(self, mode: str, max_workers: int, max_queue: int, timeout: float):
+        if mode not in EXECUTOR_MODES:
+            raise ValueError(f"Invalid crypto executor mode: {mode}")
+
+        self.mode = mode
+        self.max_workers = max(max_workers, 1)
+        self.max_queue = max(max_queue, 1)
+        self.timeout = timeout
+        self._executor: Optional[Executor] = None
+        self._slots = threading.BoundedSemaphore(self.max_queue)
+        self._lock = threading.Lock()
+        self.in_flight = 0
+        self.submitted = 0
+        self.completed = 0
+        self.failed = 0
+        self.rejected = 0
+        self.timed_out = 0
+        self.total_seconds = 0.0
+
+    def start(self) -> None:
+        if self.mode == "sync" or self._executor:
+            return
+
+        if self.mode == "process":
+            self._executor = ProcessPoolExecutor(
+                max_workers=self.max_workers, initializer=warm_up_worker
+            )
+        else:
+            self._executor = ThreadPoolExecutor(
+                max_workers=self.max_workers,
+                thread_name_prefix="crypto-executor",
+                initializer=warm_up_worker,
+            )
+
+        wait([self._executor.submit(warm_up_worker) for _ in range(self.max_workers)])
+
+    def shutdown(self) -> None:
+        if self._executor:
+            self._executor.shutdown(wait=True, cancel_futures=True)
+            self._executor = None
+
+    def submit(self, function: Callable, *args) -> Future:
+        if not self._executor:
+            future: Future = Future()
+            try:
+                future.set_result(self._run_inline(function, *args))
+            except Exception as error:
+                future.set_exception(error)
+            return future
+
+        if not self._slots.acquire(blocking=False):
+            with self._lock:
+                self.rejected += 1
+            raise HTTPException(
+                status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+                detail="Server is busy, please retry shortly.",
+            )
+
+        started_at = time.perf_counter()
+        with self._lock:
+            self.in_flight += 1
+            self.submitted += 1
+
+        try:
+            future = self._executor.submit(function, *args)
+        except Exception:
+            self._release(started_at, failed=True)
+            raise
+
+        future.add_done_callback(
+            lambda done: self._release(
+                started_at, failed=done.cancelled() or done.exception() is not None
+            )
+        )
+        return future
+
+    def call(self, function: Callable, *args):
+        return self.submit(function, *args).result(timeout=self.timeout)
+
+    async def run(self, function: Callable, *args):
+        if not self._executor:
+            return self._run_inline(function, *args)
+
+        future = self.submit(function, *args)
+        try:
+            return await asyncio.wait_for(asyncio.wrap_future(future), self.timeout)
+        except asyncio.TimeoutError:
+            with self._lock:
+                self.timed_out += 1
+            raise HTTPException(
+                status_code=status.HTTP_504_GATEWAY_TIMEOUT,
+                detail="Cryptographic operation timed out.",
+            )
+
+    def stats(self) -> dict:
+        with self._lock:
+            finished = self.completed + self.failed
+            return {
+                "mode": self.mode,
+                "workers": self.max_workers,
+                "max_queue": self.max_queue,
+                "queue_depth": self.in_flight,
+                "submitted": self.submitted,
+                "completed": self.completed,
+                "failed": self.failed,
+                "rejected": self.rejected,
+                "timed_out": self.timed_out,
+                "average_seconds": self.total_seconds / finished if finished else 0.0,
+            }
+
+    def _run_inline(self, function: Callable, *args):
+        started_at = time.perf_counter()
+        with self._lock:
+            self.submitted += 1
+
+        try:
+            result = function(*args)
+        except Exception:
+            with self._lock:
+                self.failed += 1
+                self.total_seconds += time.perf_counter() - started_at
+            raise
+
+        with self._lock:
+            self.completed += 1
+            self.total_seconds += time.perf_counter() - started_at
+        return result
+
+    def _release(self, started_at: float, failed: bool) -> None:
+        with self._lock:
+            self.in_flight -= 1
+            self.total_seconds += time.perf_counter() - started_at
+            if failed:
+                self.failed += 1
+            else:
+                self.completed += 1
+        self._slots.release()
+
+
+crypto_executor = CryptoExecutor(
+    CRYPTO_EXECUTOR_MODE,
+    CRYPTO_EXECUTOR_WORKERS,
+    CRYPTO_EXECUTOR_MAX_QUEUE,
+    CRYPTO_EXECUTOR_TIMEOUT,
+)
@@ -1,11 +1,23 @@
-import base64
+import os
+import math
 import json
+import base64
+import asyncio
 
+from concurrent.futures import ThreadPoolExecutor
+from dotenv import load_dotenv
 from fastapi import HTTPException
 from datetime import datetime, timezone, timedelta
+from sqlalchemy import delete, func, select, true, tuple_, union_all, update
+from sqlalchemy.exc import IntegrityError
+from typing import Iterator, List, Optional, Tuple
 
-from app.db.db_session import get_db_session
-from app.models.db_models import Files, FileLogs, Users
+from app.auth.jwt_handler import (
+    create_download_session_token,
+    is_download_session_valid,
+)
+from app.db.db_session import db_session_scope
+from app.models.db_models import DeletedBlobs, Files, FileKeys, FileLogs, Users
 from app.models.dto import FileUploadDTO, FileDownloadDTO
 from app.models.response_models import (
     ActivitiesResponse,
@@ -13,197 +25,787 @@ from app.models.response_models import (
     SharedFilesResponse,
 )
 from app.quantum_protocols.kyber import Kyber
+from app.services.crypto_executor import crypto_executor
+from app.services.kyber_key_pool import kyber_key_pool
+from app.storage.blob_store import blob_store, get_pointer_path, resolve_pointer
 from app.utils.file_handler import (
-    encrypt_file_data,
-    encrypt_client_file_data,
-    decrypt_file_data,
-    decrypt_client_file_data,
-    generate_file_hash,
+    SIGNED_SEGMENT_LENGTH,
+    DOWNLOAD_CHUNK_SIZE,
+    STORAGE_FORMAT_CBC,
+    decrypt_client_file_segment,
+    generate_data_key,
     get_file_hash_key,
-    verify_file_signature,
+    get_relationship_key,
+    reencrypt_client_file_data,
+    reencrypt_stored_file_data,
+    unwrap_data_key,
+    wrap_client_data_key,
+    wrap_data_key,
+    verify_file_signatures,
 )
+from app.utils.merkle import get_merkle_message, get_signature_chunk_size
+from app.utils.pagination import decode_cursor, get_page
+from app.utils.wire_format import (
+    decode_dilithium_public_key,
+    decode_dilithium_signature,
+    decode_kyber_ciphertext,
+    decode_kyber_public_key,
+)
+
+load_dotenv()
 
+SIGNATURE_BATCH_SIZE = 8
+
+UPLOAD_WORKERS = int(os.getenv("UPLOAD_WORKERS", min(32, (os.cpu_count() or 1) + 4)))
+UPLOAD_MAX_CONCURRENCY = int(os.getenv("UPLOAD_MAX_CONCURRENCY", 4))
+
+ACTIVITY_PAGE_SIZE = 10
+LISTING_PAGE_SIZE = int(os.getenv("LISTING_PAGE_SIZE", 50))
+LISTING_MAX_PAGE_SIZE = int(os.getenv("LISTING_MAX_PAGE_SIZE", 200))
+
+DOWNLOAD_LOG_COLUMNS = (
+    FileLogs.id,
+    FileLogs.name,
+    FileLogs.file_id,
+    FileLogs.from_email,
+    FileLogs.to_email,
+)
+
+DOWNLOAD_FILE_COLUMNS = (
+    Files.iv,
+    Files.storage_pointer,
+    Files.codec,
+    Files.size,
+    Files.storage_format,
+)
+
+upload_executor = ThreadPoolExecutor(
+    max_workers=max(UPLOAD_WORKERS, 1), thread_name_prefix="upload"
+)
+
+
+async def get_kyber_key_details():
+    key_pair = kyber_key_pool.acquire()
+    if not key_pair:
+        key_pair = await crypto_executor.run(Kyber().generate_key_pair)
 
-def get_kyber_key_details():
-    kyber = Kyber()
-    key_pair = kyber.generate_key_pair()
     seed = base64.b64encode(key_pair["public_key"]["seed"]).decode(
         "utf-8", errors="ignore"
     )
 
-    return {"t": key_pair["public_key"]["t"], "seed": seed, "s": key_pair["secret_key"]}
+    return {
+        "t": key_pair["public_key"]["t"],
+        "seed": seed,
+        "s": key_pair["secret_key"],
+    }
+
+
+async def verify_file_signatures_in_batches(
+    file_segments: List[bytes], dl_file_signatures: List[dict], dl_public_key
+) -> List[bool]:
+    batch_size = max(
+        SIGNATURE_BATCH_SIZE,
+        math.ceil(len(file_segments) / crypto_executor.max_workers),
+    )
+    batches = await asyncio.gather(
+        *(
+            crypto_executor.run(
+                verify_file_signatures,
+                file_segments[start : start + batch_size],
+                dl_file_signatures[start : start + batch_size],
+                dl_public_key,
+            )
+            for start in range(0, len(file_segments), batch_size)
+        )
+    )
+
+    return [is_valid_file for batch in batches for is_valid_file in batch]
+
+
+async def verify_merkle_signatures(
+    valid_files: List[bool],
+    valid_indexes: List[int],
+    reencrypted_files: List[dict],
+    merkle_chunk_sizes: List[Optional[int]],
+    dl_file_signatures: List[dict],
+    dl_public_key,
+) -> None:
+    merkle_indexes, merkle_messages = [], []
+    for index, reencrypted_file in zip(valid_indexes, reencrypted_files):
+        if not merkle_chunk_sizes[index]:
+            continue
+        if reencrypted_file["merkle_root"] is None:
+            valid_files[index] = False
+            continue
+
+        merkle_indexes.append(index)
+        merkle_messages.append(
+            get_merkle_message(
+                reencrypted_file["merkle_root"], merkle_chunk_sizes[index]
+            )
+        )
+
+    for index, is_valid_file in zip(
+        merkle_indexes,
+        await verify_file_signatures_in_batches(
+            merkle_messages,
+            [dl_file_signatures[index] for index in merkle_indexes],
+            dl_public_key,
+        ),
+    ):
+        valid_files[index] = is_valid_file
+
+
+async def get_data_key(db, file_id: str, hash_key: str) -> bytes:
+    file_key = await db.scalar(
+        select(FileKeys)
+        .where(FileKeys.file_id == file_id)
+        .order_by((FileKeys.relationship_hash == hash_key).desc())
+        .limit(1)
+    )
+    if file_key:
+        return unwrap_data_key(file_key.wrapped_key, file_key.relationship_hash)
+
+    first_file_log = (
+        await db.execute(
+            select(FileLogs.from_email, FileLogs.to_email)
+            .where(FileLogs.file_id == file_id)
+            .order_by(FileLogs.id)
+            .limit(1)
+        )
+    ).first()
+    if not first_file_log:
+        raise HTTPException(status_code=404, detail="File key not found")
+
+    return get_relationship_key(
+        get_file_hash_key(first_file_log.to_email, first_file_log.from_email)
+    )
+
+
+async def claim_file(db, file_hash: str, reencrypted_file: dict) -> bool:
+    if await db.scalar(select(Files.id).where(Files.file_id == file_hash)):
+        return False
+
+    try:
+        async with db.begin_nested():
+            db.add(
+                Files(
+                    file_id=file_hash,
+                    iv=reencrypted_file["iv"],
+                    storage_pointer=blob_store.get_pointer(file_hash),
+                    size=reencrypted_file["encrypted_file_size"],
+                    ref_count=0,
+                    codec=reencrypted_file["codec"],
+                    original_size=reencrypted_file["file_size"],
+                    storage_format=reencrypted_file["storage_format"],
+                )
+            )
+            await db.execute(
+                delete(DeletedBlobs).where(DeletedBlobs.file_id == file_hash)
+            )
+    except IntegrityError:
+        return False
+
+    return True
+
+
+async def validate_upload_recipient(db, recipient_email: str, user_email: str) -> None:
+    if recipient_email.strip() == user_email:
+        raise ValueError("Cannot send to same email")
+
+    emails_exist = (
+        await db.scalar(
+            select(func.count(Users.id)).where(
+                Users.email.in_([recipient_email, user_email])
+            )
+        )
+        == 2
+    )
+    if not emails_exist:
+        raise ValueError("Cannot find the recipient email")
 
 
 async def process_upload_files(
+    db,
     encrypted_file_buffers: list,
     file_upload_dto: FileUploadDTO,
-    secret_key: list,
+    secret_key: Optional[list],
     user_email: str,
-) -> None:
-    db = next(get_db_session())
+    shared_key: Optional[list] = None,
+) -> List[str]:
     try:
-        if file_upload_dto.recipient_email.strip() == user_email:
-            raise ValueError("Cannot send to same email")
-
-        emails_exist = (
-            db.query(Users)
-            .filter(Users.email.in_([file_upload_dto.recipient_email, user_email]))
-            .count()
-            == 2
-        )
-        if not emails_exist:
-            raise ValueError("Cannot find the recipient email")
+        await validate_upload_recipient(db, file_upload_dto.recipient_email, user_email)
 
-        kyber = Kyber()
-        uv_kyber_key = json.loads(file_upload_dto.kyber_key)
-        shared_key = kyber.cpa_decrypt(secret_key, uv_kyber_key)
+        if shared_key is None:
+            kyber = Kyber()
+            uv_kyber_key = decode_kyber_ciphertext(file_upload_dto.kyber_key)
+            shared_key = await crypto_executor.run(
+                kyber.cpa_decrypt, secret_key, uv_kyber_key
+            )
 
         dl_file_signatures = [
-            json.loads(signature) for signature in (file_upload_dto.file_signatures)
+            decode_dilithium_signature(signature)
+            for signature in (file_upload_dto.file_signatures)
         ]
 
-        dl_public_key = json.loads(file_upload_dto.dl_public_key)
+        dl_public_key = decode_dilithium_public_key(file_upload_dto.dl_public_key)
+        hash_key = get_file_hash_key(file_upload_dto.recipient_email, user_email)
         file_logs = list()
 
-        for index in range(len(encrypted_file_buffers)):
-            file_data = await decrypt_client_file_data(
+        merkle_chunk_sizes = [
+            get_signature_chunk_size(dl_file_signature)
+            for dl_file_signature in dl_file_signatures
+        ]
+        segment_indexes = [
+            index
+            for index, merkle_chunk_size in enumerate(merkle_chunk_sizes)
+            if not merkle_chunk_size
+        ]
+        file_segments = [
+            await decrypt_client_file_segment(
                 encrypted_file_buffers[index],
                 file_upload_dto.init_vectors[index],
                 shared_key,
+                SIGNED_SEGMENT_LENGTH,
             )
+            for index in segment_indexes
+        ]
+        valid_files = [True] * len(encrypted_file_buffers)
+        for index, is_valid_file in zip(
+            segment_indexes,
+            await verify_file_signatures_in_batches(
+                file_segments,
+                [dl_file_signatures[index] for index in segment_indexes],
+                dl_public_key,
+            ),
+        ):
+            valid_files[index] = is_valid_file
 
-            is_valid_file = verify_file_signature(
-                file_data, dl_file_signatures[index], dl_public_key
-            )
-            if not is_valid_file:
-                raise ValueError("Corrupted file, please check and re-upload")
+        if not any(valid_files):
+            raise ValueError("Corrupted file, please check and re-upload")
 
-            file_hash = generate_file_hash(file_data)
-            encrypted_file_data = await encrypt_file_data(
-                file_data,
-                get_file_hash_key(file_upload_dto.recipient_email, user_email),
-            )
+        semaphore = asyncio.Semaphore(max(UPLOAD_MAX_CONCURRENCY, 1))
 
-            if not db.query(Files).filter(Files.file_id == file_hash).first():
-                new_file = Files(
-                    file_id=file_hash,
-                    file_data=encrypted_file_data["encrypted_file_data"],
-                    iv=encrypted_file_data["iv"],
+        async def run_upload_task(function, *args):
+            async with semaphore:
+                return await asyncio.get_running_loop().run_in_executor(
+                    upload_executor, function, *args
                 )
 
-                db.add(new_file)
-                db.commit()
+        valid_indexes = [
+            index for index, is_valid_file in enumerate(valid_files) if is_valid_file
+        ]
+        data_keys = [generate_data_key() for _ in valid_indexes]
+        reencrypted_files = await asyncio.gather(
+            *(
+                run_upload_task(
+                    reencrypt_client_file_data,
+                    encrypted_file_buffers[index].file,
+                    file_upload_dto.init_vectors[index],
+                    shared_key,
+                    data_key,
+                    file_upload_dto.file_types[index],
+                    merkle_chunk_sizes[index],
+                )
+                for index, data_key in zip(valid_indexes, data_keys)
+            )
+        )
 
-            expiry_timestamp = datetime.now(timezone.utc) + timedelta(
-                days=file_upload_dto.expiration
+        try:
+            await verify_merkle_signatures(
+                valid_files,
+                valid_indexes,
+                reencrypted_files,
+                merkle_chunk_sizes,
+                dl_file_signatures,
+                dl_public_key,
             )
+            if not any(valid_files):
+                raise ValueError("Corrupted file, please check and re-upload")
 
-            file_logs.append(
-                FileLogs(
-                    name=file_upload_dto.file_names[index],
-                    size=file_upload_dto.file_sizes[index],
-                    from_email=user_email,
-                    to_email=file_upload_dto.recipient_email,
-                    sent_on=datetime.now(timezone.utc),
-                    expiry=expiry_timestamp,
-                    download_count=file_upload_dto.download_count,
-                    updated_download_count=file_upload_dto.download_count,
-                    file_id=file_hash,
-                    is_anonymous=file_upload_dto.anonymous,
-                    status="active",
+            new_files = []
+            for index, data_key, reencrypted_file in zip(
+                valid_indexes, data_keys, reencrypted_files
+            ):
+                if not valid_files[index]:
+                    continue
+
+                file_hash = reencrypted_file["file_hash"]
+                if await claim_file(db, file_hash, reencrypted_file):
+                    new_files.append(reencrypted_file)
+                else:
+                    data_key = await get_data_key(db, file_hash, hash_key)
+
+                file_key_exists = await db.scalar(
+                    select(FileKeys.id).where(
+                        FileKeys.file_id == file_hash,
+                        FileKeys.relationship_hash == hash_key,
+                    )
+                )
+                if not file_key_exists:
+                    db.add(
+                        FileKeys(
+                            file_id=file_hash,
+                            relationship_hash=hash_key,
+                            wrapped_key=wrap_data_key(data_key, hash_key),
+                        )
+                    )
+                    await db.flush()
+
+                expiry_timestamp = datetime.now(timezone.utc) + timedelta(
+                    days=file_upload_dto.expiration
+                )
+
+                file_logs.append(
+                    FileLogs(
+                        name=file_upload_dto.file_names[index],
+                        size=file_upload_dto.file_sizes[index],
+                        from_email=user_email,
+                        to_email=file_upload_dto.recipient_email,
+                        sent_on=datetime.now(timezone.utc),
+                        expiry=expiry_timestamp,
+                        download_count=file_upload_dto.download_count,
+                        updated_download_count=file_upload_dto.download_count,
+                        file_id=file_hash,
+                        is_anonymous=file_upload_dto.anonymous,
+                        status="active",
+                    )
                 )
-            )
 
+            await asyncio.gather(
+                *(
+                    run_upload_task(
+                        blob_store.put,
+                        new_file["file_hash"],
+                        new_file["encrypted_file_data"],
+                    )
+                    for new_file in new_files
+                )
+            )
+        finally:
+            for reencrypted_file in reencrypted_files:
+                reencrypted_file["encrypted_file_data"].close()
+
+        for file_log in file_logs:
+            referenced = await db.execute(
+                update(Files)
+                .where(Files.file_id == file_log.file_id)
+                .values(ref_count=Files.ref_count + 1)
+                .execution_options(synchronize_session=False)
+            )
+            if not referenced.rowcount:
+                raise ValueError("File was removed during upload, please re-upload")
         db.add_all(file_logs)
-        db.commit()
+        await db.commit()
+
+        return [
+            file_upload_dto.file_names[index]
+            for index, is_valid_file in enumerate(valid_files)
+            if not is_valid_file
+        ]
 
     except json.JSONDecodeError:
         raise HTTPException(
             status_code=400, detail="Invalid JSON format in FileSignature"
         )
     except ValueError as error:
+        await db.rollback()
         raise ValueError(str(error))
+    except HTTPException as error:
+        await db.rollback()
+        raise error
     except Exception as error:
-        db.rollback()
+        await db.rollback()
         raise HTTPException(status_code=400, detail=str(error))
 
 
-async def process_download_file(
-    file_download_dto: FileDownloadDTO, user_email: str
-) -> dict:
-    db = next(get_db_session())
+def read_stored_file_chunks(
+    file_id: str,
+    storage_pointer: Optional[str],
+    offset: int = 0,
+    length: Optional[int] = None,
+) -> Iterator[bytes]:
+    if storage_pointer:
+        store, key = resolve_pointer(storage_pointer)
+        yield from store.read_chunks(key, DOWNLOAD_CHUNK_SIZE, offset, length)
+        return
+
+    remaining = length
+    with db_session_scope() as db:
+        while remaining is None or remaining > 0:
+            chunk_size = (
+                DOWNLOAD_CHUNK_SIZE
+                if remaining is None
+                else min(DOWNLOAD_CHUNK_SIZE, remaining)
+            )
+            chunk = (
+                db.query(func.substr(Files.file_data, offset + 1, chunk_size))
+                .filter(Files.file_id == file_id)
+                .scalar()
+            )
+            if not chunk:
+                break
+
+            yield bytes(chunk)
+            if len(chunk) < chunk_size:
+                break
+            offset += len(chunk)
+            if remaining is not None:
+                remaining -= len(chunk)
+
+
+def parse_byte_range(
+    range_header: Optional[str], size: int
+) -> Optional[Tuple[int, int]]:
+    if not range_header:
+        return None
+
+    unit, _, byte_range = range_header.partition("=")
+    if unit.strip().lower() != "bytes" or "," in byte_range:
+        return None
+
+    start, _, end = byte_range.strip().partition("-")
     try:
-        file_log = (
-            db.query(FileLogs)
-            .filter(
+        if not start:
+            start, end = max(size - int(end), 0), size - 1
+        else:
+            start, end = int(start), min(int(end), size - 1) if end else size - 1
+    except ValueError:
+        return None
+
+    if start > end or start >= size:
+        raise HTTPException(
+            status_code=416,
+            detail="Requested range not satisfiable",
+            headers={"Content-Range": f"bytes */{size}"},
+        )
+
+    return start, end
+
+
+def select_download(file_logs, *columns):
+    file_key = (
+        select(FileKeys.wrapped_key, FileKeys.relationship_hash)
+        .where(FileKeys.file_id == file_logs.c.file_id)
+        .order_by(FileKeys.id)
+        .limit(1)
+    )
+
+    return (
+        select(
+            *columns,
+            *DOWNLOAD_FILE_COLUMNS,
+            file_key.with_only_columns(FileKeys.wrapped_key)
+            .scalar_subquery()
+            .label("wrapped_key"),
+            file_key.with_only_columns(FileKeys.relationship_hash)
+            .scalar_subquery()
+            .label("relationship_hash"),
+        )
+        .select_from(file_logs)
+        .outerjoin(Files, Files.file_id == file_logs.c.file_id)
+    )
+
+
+async def reserve_download(db, public_id: str, user_email: str):
+    reservation = (
+        update(FileLogs)
+        .where(
+            FileLogs.public_id == public_id,
+            FileLogs.to_email == user_email,
+            FileLogs.status == "active",
+            FileLogs.updated_download_count > 0,
+        )
+        .values(
+            updated_download_count=FileLogs.updated_download_count - 1,
+            updated_at=datetime.now(timezone.utc),
+        )
+        .returning(*DOWNLOAD_LOG_COLUMNS)
+    )
+
+    if db.bind.dialect.name == "postgresql":
+        reservation = reservation.cte("reservation")
+        return (await db.execute(select_download(reservation, *reservation.c))).first()
+
+    file_log = (
+        await db.execute(reservation.execution_options(synchronize_session=False))
+    ).first()
+    if not file_log:
+        return None
+
+    return (
+        await db.execute(
+            select_download(FileLogs.__table__, *DOWNLOAD_LOG_COLUMNS).where(
+                FileLogs.id == file_log.id
+            )
+        )
+    ).first()
+
+
+async def refund_download(db, file_log_id: int) -> None:
+    await db.rollback()
+    await db.execute(
+        update(FileLogs)
+        .where(FileLogs.id == file_log_id, FileLogs.status == "active")
+        .values(
+            updated_download_count=FileLogs.updated_download_count + 1,
+            updated_at=datetime.now(timezone.utc),
+        )
+        .execution_options(synchronize_session=False)
+    )
+    await db.commit()
+
+
+async def get_download_log(db, public_id: str, user_email: str, billed: bool = False):
+    file_log = (
+        await db.execute(
+            select_download(
+                FileLogs.__table__,
+                *DOWNLOAD_LOG_COLUMNS,
+                FileLogs.updated_download_count,
+                FileLogs.status,
+            ).where(
                 (
                     (FileLogs.from_email == user_email)
                     | (FileLogs.to_email == user_email)
                 )
-                & (FileLogs.public_id == file_download_dto.file_id)
+                & (FileLogs.public_id == public_id)
             )
-            .first()
         )
-        if not file_log:
-            raise HTTPException(status_code=404, detail="Record not found")
-        if file_log.updated_download_count < 1:
-            raise HTTPException(status_code=400, detail="Download limit reached.")
+    ).first()
+    if not file_log:
+        raise HTTPException(status_code=404, detail="Record not found")
+    if file_log.updated_download_count < 1 and not billed:
+        raise HTTPException(status_code=400, detail="Download limit reached.")
+    if file_log.status != "active":
+        raise HTTPException(status_code=400, detail="File has expired.")
+
+    return file_log
+
+
+async def get_download_data_key(db, download) -> bytes:
+    if download.iv is None:
+        raise HTTPException(status_code=404, detail="File not found")
+    if download.wrapped_key:
+        return unwrap_data_key(download.wrapped_key, download.relationship_hash)
+
+    return await get_data_key(
+        db,
+        download.file_id,
+        get_file_hash_key(download.to_email, download.from_email),
+    )
 
-        existing_file = (
-            db.query(Files).filter(Files.file_id == file_log.file_id).first()
-        )
-        if not existing_file:
-            raise HTTPException(status_code=404, detail="File not found")
 
-        decrypted_file_data = await decrypt_file_data(
-            existing_file.file_data,
-            existing_file.iv,
-            get_file_hash_key(file_log.to_email, file_log.from_email),
-        )
+async def process_download_file(
+    db,
+    file_download_dto: FileDownloadDTO,
+    user_email: str,
+    range_header: Optional[str] = None,
+    download_session: Optional[str] = None,
+) -> dict:
+    try:
+        reserved = False
+        if (
+            file_download_dto.wrap_key
+            and range_header
+            and is_download_session_valid(
+                download_session, file_download_dto.file_id, user_email
+            )
+        ):
+            download = await get_download_log(
+                db, file_download_dto.file_id, user_email, billed=True
+            )
+        else:
+            download_session = None
+            download = await reserve_download(db, file_download_dto.file_id, user_email)
+            reserved = download is not None
+            if not reserved:
+                download = await get_download_log(
+                    db, file_download_dto.file_id, user_email
+                )
 
-        kyber = Kyber()
-        ts_kyber_key = json.loads(file_download_dto.kyber_key_pair)
-        kyber_public_key = kyber.cpa_encrypt(
-            ts_kyber_key["t"], base64.b64decode(ts_kyber_key["seed"])
-        )
+        data_key = await get_download_data_key(db, download)
+        await db.commit()
 
-        encrypted_file_data = await encrypt_client_file_data(
-            decrypted_file_data, kyber_public_key["key"]
-        )
+        try:
+            kyber = Kyber()
+            ts_kyber_key = decode_kyber_public_key(file_download_dto.kyber_key_pair)
+            kyber_public_key = await crypto_executor.run(
+                kyber.cpa_encrypt,
+                ts_kyber_key["t"],
+                base64.b64decode(ts_kyber_key["seed"]),
+            )
 
-        if file_log.to_email == user_email:
-            file_log.updated_download_count -= 1
-        db.commit()
-        db.refresh(file_log)
+            byte_range = None
+            if file_download_dto.wrap_key:
+                if download.size is not None:
+                    byte_range = parse_byte_range(range_header, download.size)
+
+                if byte_range:
+                    file_path = None
+                    file_data = read_stored_file_chunks(
+                        download.file_id,
+                        download.storage_pointer,
+                        byte_range[0],
+                        byte_range[1] - byte_range[0] + 1,
+                    )
+                else:
+                    file_path = get_pointer_path(download.storage_pointer)
+                    file_data = (
+                        None
+                        if file_path
+                        else read_stored_file_chunks(
+                            download.file_id, download.storage_pointer
+                        )
+                    )
+                iv = download.iv
+                wrapped_key = wrap_client_data_key(data_key, kyber_public_key["key"])
+                codec = download.codec or "none"
+            else:
+                encrypted_file_data = reencrypt_stored_file_data(
+                    read_stored_file_chunks(download.file_id, download.storage_pointer),
+                    download.iv,
+                    data_key,
+                    kyber_public_key["key"],
+                    download.codec,
+                    download.storage_format,
+                )
+                file_path, wrapped_key, codec = None, None, "none"
+                file_data = encrypted_file_data["encryptedFileChunks"]
+                iv = encrypted_file_data["iv"]
+
+            if reserved and file_download_dto.wrap_key:
+                download_session = create_download_session_token(
+                    file_download_dto.file_id, user_email
+                )
+        except Exception:
+            if reserved:
+                await refund_download(db, download.id)
+            raise
 
         return {
-            "file_data": encrypted_file_data["encryptedFileBuffer"],
+            "file_data": file_data,
+            "file_path": file_path,
             "kyber_public_key": {
                 "u": kyber_public_key["u"],
                 "v": kyber_public_key["v"],
-                "iv": encrypted_file_data["iv"],
+                "iv": iv,
+                "wrapped_key": wrapped_key,
             },
-            "file_name": file_log.name,
+            "file_name": download.name,
+            "download_session": download_session,
+            "codec": codec,
+            "storage_format": download.storage_format or STORAGE_FORMAT_CBC,
+            "content_range": (
+                (byte_range[0], byte_range[1], download.size) if byte_range else None
+            ),
         }
 
     except ValueError as error:
+        await db.rollback()
         raise ValueError(str(error))
     except HTTPException as error:
+        await db.rollback()
         raise error
     except Exception as error:
-        db.rollback()
+        await db.rollback()
         raise HTTPException(status_code=500, detail=str(error))
 
 
-def get_files_actitvity(user_email: str):
-    db = next(get_db_session())
-    file_logs = (
-        db.query(FileLogs)
-        .filter((FileLogs.from_email == user_email) | (FileLogs.to_email == user_email))
-        .order_by(FileLogs.sent_on.desc())
-        .limit(10)
-        .all()
+async def get_storage_stats(db) -> dict:
+    blobs, stored_bytes, referenced_bytes = (
+        await db.execute(
+            select(
+                func.count(Files.id),
+                func.coalesce(func.sum(Files.size), 0),
+                func.coalesce(func.sum(Files.size * Files.ref_count), 0),
+            ).where(Files.size.isnot(None))
+        )
+    ).one()
+
+    compressed_blobs, original_bytes, compressed_bytes = (
+        await db.execute(
+            select(
+                func.count(Files.id),
+                func.coalesce(func.sum(Files.original_size), 0),
+                func.coalesce(func.sum(Files.size), 0),
+            ).where(Files.codec.isnot(None), Files.codec != "none")
+        )
+    ).one()
+
+    stored_bytes, referenced_bytes = int(stored_bytes), int(referenced_bytes)
+    original_bytes, compressed_bytes = int(original_bytes), int(compressed_bytes)
+
+    return {
+        "blobs": blobs,
+        "storedBytes": stored_bytes,
+        "referencedBytes": referenced_bytes,
+        "dedupRatio": referenced_bytes / stored_bytes if stored_bytes else 1.0,
+        "compressedBlobs": compressed_blobs,
+        "compressionSavedBytes": original_bytes - compressed_bytes,
+        "compressionRatio": (
+            original_bytes / compressed_bytes if compressed_bytes else 1.0
+        ),
+    }
+
+
+def get_page_size(limit: Optional[int], default: int) -> int:
+    if limit is None:
+        return default
+    if limit < 1:
+        raise ValueError("Invalid page size")
+
+    return min(limit, LISTING_MAX_PAGE_SIZE)
+
+
+def get_sent_before(cursor: Optional[str]):
+    if not cursor:
+        return true()
+
+    sent_on, file_log_id = decode_cursor(cursor)
+    return tuple_(FileLogs.sent_on, FileLogs.id) < tuple_(sent_on, file_log_id)
+
+
+async def get_files_actitvity(
+    db, user_email: str, cursor: Optional[str] = None, limit: Optional[int] = None
+) -> Tuple[list, Optional[str]]:
+    page_size = get_page_size(limit, ACTIVITY_PAGE_SIZE)
+    sent_before = get_sent_before(cursor)
+
+    def get_activity_logs(*criteria):
+        return (
+            select(
+                FileLogs.id,
+                FileLogs.sent_on,
+                FileLogs.from_email,
+                FileLogs.to_email,
+                FileLogs.is_anonymous,
+            )
+            .where(sent_before, *criteria)
+            .order_by(FileLogs.sent_on.desc(), FileLogs.id.desc())
+            .limit(page_size + 1)
+            .subquery()
+        )
+
+    activity_logs = union_all(
+        select(get_activity_logs(FileLogs.from_email == user_email)),
+        select(
+            get_activity_logs(
+                FileLogs.to_email == user_email, FileLogs.from_email != user_email
+            )
+        ),
+    ).subquery()
+    file_logs, next_cursor = get_page(
+        (
+            await db.execute(
+                select(activity_logs)
+                .order_by(activity_logs.c.sent_on.desc(), activity_logs.c.id.desc())
+                .limit(page_size + 1)
+            )
+        ).all(),
+        page_size,
     )
+
     return [
         ActivitiesResponse(
             email=(
@@ -218,29 +820,38 @@ def get_files_actitvity(user_email: str):
             type="send" if file_log.from_email == user_email else "receive",
         ).model_dump()
         for file_log in file_logs
-    ]
-
-
-def retrieve_received_files(user_email: str) -> str:
-    db = next(get_db_session())
-    file_logs = (
-        db.query(
-            FileLogs.name,
-            FileLogs.size,
-            FileLogs.sent_on,
-            FileLogs.from_email,
-            FileLogs.expiry,
-            FileLogs.is_anonymous,
-            FileLogs.updated_download_count,
-            FileLogs.public_id,
-        )
-        .filter(
-            FileLogs.to_email == user_email,
-            FileLogs.status == "active",
-            FileLogs.expiry > datetime.now(),
-        )
-        .order_by(FileLogs.sent_on.desc())
-        .all()
+    ], next_cursor
+
+
+async def retrieve_received_files(
+    db, user_email: str, cursor: Optional[str] = None, limit: Optional[int] = None
+) -> Tuple[list, Optional[str]]:
+    page_size = get_page_size(limit, LISTING_PAGE_SIZE)
+    file_logs, next_cursor = get_page(
+        (
+            await db.execute(
+                select(
+                    FileLogs.id,
+                    FileLogs.name,
+                    FileLogs.size,
+                    FileLogs.sent_on,
+                    FileLogs.from_email,
+                    FileLogs.expiry,
+                    FileLogs.is_anonymous,
+                    FileLogs.updated_download_count,
+                    FileLogs.public_id,
+                )
+                .where(
+                    FileLogs.to_email == user_email,
+                    FileLogs.status == "active",
+                    FileLogs.expiry > datetime.now(),
+                    get_sent_before(cursor),
+                )
+                .order_by(FileLogs.sent_on.desc(), FileLogs.id.desc())
+                .limit(page_size + 1)
+            )
+        ).all(),
+        page_size,
     )
 
     return [
@@ -254,29 +865,38 @@ def retrieve_received_files(user_email: str) -> str:
             file_id=file_log.public_id,
         ).model_dump()
         for file_log in file_logs
-    ]
-
-
-def retrieve_shared_files(user_email: str) -> str:
-    db = next(get_db_session())
-    file_logs = (
-        db.query(
-            FileLogs.name,
-            FileLogs.size,
-            FileLogs.sent_on,
-            FileLogs.to_email,
-            FileLogs.expiry,
-            FileLogs.is_anonymous,
-            FileLogs.download_count,
-            FileLogs.public_id,
-        )
-        .filter(
-            FileLogs.from_email == user_email,
-            FileLogs.status == "active",
-            FileLogs.expiry > datetime.now(),
-        )
-        .order_by(FileLogs.sent_on.desc())
-        .all()
+    ], next_cursor
+
+
+async def retrieve_shared_files(
+    db, user_email: str, cursor: Optional[str] = None, limit: Optional[int] = None
+) -> Tuple[list, Optional[str]]:
+    page_size = get_page_size(limit, LISTING_PAGE_SIZE)
+    file_logs, next_cursor = get_page(
+        (
+            await db.execute(
+                select(
+                    FileLogs.id,
+                    FileLogs.name,
+                    FileLogs.size,
+                    FileLogs.sent_on,
+                    FileLogs.to_email,
+                    FileLogs.expiry,
+                    FileLogs.is_anonymous,
+                    FileLogs.download_count,
+                    FileLogs.public_id,
+                )
+                .where(
+                    FileLogs.from_email == user_email,
+                    FileLogs.status == "active",
+                    FileLogs.expiry > datetime.now(),
+                    get_sent_before(cursor),
+                )
+                .order_by(FileLogs.sent_on.desc(), FileLogs.id.desc())
+                .limit(page_size + 1)
+            )
+        ).all(),
+        page_size,
     )
 
     return [
@@ -290,4 +910,4 @@ def retrieve_shared_files(user_email: str) -> str:
             file_id=file_log.public_id,
         ).model_dump()
         for file_log in file_logs
-    ]
+    ], next_cursor
@@ -0,0 +1,160 @@
+import os
+
+from collections import Counter
+from dotenv import load_dotenv
+from datetime import datetime, timedelta, timezone
+from sqlalchemy import delete, insert, or_, select, update
+
+from app.db.db_session import db_session_scope
+from app.models.db_models import DeletedBlobs, Files, FileKeys, FileLogs
+from app.services.periodic_task import PeriodicTask
+from app.storage.blob_store import resolve_pointer
+
+load_dotenv()
+
+FILE_SWEEP_INTERVAL = int(os.getenv("FILE_SWEEP_INTERVAL", 5 * 60))
+FILE_SWEEP_BATCH_SIZE = int(os.getenv("FILE_SWEEP_BATCH_SIZE", 500))
+FILE_SWEEP_GRACE = int(os.getenv("FILE_SWEEP_GRACE", 2 * 60 * 60))
+
+
+def retire_file_logs(db, status: str, *conditions) -> int:
+    batch_size = max(FILE_SWEEP_BATCH_SIZE, 1)
+    retired = 0
+    while True:
+        batch = (
+            select(FileLogs.id)
+            .where(FileLogs.status == "active", *conditions)
+            .order_by(FileLogs.id)
+            .limit(batch_size)
+        )
+        file_ids = (
+            db.execute(
+                update(FileLogs)
+                .where(FileLogs.id.in_(batch), FileLogs.status == "active")
+                .values(status=status, updated_at=datetime.now(timezone.utc))
+                .returning(FileLogs.file_id)
+                .execution_options(synchronize_session=False)
+            )
+            .scalars()
+            .all()
+        )
+        for file_id, count in Counter(file_ids).items():
+            db.execute(
+                update(Files)
+                .where(Files.file_id == file_id)
+                .values(ref_count=Files.ref_count - count)
+                .execution_options(synchronize_session=False)
+            )
+        db.commit()
+
+        retired += len(file_ids)
+        if len(file_ids) < batch_size:
+            return retired
+
+
+def delete_unreferenced_files(db) -> int:
+    batch_size = max(FILE_SWEEP_BATCH_SIZE, 1)
+    deleted_files = 0
+    while True:
+        batch = (
+            select(Files.id)
+            .where(Files.ref_count <= 0)
+            .order_by(Files.id)
+            .limit(batch_size)
+        )
+        files = db.execute(
+            delete(Files)
+            .where(Files.id.in_(batch), Files.ref_count <= 0)
+            .returning(Files.file_id, Files.storage_pointer, Files.size)
+            .execution_options(synchronize_session=False)
+        ).all()
+        if files:
+            db.execute(
+                delete(FileKeys)
+                .where(FileKeys.file_id.in_([file.file_id for file in files]))
+                .execution_options(synchronize_session=False)
+            )
+        deleted_blobs = [
+            {
+                "file_id": file.file_id,
+                "storage_pointer": file.storage_pointer,
+                "size": file.size,
+            }
+            for file in files
+            if file.storage_pointer
+        ]
+        if deleted_blobs:
+            db.execute(insert(DeletedBlobs), deleted_blobs)
+        db.commit()
+
+        deleted_files += len(files)
+        if len(files) < batch_size:
+            return deleted_files
+
+
+def delete_blobs(db) -> dict:
+    batch_size = max(FILE_SWEEP_BATCH_SIZE, 1)
+    deleted_blobs, reclaimed_bytes, last_id = 0, 0, 0
+    while True:
+        blob_ids = (
+            db.execute(
+                select(DeletedBlobs.id)
+                .where(DeletedBlobs.id > last_id)
+                .order_by(DeletedBlobs.id)
+                .limit(batch_size)
+            )
+            .scalars()
+            .all()
+        )
+        db.commit()
+
+        # Each blob is removed while its row is locked, so an upload of the same
+        # content waits for the removal before it writes the blob again.
+        for blob_id in blob_ids:
+            blob = db.execute(
+                delete(DeletedBlobs)
+                .where(DeletedBlobs.id == blob_id)
+                .returning(DeletedBlobs.storage_pointer, DeletedBlobs.size)
+            ).first()
+            if blob:
+                store, key = resolve_pointer(blob.storage_pointer)
+                try:
+                    store.delete(key)
+                except Exception as error:
+                    print(f"Error deleting blob {key}: {error}")
+                    db.rollback()
+                    continue
+                deleted_blobs += 1
+                reclaimed_bytes += blob.size or 0
+            db.commit()
+
+        if len(blob_ids) < batch_size:
+            return {"deletedBlobs": deleted_blobs, "reclaimedBytes": reclaimed_bytes}
+        last_id = blob_ids[-1]
+
+
+def sweep_files() -> dict:
+    with db_session_scope() as db:
+        expired_logs = retire_file_logs(
+            db, "expired", FileLogs.expiry <= datetime.now(timezone.utc)
+        )
+        exhausted_logs = retire_file_logs(
+            db,
+            "exhausted",
+            FileLogs.updated_download_count < 1,
+            or_(
+                FileLogs.updated_at.is_(None),
+                FileLogs.updated_at
+                < datetime.now(timezone.utc) - timedelta(seconds=FILE_SWEEP_GRACE),
+            ),
+        )
+
+        return {
+            "expiredLogs": expired_logs,
+            "exhaustedLogs": exhausted_logs,
+            "deletedFiles": delete_unreferenced_files(db),
+            **delete_blobs(db),
+        }
+
+
+file_sweeper = PeriodicTask("file-sweeper", FILE_SWEEP_INTERVAL, sweep_files)
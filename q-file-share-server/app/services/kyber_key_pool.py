@@ -0,0 +1,123 @@
+import os
+import time
+import threading
+
+from collections import deque
+from dotenv import load_dotenv
+from typing import Deque, Optional
+
+from app.quantum_protocols.kyber import Kyber
+from app.services.crypto_executor import crypto_executor
+
+load_dotenv()
+
+KYBER_KEY_POOL_SIZE = int(os.getenv("KYBER_KEY_POOL_SIZE", 32))
+KYBER_KEY_POOL_LOW_WATER_MARK = int(os.getenv("KYBER_KEY_POOL_LOW_WATER_MARK", 8))
+
+
+class KyberKeyPool:
+    def __init__(self, size: int, low_water_mark: int):
+        self.size = max(size, 0)
+        self.low_water_mark = min(max(low_water_mark, 0), self.size)
+        self._key_pairs: Deque[dict] = deque()
+        self._condition = threading.Condition()
+        self._worker: Optional[threading.Thread] = None
+        self._running = False
+        self.served = 0
+        self.misses = 0
+        self.generated = 0
+        self.total_refill_seconds = 0.0
+        self.last_refill_seconds = 0.0
+
+    def start(self) -> None:
+        if self.size < 1:
+            return
+
+        with self._condition:
+            if self._running:
+                return
+            self._running = True
+
+        self._worker = threading.Thread(
+            target=self._refill_forever, name="kyber-key-pool", daemon=True
+        )
+        self._worker.start()
+
+    def stop(self) -> None:
+        with self._condition:
+            self._running = False
+            self._condition.notify_all()
+
+        if self._worker:
+            self._worker.join()
+            self._worker = None
+
+    def acquire(self) -> Optional[dict]:
+        with self._condition:
+            key_pair = self._key_pairs.popleft() if self._key_pairs else None
+            if key_pair:
+                self.served += 1
+            else:
+                self.misses += 1
+
+            if len(self._key_pairs) <= self.low_water_mark:
+                self._condition.notify()
+
+        return key_pair
+
+    def stats(self) -> dict:
+        with self._condition:
+            return {
+                "depth": len(self._key_pairs),
+                "size": self.size,
+                "low_water_mark": self.low_water_mark,
+                "served": self.served,
+                "misses": self.misses,
+                "generated": self.generated,
+                "last_refill_seconds": self.last_refill_seconds,
+                "average_refill_seconds": (
+                    self.total_refill_seconds / self.generated
+                    if self.generated
+                    else 0.0
+                ),
+            }
+
+    def _generate_key_pair(self) -> dict:
+        started_at = time.perf_counter()
+        key_pair = crypto_executor.call(Kyber().generate_key_pair)
+        elapsed = time.perf_counter() - started_at
+
+        with self._condition:
+            self.generated += 1
+            self.total_refill_seconds += elapsed
+            self.last_refill_seconds = elapsed
+
+        return key_pair
+
+    def _refill_forever(self) -> None:
+        while True:
+            with self._condition:
+                self._condition.wait_for(
+                    lambda: not self._running
+                    or len(self._key_pairs) <= self.low_water_mark
+                )
+                if not self._running:
+                    return
+
+            while True:
+                with self._condition:
+                    if not self._running or len(self._key_pairs) >= self.size:
+                        break
+
+                try:
+                    key_pair = self._generate_key_pair()
+                except Exception as error:
+                    print(f"Error refilling Kyber key pool: {error}")
+                    time.sleep(1)
+                    continue
+
+                with self._condition:
+                    self._key_pairs.append(key_pair)
+
+
+kyber_key_pool = KyberKeyPool(KYBER_KEY_POOL_SIZE, KYBER_KEY_POOL_LOW_WATER_MARK)
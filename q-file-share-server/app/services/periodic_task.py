@@ -0,0 +1,49 @@
+import threading
+
+from typing import Callable, Optional
+
+
+class PeriodicTask:
+    def __init__(self, name: str, interval: float, function: Callable[[], object]):
+        self.name = name
+        self.interval = interval
+        self.function = function
+        self._stopped = threading.Event()
+        self._worker: Optional[threading.Thread] = None
+        self.runs = 0
+        self.last_result = None
+
+    def start(self) -> None:
+        if self.interval <= 0 or self._worker:
+            return
+
+        self._stopped.clear()
+        self._worker = threading.Thread(
+            target=self._run_forever, name=self.name, daemon=True
+        )
+        self._worker.start()
+
+    def stop(self) -> None:
+        self._stopped.set()
+        if self._worker:
+            self._worker.join(timeout=5)
+            self._worker = None
+
+    def run_once(self):
+        try:
+            self.last_result = self.function()
+        except Exception as error:
+            print(f"Error in {self.name}: {error}")
+        self.runs += 1
+        return self.last_result
+
+    def stats(self) -> dict:
+        return {
+            "interval": self.interval,
+            "runs": self.runs,
+            "lastResult": self.last_result,
+        }
+
+    def _run_forever(self) -> None:
+        while not self._stopped.wait(self.interval):
+            self.run_once()
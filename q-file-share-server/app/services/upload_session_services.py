@@ -0,0 +1,346 @@
+import os
+import asyncio
+import numpy as np
+
+from dotenv import load_dotenv
+from fastapi import HTTPException, UploadFile
+from datetime import datetime, timezone, timedelta
+from sqlalchemy import delete, select, update
+from sqlalchemy.exc import IntegrityError
+from typing import AsyncIterator, List, Optional
+
+from app.db.db_session import db_session_scope
+from app.models.db_models import UploadChunks, UploadSessions
+from app.models.dto import FileUploadDTO, UploadSessionDTO
+from app.quantum_protocols.kyber import Kyber
+from app.services.crypto_executor import crypto_executor
+from app.services.file_services import process_upload_files, validate_upload_recipient
+from app.services.periodic_task import PeriodicTask
+from app.utils.file_handler import get_file_hash_key, unwrap_data_key, wrap_data_key
+from app.utils.wire_format import decode_kyber_ciphertext
+
+load_dotenv()
+
+UPLOAD_SESSION_CHUNK_SIZE = int(os.getenv("UPLOAD_SESSION_CHUNK_SIZE", 8 * 1024 * 1024))
+UPLOAD_SESSION_MAX_SIZE = int(os.getenv("UPLOAD_SESSION_MAX_SIZE", 16 * 1024**3))
+UPLOAD_SESSION_TTL = int(os.getenv("UPLOAD_SESSION_TTL", 24 * 60 * 60))
+UPLOAD_SESSION_GC_INTERVAL = int(os.getenv("UPLOAD_SESSION_GC_INTERVAL", 15 * 60))
+UPLOAD_STAGING_PATH = os.getenv("UPLOAD_STAGING_PATH", "storage/uploads")
+
+
+def get_staging_path(upload_id: str) -> str:
+    return os.path.join(UPLOAD_STAGING_PATH, f"{upload_id}.part")
+
+
+def write_staged_chunk(upload_id: str, offset: int, chunk_data: bytes) -> None:
+    with open(get_staging_path(upload_id), "r+b") as staged_file:
+        staged_file.seek(offset)
+        staged_file.write(chunk_data)
+
+
+def remove_staged_file(upload_id: str) -> None:
+    try:
+        os.remove(get_staging_path(upload_id))
+    except FileNotFoundError:
+        pass
+
+
+async def get_upload_session(db, upload_id: str, user_email: str) -> UploadSessions:
+    upload_session = await db.scalar(
+        select(UploadSessions).where(
+            UploadSessions.public_id == upload_id,
+            UploadSessions.user_email == user_email,
+        )
+    )
+    if not upload_session:
+        raise HTTPException(status_code=404, detail="Upload session not found")
+
+    return upload_session
+
+
+async def get_received_ranges(db, session_id: int) -> List[List[int]]:
+    received_ranges: List[List[int]] = []
+    for offset, size in await db.execute(
+        select(UploadChunks.offset, UploadChunks.size)
+        .where(UploadChunks.session_id == session_id)
+        .order_by(UploadChunks.offset)
+    ):
+        if received_ranges and received_ranges[-1][1] == offset:
+            received_ranges[-1][1] += size
+        else:
+            received_ranges.append([offset, offset + size])
+
+    return received_ranges
+
+
+async def get_upload_session_details(db, upload_session: UploadSessions) -> dict:
+    return {
+        "uploadId": upload_session.public_id,
+        "chunkSize": upload_session.chunk_size,
+        "totalSize": upload_session.total_size,
+        "status": upload_session.status,
+        "receivedRanges": await get_received_ranges(db, upload_session.id),
+    }
+
+
+async def remove_upload_session(db, session_id: int, upload_id: str) -> None:
+    await db.execute(delete(UploadChunks).where(UploadChunks.session_id == session_id))
+    await db.execute(delete(UploadSessions).where(UploadSessions.id == session_id))
+    await db.commit()
+
+    remove_staged_file(upload_id)
+
+
+async def create_upload_session(
+    db, upload_session_dto: UploadSessionDTO, secret_key: list, user_email: str
+) -> dict:
+    try:
+        await validate_upload_recipient(
+            db, upload_session_dto.recipient_email, user_email
+        )
+
+        total_size = upload_session_dto.total_size
+        if total_size < 16 or total_size % 16:
+            raise ValueError("Invalid upload size")
+        if total_size > UPLOAD_SESSION_MAX_SIZE:
+            raise ValueError("Upload exceeds the maximum size")
+
+        kyber = Kyber()
+        uv_kyber_key = decode_kyber_ciphertext(upload_session_dto.kyber_key)
+        shared_key = await crypto_executor.run(
+            kyber.cpa_decrypt, secret_key, uv_kyber_key
+        )
+
+        file_upload_dto = FileUploadDTO(
+            init_vectors=[upload_session_dto.init_vector],
+            file_names=[upload_session_dto.file_name],
+            file_sizes=[upload_session_dto.file_size],
+            file_types=[upload_session_dto.file_type],
+            file_signatures=[upload_session_dto.file_signature],
+            dl_public_key=upload_session_dto.dl_public_key,
+            kyber_key=upload_session_dto.kyber_key,
+            recipient_email=upload_session_dto.recipient_email,
+            expiration=upload_session_dto.expiration,
+            download_count=upload_session_dto.download_count,
+            anonymous=upload_session_dto.anonymous,
+        )
+        now = datetime.now(timezone.utc)
+        upload_session = UploadSessions(
+            user_email=user_email,
+            upload_details=file_upload_dto.model_dump_json(),
+            wrapped_shared_key=wrap_data_key(
+                np.packbits(np.asarray(shared_key, dtype=np.uint8)).tobytes(),
+                get_file_hash_key(upload_session_dto.recipient_email, user_email),
+            ),
+            total_size=total_size,
+            chunk_size=UPLOAD_SESSION_CHUNK_SIZE,
+            status="open",
+            created_at=now,
+            updated_at=now,
+        )
+
+        os.makedirs(UPLOAD_STAGING_PATH, exist_ok=True)
+        db.add(upload_session)
+        await db.commit()
+        await db.refresh(upload_session)
+        open(get_staging_path(upload_session.public_id), "wb").close()
+
+        return await get_upload_session_details(db, upload_session)
+
+    except ValueError as error:
+        await db.rollback()
+        raise ValueError(str(error))
+    except HTTPException as error:
+        await db.rollback()
+        raise error
+    except Exception as error:
+        await db.rollback()
+        raise HTTPException(status_code=400, detail=str(error))
+
+
+async def write_upload_chunk(
+    db,
+    upload_id: str,
+    chunk_number: int,
+    offset: Optional[int],
+    chunks: AsyncIterator[bytes],
+    user_email: str,
+) -> dict:
+    try:
+        upload_session = await get_upload_session(db, upload_id, user_email)
+        if upload_session.status != "open":
+            raise HTTPException(status_code=409, detail="Upload session is not open")
+
+        chunk_offset = chunk_number * upload_session.chunk_size
+        chunk_size = min(
+            upload_session.chunk_size, upload_session.total_size - chunk_offset
+        )
+        if chunk_number < 0 or chunk_size <= 0:
+            raise ValueError("Invalid chunk number")
+        if offset is not None and offset != chunk_offset:
+            raise ValueError("Chunk offset does not match the chunk number")
+
+        chunk_data = bytearray()
+        async for data in chunks:
+            chunk_data += data
+            if len(chunk_data) > chunk_size:
+                raise ValueError("Chunk is larger than expected")
+        if len(chunk_data) != chunk_size:
+            raise ValueError("Chunk is smaller than expected")
+
+        writable = (
+            await db.execute(
+                update(UploadSessions)
+                .where(
+                    UploadSessions.id == upload_session.id,
+                    UploadSessions.status == "open",
+                )
+                .values(updated_at=datetime.now(timezone.utc))
+                .execution_options(synchronize_session=False)
+            )
+        ).rowcount
+        if not writable:
+            await db.rollback()
+            raise HTTPException(status_code=409, detail="Upload session is not open")
+
+        await asyncio.to_thread(write_staged_chunk, upload_id, chunk_offset, chunk_data)
+
+        chunk_exists = await db.scalar(
+            select(UploadChunks.id).where(
+                UploadChunks.session_id == upload_session.id,
+                UploadChunks.chunk_number == chunk_number,
+            )
+        )
+        if not chunk_exists:
+            db.add(
+                UploadChunks(
+                    session_id=upload_session.id,
+                    chunk_number=chunk_number,
+                    offset=chunk_offset,
+                    size=chunk_size,
+                )
+            )
+        try:
+            await db.commit()
+        except IntegrityError:
+            await db.rollback()
+        await db.refresh(upload_session)
+
+        return await get_upload_session_details(db, upload_session)
+
+    except ValueError as error:
+        raise ValueError(str(error))
+    except HTTPException as error:
+        raise error
+    except Exception as error:
+        await db.rollback()
+        raise HTTPException(status_code=400, detail=str(error))
+
+
+async def get_upload_session_status(db, upload_id: str, user_email: str) -> dict:
+    upload_session = await get_upload_session(db, upload_id, user_email)
+
+    return await get_upload_session_details(db, upload_session)
+
+
+async def finalize_upload_session(db, upload_id: str, user_email: str) -> List[str]:
+    upload_session = await get_upload_session(db, upload_id, user_email)
+    session_id = upload_session.id
+
+    claimed = (
+        await db.execute(
+            update(UploadSessions)
+            .where(UploadSessions.id == session_id, UploadSessions.status == "open")
+            .values(status="finalizing", updated_at=datetime.now(timezone.utc))
+            .execution_options(synchronize_session=False)
+        )
+    ).rowcount
+    await db.commit()
+    if not claimed:
+        raise HTTPException(status_code=409, detail="Upload session is not open")
+
+    try:
+        received_ranges = await get_received_ranges(db, session_id)
+        if received_ranges != [[0, upload_session.total_size]]:
+            raise ValueError("Upload is incomplete")
+
+        file_upload_dto = FileUploadDTO.model_validate_json(
+            upload_session.upload_details
+        )
+        shared_key = np.unpackbits(
+            np.frombuffer(
+                unwrap_data_key(
+                    upload_session.wrapped_shared_key,
+                    get_file_hash_key(file_upload_dto.recipient_email, user_email),
+                ),
+                dtype=np.uint8,
+            )
+        ).tolist()
+
+        with open(get_staging_path(upload_id), "rb") as staged_file:
+            rejected_files = await process_upload_files(
+                db,
+                [UploadFile(file=staged_file, filename=file_upload_dto.file_names[0])],
+                file_upload_dto,
+                None,
+                user_email,
+                shared_key,
+            )
+    except Exception:
+        await db.execute(
+            update(UploadSessions)
+            .where(UploadSessions.id == session_id)
+            .values(status="open")
+            .execution_options(synchronize_session=False)
+        )
+        await db.commit()
+        raise
+
+    await remove_upload_session(db, session_id, upload_id)
+    return rejected_files
+
+
+async def delete_upload_session(db, upload_id: str, user_email: str) -> None:
+    upload_session = await get_upload_session(db, upload_id, user_email)
+    if upload_session.status != "open":
+        raise HTTPException(status_code=409, detail="Upload session is not open")
+
+    await remove_upload_session(db, upload_session.id, upload_id)
+
+
+def collect_abandoned_upload_sessions() -> int:
+    cutoff = datetime.now(timezone.utc) - timedelta(seconds=UPLOAD_SESSION_TTL)
+    with db_session_scope() as db:
+        upload_sessions = (
+            db.query(UploadSessions).filter(UploadSessions.updated_at < cutoff).all()
+        )
+        for upload_session in upload_sessions:
+            upload_id = upload_session.public_id
+            db.query(UploadChunks).filter(
+                UploadChunks.session_id == upload_session.id
+            ).delete(synchronize_session=False)
+            db.delete(upload_session)
+            db.commit()
+            remove_staged_file(upload_id)
+
+        if os.path.isdir(UPLOAD_STAGING_PATH):
+            upload_ids = {
+                public_id for (public_id,) in db.query(UploadSessions.public_id)
+            }
+            for entry in os.scandir(UPLOAD_STAGING_PATH):
+                upload_id = entry.name.removesuffix(".part")
+                if (
+                    entry.is_file()
+                    and upload_id not in upload_ids
+                    and entry.stat().st_mtime < cutoff.timestamp()
+                ):
+                    os.remove(entry.path)
+
+        return len(upload_sessions)
+
+
+upload_session_collector = PeriodicTask(
+    "upload-session-collector",
+    UPLOAD_SESSION_GC_INTERVAL,
+    collect_abandoned_upload_sessions,
+)
@@ -0,0 +1,44 @@
+from abc import ABC, abstractmethod
+from typing import BinaryIO, Iterator, Optional
+
+
+class BlobStore(ABC):
+    name = ""
+
+    @abstractmethod
+    def put(self, key: str, file_obj: BinaryIO) -> str:
+        pass
+
+    @abstractmethod
+    def exists(self, key: str) -> bool:
+        pass
+
+    @abstractmethod
+    def open(self, key: str) -> BinaryIO:
+        pass
+
+    @abstractmethod
+    def delete(self, key: str) -> None:
+        pass
+
+    def get_path(self, key: str) -> Optional[str]:
+        return None
+
+    def get_pointer(self, key: str) -> str:
+        return f"{self.name}:{key}"
+
+    def read_chunks(
+        self, key: str, chunk_size: int, offset: int = 0, length: Optional[int] = None
+    ) -> Iterator[bytes]:
+        with self.open(key) as blob:
+            blob.seek(offset)
+            remaining = length
+            while remaining is None or remaining > 0:
+                chunk = blob.read(
+                    chunk_size if remaining is None else min(chunk_size, remaining)
+                )
+                if not chunk:
+                    break
+                if remaining is not None:
+                    remaining -= len(chunk)
+                yield chunk
@@ -0,0 +1,46 @@
+import os
+
+from dotenv import load_dotenv
+from typing import Dict, Optional, Tuple
+
+from app.storage.base import BlobStore
+from app.storage.local import LocalBlobStore
+
+load_dotenv()
+
+BLOB_STORE_BACKEND = os.getenv("BLOB_STORE_BACKEND", "local")
+
+BLOB_STORE_PATH = os.getenv("BLOB_STORE_PATH", "storage/blobs")
+
+BLOB_STORE_BACKENDS = {
+    "local": lambda: LocalBlobStore(BLOB_STORE_PATH),
+}
+
+_blob_stores: Dict[str, BlobStore] = {}
+
+
+def get_blob_store(name: str = BLOB_STORE_BACKEND) -> BlobStore:
+    if name not in _blob_stores:
+        if name not in BLOB_STORE_BACKENDS:
+            raise ValueError(f"Unsupported blob store backend: {name}")
+        _blob_stores[name] = BLOB_STORE_BACKENDS[name]()
+
+    return _blob_stores[name]
+
+
+def resolve_pointer(pointer: str) -> Tuple[BlobStore, str]:
+    name, _, key = pointer.partition(":")
+    return get_blob_store(name), key
+
+
+def get_pointer_path(pointer: Optional[str]) -> Optional[str]:
+    if not pointer:
+        return None
+
+    store, key = resolve_pointer(pointer)
+    path = store.get_path(key)
+
+    return path if path and os.path.isfile(path) else None
+
+
+blob_store = get_blob_store()
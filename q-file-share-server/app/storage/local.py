@@ -0,0 +1,58 @@
+import os
+import re
+import shutil
+import tempfile
+
+from typing import BinaryIO, Optional
+
+from app.storage.base import BlobStore
+
+BLOB_KEY_PATTERN = re.compile(r"^[0-9a-f]{8,128}$")
+
+COPY_CHUNK_SIZE = 1024 * 1024
+
+
+class LocalBlobStore(BlobStore):
+    name = "local"
+
+    def __init__(self, root: str):
+        self.root = os.path.abspath(root)
+
+    def get_path(self, key: str) -> Optional[str]:
+        if not BLOB_KEY_PATTERN.match(key):
+            raise ValueError("Invalid blob key.")
+
+        return os.path.join(self.root, key[:2], key[2:4], key)
+
+    def put(self, key: str, file_obj: BinaryIO) -> str:
+        path = self.get_path(key)
+        directory = os.path.dirname(path)
+        os.makedirs(directory, exist_ok=True)
+
+        temp_file = tempfile.NamedTemporaryFile(
+            dir=directory, prefix=".tmp-", delete=False
+        )
+        try:
+            with temp_file:
+                shutil.copyfileobj(file_obj, temp_file, COPY_CHUNK_SIZE)
+                temp_file.flush()
+                os.fsync(temp_file.fileno())
+            os.replace(temp_file.name, path)
+        except BaseException:
+            if os.path.exists(temp_file.name):
+                os.remove(temp_file.name)
+            raise
+
+        return self.get_pointer(key)
+
+    def exists(self, key: str) -> bool:
+        return os.path.isfile(self.get_path(key))
+
+    def open(self, key: str) -> BinaryIO:
+        return open(self.get_path(key), "rb")
+
+    def delete(self, key: str) -> None:
+        try:
+            os.remove(self.get_path(key))
+        except FileNotFoundError:
+            pass
@@ -0,0 +1,104 @@
+import io
+import argparse
+
+from sqlalchemy import inspect, text
+
+from app.db.config import SessionLocal, engine
+from app.models.db_models import Files, FileLogs
+from app.storage.blob_store import get_blob_store
+
+
+def upgrade_files_table(bind=engine) -> None:
+    columns = {column["name"]: column for column in inspect(bind).get_columns("Files")}
+
+    with bind.begin() as connection:
+        if "storage_pointer" not in columns:
+            connection.execute(
+                text('ALTER TABLE "Files" ADD COLUMN storage_pointer VARCHAR')
+            )
+        if bind.dialect.name == "postgresql" and not columns["file_data"]["nullable"]:
+            connection.execute(
+                text('ALTER TABLE "Files" ALTER COLUMN file_data DROP NOT NULL')
+            )
+        if "size" not in columns:
+            connection.execute(text('ALTER TABLE "Files" ADD COLUMN size BIGINT'))
+            connection.execute(text('UPDATE "Files" SET size = length(file_data)'))
+        if "ref_count" not in columns:
+            connection.execute(
+                text(
+                    'ALTER TABLE "Files" ADD COLUMN ref_count INTEGER NOT NULL DEFAULT 0'
+                )
+            )
+            connection.execute(
+                text(
+                    'UPDATE "Files" SET ref_count = (SELECT count(*) FROM "FileLogs" '
+                    'WHERE "FileLogs".file_id = "Files".file_id)'
+                )
+            )
+        if "codec" not in columns:
+            connection.execute(text('ALTER TABLE "Files" ADD COLUMN codec VARCHAR'))
+        if "original_size" not in columns:
+            connection.execute(
+                text('ALTER TABLE "Files" ADD COLUMN original_size BIGINT')
+            )
+        if "storage_format" not in columns:
+            connection.execute(
+                text('ALTER TABLE "Files" ADD COLUMN storage_format VARCHAR')
+            )
+
+
+def upgrade_indexes(bind=engine) -> None:
+    for index in FileLogs.__table__.indexes:
+        index.create(bind, checkfirst=True)
+
+
+def migrate_blobs(backend: str, dry_run: bool = False) -> int:
+    store = get_blob_store(backend)
+    db = SessionLocal()
+    migrated = 0
+    try:
+        file_ids = [
+            file_id
+            for (file_id,) in db.query(Files.id)
+            .filter(Files.storage_pointer.is_(None), Files.file_data.isnot(None))
+            .order_by(Files.id)
+            .all()
+        ]
+
+        for file_id in file_ids:
+            file = db.query(Files).filter(Files.id == file_id).first()
+            print(f"Moving {file.file_id} ({len(file.file_data)} bytes)")
+            if not dry_run:
+                file.storage_pointer = store.put(
+                    file.file_id, io.BytesIO(file.file_data)
+                )
+                file.size = len(file.file_data)
+                file.file_data = None
+                db.commit()
+            db.expunge(file)
+            migrated += 1
+    finally:
+        db.close()
+
+    return migrated
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(
+        prog="python -m app.storage.migrate",
+        description="Move file blobs stored in the Files table into the blob store.",
+    )
+    parser.add_argument("--backend", default=None)
+    parser.add_argument("--dry-run", action="store_true")
+    arguments = parser.parse_args()
+
+    upgrade_files_table()
+    upgrade_indexes()
+    migrated = migrate_blobs(
+        arguments.backend or get_blob_store().name, arguments.dry_run
+    )
+    print(f"Moved {migrated} blobs" + (" (dry run)" if arguments.dry_run else ""))
+
+
+if __name__ == "__main__":
+    main()
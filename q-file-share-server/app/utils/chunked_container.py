@@ -0,0 +1,136 @@
+import struct
+import secrets
+
+from typing import BinaryIO, Iterable, Iterator
+
+from cryptography.exceptions import InvalidTag
+from cryptography.hazmat.primitives.ciphers.aead import AESGCM
+
+CONTAINER_MAGIC = b"QFC1"
+
+# magic, plaintext chunk size, plaintext size, nonce prefix
+CONTAINER_HEADER = struct.Struct(">4sIQ8s")
+
+CONTAINER_TAG_SIZE = 16
+
+
+def get_chunk_nonce(nonce_prefix: bytes, index: int) -> bytes:
+    return nonce_prefix + struct.pack(">I", index)
+
+
+def get_chunk_aad(index: int, final: bool) -> bytes:
+    return struct.pack(">I?", index, final)
+
+
+def get_chunk_count(plaintext_size: int, chunk_size: int) -> int:
+    return max(-(-plaintext_size // chunk_size), 1)
+
+
+def read_container_header(header: bytes) -> dict:
+    if len(header) < CONTAINER_HEADER.size:
+        raise ValueError("Invalid file container.")
+
+    magic, chunk_size, plaintext_size, nonce_prefix = CONTAINER_HEADER.unpack_from(
+        header
+    )
+    if magic != CONTAINER_MAGIC or chunk_size < 1:
+        raise ValueError("Invalid file container.")
+
+    return {
+        "chunk_size": chunk_size,
+        "plaintext_size": plaintext_size,
+        "nonce_prefix": nonce_prefix,
+        "chunk_count": get_chunk_count(plaintext_size, chunk_size),
+    }
+
+
+class ChunkedEncryptor:
+    def __init__(self, data_key: bytes, output: BinaryIO, chunk_size: int):
+        self.aesgcm = AESGCM(data_key)
+        self.output = output
+        self.chunk_size = chunk_size
+        self.nonce_prefix = secrets.token_bytes(8)
+        self.buffer = bytearray()
+        self.index = 0
+        self.plaintext_size = 0
+        self.header_offset = output.tell()
+        output.write(bytes(CONTAINER_HEADER.size))
+
+    def update(self, data: bytes) -> None:
+        self.buffer += data
+        self.plaintext_size += len(data)
+
+        offset = 0
+        with memoryview(self.buffer) as buffer_view:
+            while len(self.buffer) - offset > self.chunk_size:
+                self._write_chunk(buffer_view[offset : offset + self.chunk_size], False)
+                offset += self.chunk_size
+        del self.buffer[:offset]
+
+    def finalize(self) -> None:
+        self._write_chunk(bytes(self.buffer), True)
+        self.buffer.clear()
+
+        end_offset = self.output.tell()
+        self.output.seek(self.header_offset)
+        self.output.write(
+            CONTAINER_HEADER.pack(
+                CONTAINER_MAGIC, self.chunk_size, self.plaintext_size, self.nonce_prefix
+            )
+        )
+        self.output.seek(end_offset)
+
+    def _write_chunk(self, chunk: bytes, final: bool) -> None:
+        self.output.write(
+            self.aesgcm.encrypt(
+                get_chunk_nonce(self.nonce_prefix, self.index),
+                bytes(chunk),
+                get_chunk_aad(self.index, final),
+            )
+        )
+        self.index += 1
+
+
+def decrypt_container_chunks(
+    encrypted_chunks: Iterable[bytes], data_key: bytes
+) -> Iterator[bytes]:
+    aesgcm = AESGCM(data_key)
+    buffer = bytearray()
+    header = None
+    index = 0
+
+    def decrypt_chunk(chunk: bytes) -> bytes:
+        final = index == header["chunk_count"] - 1
+        try:
+            return aesgcm.decrypt(
+                get_chunk_nonce(header["nonce_prefix"], index),
+                chunk,
+                get_chunk_aad(index, final),
+            )
+        except InvalidTag:
+            raise ValueError("File integrity check failed.")
+
+    for encrypted_chunk in encrypted_chunks:
+        buffer += encrypted_chunk
+        if header is None:
+            if len(buffer) < CONTAINER_HEADER.size:
+                continue
+            header = read_container_header(bytes(buffer[: CONTAINER_HEADER.size]))
+            del buffer[: CONTAINER_HEADER.size]
+
+        stored_chunk_size = header["chunk_size"] + CONTAINER_TAG_SIZE
+        offset = 0
+        while len(buffer) - offset > stored_chunk_size:
+            yield decrypt_chunk(bytes(buffer[offset : offset + stored_chunk_size]))
+            offset += stored_chunk_size
+            index += 1
+        del buffer[:offset]
+
+    if header is None:
+        raise ValueError("Invalid file container.")
+    if len(buffer) > stored_chunk_size:
+        raise ValueError("File integrity check failed.")
+
+    yield decrypt_chunk(bytes(buffer))
+    if index != header["chunk_count"] - 1:
+        raise ValueError("File integrity check failed.")
@@ -0,0 +1,117 @@
+import os
+import zlib
+import numpy as np
+
+from dotenv import load_dotenv
+from typing import Optional
+
+try:
+    import zstandard
+except ImportError:
+    zstandard = None
+
+load_dotenv()
+
+CODEC_NONE = "none"
+CODEC_ZLIB = "zlib"
+CODEC_ZSTD = "zstd"
+
+CODECS = (CODEC_NONE, CODEC_ZLIB, CODEC_ZSTD)
+
+FILE_COMPRESSION = os.getenv("FILE_COMPRESSION", CODEC_NONE)
+FILE_COMPRESSION_LEVEL = os.getenv("FILE_COMPRESSION_LEVEL")
+COMPRESSION_ENTROPY_THRESHOLD = float(os.getenv("COMPRESSION_ENTROPY_THRESHOLD", 7.5))
+
+COMPRESSION_PROBE_SIZE = 64 * 1024
+
+INCOMPRESSIBLE_TYPE_PREFIXES = (
+    "image/",
+    "video/",
+    "audio/",
+    "font/woff",
+    "application/vnd.openxmlformats-officedocument.",
+    "application/vnd.oasis.opendocument.",
+)
+
+INCOMPRESSIBLE_TYPES = {
+    "application/epub+zip",
+    "application/gzip",
+    "application/java-archive",
+    "application/pdf",
+    "application/vnd.rar",
+    "application/x-7z-compressed",
+    "application/x-bzip2",
+    "application/x-gzip",
+    "application/x-rar-compressed",
+    "application/x-xz",
+    "application/zip",
+    "application/zstd",
+}
+
+COMPRESSIBLE_TYPES = {
+    "audio/wav",
+    "audio/x-wav",
+    "image/bmp",
+    "image/svg+xml",
+    "image/tiff",
+    "image/x-ms-bmp",
+}
+
+if FILE_COMPRESSION not in CODECS:
+    raise ValueError(f"Invalid file compression codec: {FILE_COMPRESSION}")
+if FILE_COMPRESSION == CODEC_ZSTD and zstandard is None:
+    print("Error loading zstandard: package not installed, using zlib instead")
+    FILE_COMPRESSION = CODEC_ZLIB
+
+
+def is_compressible_type(file_type: str) -> bool:
+    file_type = (file_type or "").split(";")[0].strip().lower()
+    if file_type in COMPRESSIBLE_TYPES:
+        return True
+
+    return file_type not in INCOMPRESSIBLE_TYPES and not file_type.startswith(
+        INCOMPRESSIBLE_TYPE_PREFIXES
+    )
+
+
+def get_entropy(sample: bytes) -> float:
+    if not sample:
+        return 0.0
+
+    counts = np.bincount(np.frombuffer(sample, dtype=np.uint8), minlength=256)
+    probabilities = counts[counts > 0] / len(sample)
+
+    return float(-(probabilities * np.log2(probabilities)).sum())
+
+
+def choose_codec(file_type: str, sample: bytes) -> str:
+    if FILE_COMPRESSION == CODEC_NONE or not is_compressible_type(file_type):
+        return CODEC_NONE
+    if get_entropy(sample[:COMPRESSION_PROBE_SIZE]) > COMPRESSION_ENTROPY_THRESHOLD:
+        return CODEC_NONE
+
+    return FILE_COMPRESSION
+
+
+def get_compressor(codec: str):
+    if codec == CODEC_ZLIB:
+        level = int(FILE_COMPRESSION_LEVEL or 6)
+        return zlib.compressobj(level)
+    if codec == CODEC_ZSTD:
+        level = int(FILE_COMPRESSION_LEVEL or 3)
+        return zstandard.ZstdCompressor(level=level).compressobj()
+
+    return None
+
+
+def get_decompressor(codec: Optional[str]):
+    if codec == CODEC_ZLIB:
+        return zlib.decompressobj()
+    if codec == CODEC_ZSTD:
+        if zstandard is None:
+            raise ValueError("zstd support is not installed.")
+        return zstandard.ZstdDecompressor().decompressobj()
+    if codec not in (None, CODEC_NONE):
+        raise ValueError(f"Unsupported file codec: {codec}")
+
+    return None
@@ -2,123 +2,279 @@ import os
 import base64
 import hashlib
 import secrets
+import tempfile
 
 from dotenv import load_dotenv
 from fastapi import UploadFile
-from typing import Dict
+from typing import BinaryIO, Iterable, Iterator, List, Optional
 
 from cryptography.hazmat.backends import default_backend
 from cryptography.hazmat.primitives import padding
+from cryptography.hazmat.primitives.keywrap import aes_key_unwrap, aes_key_wrap
 from cryptography.hazmat.primitives.ciphers import Cipher, algorithms, modes
 
 from app.quantum_protocols.dilithium import Dilithium
+from app.utils.chunked_container import ChunkedEncryptor, decrypt_container_chunks
+from app.utils.compression import choose_codec, get_compressor, get_decompressor
+from app.utils.merkle import MerkleHasher
 
 load_dotenv()
 
 AES_SECRET_KEY = os.getenv("AES_SECRET_KEY")
 
+SIGNED_SEGMENT_LENGTH = 1024
 
-async def encrypt_file_data(file_data: bytes, hash_key: str) -> dict:
-    if not AES_SECRET_KEY:
-        raise ValueError("Key not found in environment variables.")
+UPLOAD_CHUNK_SIZE = int(os.getenv("UPLOAD_CHUNK_SIZE", 1024 * 1024))
 
-    hash_key_bytes = hash_key.encode("utf-8")
-    aes_secret_key_bytes = AES_SECRET_KEY.encode("utf-8")
+UPLOAD_SPOOL_MAX_SIZE = int(os.getenv("UPLOAD_SPOOL_MAX_SIZE", 8 * 1024 * 1024))
 
-    if len(hash_key_bytes) < 16 or len(aes_secret_key_bytes) < 16:
-        raise ValueError("Invalid key, encryption failed.")
+DOWNLOAD_CHUNK_SIZE = int(os.getenv("DOWNLOAD_CHUNK_SIZE", 1024 * 1024))
 
-    encryption_key = hash_key_bytes[:16] + aes_secret_key_bytes[:16]
-    iv = secrets.token_bytes(16)
+STORAGE_FORMAT_CBC = "cbc"
+STORAGE_FORMAT_CHUNKED = "chunked"
 
-    cipher = Cipher(
-        algorithms.AES(encryption_key), modes.CBC(iv), backend=default_backend()
-    )
-    encryptor = cipher.encryptor()
+STORAGE_FORMAT = os.getenv("STORAGE_FORMAT", STORAGE_FORMAT_CHUNKED)
 
-    padder = padding.PKCS7(algorithms.AES.block_size).padder()
-    padded_file_data = padder.update(file_data) + padder.finalize()
-    encrypted_data = encryptor.update(padded_file_data) + encryptor.finalize()
+STORAGE_CHUNK_SIZE = int(os.getenv("STORAGE_CHUNK_SIZE", 64 * 1024))
 
-    return {
-        "iv": base64.b64encode(iv).decode("utf-8"),
-        "encrypted_file_data": encrypted_data,
-    }
+if STORAGE_FORMAT not in (STORAGE_FORMAT_CBC, STORAGE_FORMAT_CHUNKED):
+    raise ValueError(f"Invalid storage format: {STORAGE_FORMAT}")
 
 
-async def decrypt_file_data(
-    encrypted_file_data: bytes, iv: str, hash_key: str
+async def decrypt_client_file_segment(
+    encrypted_file: UploadFile, init_vector: str, key: list, length: int
 ) -> bytes:
-    if not AES_SECRET_KEY:
-        raise ValueError("Key not found in environment variables.")
+    byte_key = bytes(
+        int("".join(map(str, key[i * 8 : (i + 1) * 8])), 2) for i in range(24)
+    )
+    init_vector_bytes = base64.b64decode(init_vector)
 
-    hash_key_bytes = hash_key.encode("utf-8")
-    aes_secret_key_bytes = AES_SECRET_KEY.encode("utf-8")
+    await encrypted_file.seek(0)
+    encrypted_data = await encrypted_file.read(length)
+    await encrypted_file.seek(0)
+    cipher = Cipher(
+        algorithms.AES(byte_key),
+        modes.CBC(init_vector_bytes),
+        backend=default_backend(),
+    )
+    decryptor = cipher.decryptor()
+    decrypted_file_data = decryptor.update(encrypted_data) + decryptor.finalize()
 
-    if len(hash_key_bytes) < 16 or len(aes_secret_key_bytes) < 16:
-        raise ValueError("Keys must be at least 16 bytes.")
+    return decrypted_file_data
 
-    decryption_key = hash_key_bytes[:16] + aes_secret_key_bytes[:16]
-    iv_bytes = base64.b64decode(iv)
 
-    cipher = Cipher(
-        algorithms.AES(decryption_key), modes.CBC(iv_bytes), backend=default_backend()
+def reencrypt_client_file_data(
+    encrypted_file: BinaryIO,
+    init_vector: str,
+    key: list,
+    data_key: bytes,
+    file_type: str = "",
+    merkle_chunk_size: Optional[int] = None,
+) -> dict:
+    byte_key = bytes(
+        int("".join(map(str, key[i * 8 : (i + 1) * 8])), 2) for i in range(24)
     )
-    decryptor = cipher.decryptor()
 
-    decrypted_padded_data = decryptor.update(encrypted_file_data) + decryptor.finalize()
+    decryptor = Cipher(
+        algorithms.AES(byte_key),
+        modes.CBC(base64.b64decode(init_vector)),
+        backend=default_backend(),
+    ).decryptor()
+    sha3_256 = hashlib.sha3_256()
+    encrypted_file_data = tempfile.SpooledTemporaryFile(max_size=UPLOAD_SPOOL_MAX_SIZE)
+
+    if STORAGE_FORMAT == STORAGE_FORMAT_CHUNKED:
+        chunked_encryptor = ChunkedEncryptor(
+            data_key, encrypted_file_data, STORAGE_CHUNK_SIZE
+        )
+        iv = chunked_encryptor.nonce_prefix
+        write_stored_data = chunked_encryptor.update
+        finalize_stored_data = chunked_encryptor.finalize
+    else:
+        iv = secrets.token_bytes(16)
+        encryptor = Cipher(
+            algorithms.AES(data_key), modes.CBC(iv), backend=default_backend()
+        ).encryptor()
+        padder = padding.PKCS7(algorithms.AES.block_size).padder()
+
+        def write_stored_data(file_data: bytes) -> None:
+            encrypted_file_data.write(encryptor.update(padder.update(file_data)))
+
+        def finalize_stored_data() -> None:
+            encrypted_file_data.write(encryptor.update(padder.finalize()))
+            encrypted_file_data.write(encryptor.finalize())
+
+    merkle_hasher = MerkleHasher(merkle_chunk_size) if merkle_chunk_size else None
+    merkle_tail = b""
+    codec = None
+    compressor = None
+    file_size = 0
+
+    def write_plaintext(file_data: bytes) -> None:
+        nonlocal codec, compressor, file_size, merkle_tail
+        sha3_256.update(file_data)
+        if merkle_hasher:
+            merkle_tail += file_data
+            block_size = algorithms.AES.block_size // 8
+            merkle_hasher.update(merkle_tail[:-block_size])
+            merkle_tail = merkle_tail[-block_size:]
+        file_size += len(file_data)
+        if codec is None and file_data:
+            codec = choose_codec(file_type, file_data)
+            compressor = get_compressor(codec)
+        if compressor:
+            file_data = compressor.compress(file_data)
+        write_stored_data(file_data)
+
+    encrypted_file.seek(0)
+    while chunk := encrypted_file.read(UPLOAD_CHUNK_SIZE):
+        write_plaintext(decryptor.update(chunk))
+    encrypted_file.seek(0)
+
+    write_plaintext(decryptor.finalize())
+    if compressor:
+        write_stored_data(compressor.flush())
+    finalize_stored_data()
+    encrypted_file_size = encrypted_file_data.tell()
+    encrypted_file_data.seek(0)
+
+    merkle_root = None
+    if merkle_hasher:
+        unpadder = padding.PKCS7(algorithms.AES.block_size).unpadder()
+        try:
+            merkle_hasher.update(unpadder.update(merkle_tail) + unpadder.finalize())
+        except ValueError:
+            pass
+        else:
+            merkle_root = merkle_hasher.finalize()
+
+    return {
+        "file_hash": sha3_256.hexdigest(),
+        "iv": base64.b64encode(iv).decode("utf-8"),
+        "encrypted_file_data": encrypted_file_data,
+        "encrypted_file_size": encrypted_file_size,
+        "codec": codec or "none",
+        "file_size": file_size,
+        "storage_format": STORAGE_FORMAT,
+        "merkle_root": merkle_root,
+    }
+
 
+def decrypt_stored_file_chunks(
+    encrypted_file_chunks: Iterable[bytes],
+    iv: str,
+    data_key: bytes,
+    storage_format: Optional[str] = None,
+) -> Iterator[bytes]:
+    if storage_format == STORAGE_FORMAT_CHUNKED:
+        yield from decrypt_container_chunks(encrypted_file_chunks, data_key)
+        return
+    if storage_format not in (None, STORAGE_FORMAT_CBC):
+        raise ValueError(f"Unsupported storage format: {storage_format}")
+
+    decryptor = Cipher(
+        algorithms.AES(data_key),
+        modes.CBC(base64.b64decode(iv)),
+        backend=default_backend(),
+    ).decryptor()
     unpadder = padding.PKCS7(algorithms.AES.block_size).unpadder()
-    decrypted_data = unpadder.update(decrypted_padded_data) + unpadder.finalize()
 
-    return decrypted_data
+    for chunk in encrypted_file_chunks:
+        file_data = unpadder.update(decryptor.update(chunk))
+        if file_data:
+            yield file_data
+
+    yield unpadder.update(decryptor.finalize()) + unpadder.finalize()
 
 
-async def encrypt_client_file_data(file_data: bytes, key: list) -> Dict[str, str]:
+def reencrypt_stored_file_data(
+    encrypted_file_chunks: Iterable[bytes],
+    iv: str,
+    data_key: bytes,
+    key: list,
+    codec: Optional[str] = None,
+    storage_format: Optional[str] = None,
+) -> dict:
     if len(key) != 256 or not all(bit == 0 or bit == 1 for bit in key):
         raise ValueError("Error during encryption")
 
     byte_key = bytes(
         int("".join(str(bit) for bit in key[i * 8 : i * 8 + 8]), 2) for i in range(24)
     )
-
     init_vector_bytes = os.urandom(16)
 
-    padder = padding.PKCS7(128).padder()
-    padded_data = padder.update(file_data) + padder.finalize()
-
-    cipher = Cipher(
+    encryptor = Cipher(
         algorithms.AES(byte_key),
         modes.CBC(init_vector_bytes),
         backend=default_backend(),
-    )
-    encryptor = cipher.encryptor()
-    encrypted_file_data = encryptor.update(padded_data) + encryptor.finalize()
+    ).encryptor()
+    padder = padding.PKCS7(128).padder()
+    decompressor = get_decompressor(codec)
+
+    def encrypt_file_chunks() -> Iterator[bytes]:
+        for file_data in decrypt_stored_file_chunks(
+            encrypted_file_chunks, iv, data_key, storage_format
+        ):
+            if decompressor:
+                file_data = decompressor.decompress(file_data)
+            encrypted_file_data = encryptor.update(padder.update(file_data))
+            if encrypted_file_data:
+                yield encrypted_file_data
+
+        file_data = decompressor.flush() if decompressor else b""
+        yield (
+            encryptor.update(padder.update(file_data) + padder.finalize())
+            + encryptor.finalize()
+        )
 
     return {
         "iv": base64.b64encode(init_vector_bytes).decode("utf-8"),
-        "encryptedFileBuffer": encrypted_file_data,
+        "encryptedFileChunks": encrypt_file_chunks(),
     }
 
 
-async def decrypt_client_file_data(
-    encrypted_file: UploadFile, init_vector: str, key: list
-) -> bytes:
-    byte_key = bytes(
-        int("".join(map(str, key[i * 8 : (i + 1) * 8])), 2) for i in range(24)
+def get_relationship_key(hash_key: str) -> bytes:
+    if not AES_SECRET_KEY:
+        raise ValueError("Key not found in environment variables.")
+
+    hash_key_bytes = hash_key.encode("utf-8")
+    aes_secret_key_bytes = AES_SECRET_KEY.encode("utf-8")
+
+    if len(hash_key_bytes) < 16 or len(aes_secret_key_bytes) < 16:
+        raise ValueError("Keys must be at least 16 bytes.")
+
+    return hash_key_bytes[:16] + aes_secret_key_bytes[:16]
+
+
+def generate_data_key() -> bytes:
+    return secrets.token_bytes(32)
+
+
+def wrap_data_key(data_key: bytes, hash_key: str) -> str:
+    return base64.b64encode(
+        aes_key_wrap(get_relationship_key(hash_key), data_key, default_backend())
+    ).decode("utf-8")
+
+
+def unwrap_data_key(wrapped_data_key: str, hash_key: str) -> bytes:
+    return aes_key_unwrap(
+        get_relationship_key(hash_key),
+        base64.b64decode(wrapped_data_key),
+        default_backend(),
     )
-    init_vector_bytes = base64.b64decode(init_vector)
 
-    encrypted_data = await encrypted_file.read()
-    cipher = Cipher(
-        algorithms.AES(byte_key),
-        modes.CBC(init_vector_bytes),
-        backend=default_backend(),
+
+def wrap_client_data_key(data_key: bytes, key: list) -> str:
+    if len(key) != 256 or not all(bit == 0 or bit == 1 for bit in key):
+        raise ValueError("Error during encryption")
+
+    byte_key = bytes(
+        int("".join(str(bit) for bit in key[i * 8 : i * 8 + 8]), 2) for i in range(24)
     )
-    decryptor = cipher.decryptor()
-    decrypted_file_data = decryptor.update(encrypted_data) + decryptor.finalize()
 
-    return decrypted_file_data
+    return base64.b64encode(aes_key_wrap(byte_key, data_key, default_backend())).decode(
+        "utf-8"
+    )
 
 
 def get_file_hash_key(email1: str, email2: str) -> str:
@@ -138,13 +294,19 @@ def generate_file_hash(file_data: bytes) -> str:
     return sha3_256.hexdigest()
 
 
-def verify_file_signature(file_data, dl_file_signature, dl_public_key) -> bool:
-    dilithium = Dilithium()
-    byte_length = min(1024, len(file_data))
-    file_segment = file_data[:byte_length]
+def verify_file_signatures(
+    file_segments: List[bytes], dl_file_signatures: List[dict], dl_public_key
+) -> List[bool]:
+    signed_messages = []
+    for file_data, dl_file_signature in zip(file_segments, dl_file_signatures):
+        try:
+            signature = [
+                dl_file_signature["z"],
+                base64.b64decode(dl_file_signature["cp"]),
+            ]
+        except Exception:
+            signature = [[], b""]
 
-    return dilithium.verify_dilthium_signature(
-        file_segment,
-        [dl_file_signature["z"], base64.b64decode(dl_file_signature["cp"])],
-        dl_public_key,
-    )
+        signed_messages.append((file_data[:SIGNED_SEGMENT_LENGTH], signature))
+
+    return Dilithium().verify_dilithium_signatures(signed_messages, dl_public_key)
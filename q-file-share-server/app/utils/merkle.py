@@ -0,0 +1,103 @@
+import os
+import struct
+import hashlib
+
+from collections import deque
+from concurrent.futures import Future, ThreadPoolExecutor
+from dotenv import load_dotenv
+from typing import Deque, List, Optional
+
+load_dotenv()
+
+MERKLE_SIGNATURE_MODE = "merkle"
+MERKLE_SIGNATURE_PREFIX = b"QFS-MERKLE-SHA3-256"
+
+MERKLE_CHUNK_SIZE = int(os.getenv("MERKLE_CHUNK_SIZE", 1024 * 1024))
+MERKLE_MIN_CHUNK_SIZE = 4 * 1024
+MERKLE_MAX_CHUNK_SIZE = 64 * 1024 * 1024
+MERKLE_HASH_WORKERS = int(os.getenv("MERKLE_HASH_WORKERS", os.cpu_count() or 1))
+
+merkle_executor = ThreadPoolExecutor(
+    max_workers=max(MERKLE_HASH_WORKERS, 1), thread_name_prefix="merkle"
+)
+
+
+def hash_leaf(chunk: bytes) -> bytes:
+    sha3_256 = hashlib.sha3_256(b"\x00")
+    sha3_256.update(chunk)
+
+    return sha3_256.digest()
+
+
+def hash_node(left: bytes, right: bytes) -> bytes:
+    return hashlib.sha3_256(b"\x01" + left + right).digest()
+
+
+def get_merkle_root(leaf_hashes: List[bytes]) -> bytes:
+    level = leaf_hashes or [hash_leaf(b"")]
+    while len(level) > 1:
+        next_level = [
+            hash_node(level[index], level[index + 1])
+            for index in range(0, len(level) - 1, 2)
+        ]
+        if len(level) % 2:
+            next_level.append(level[-1])
+        level = next_level
+
+    return level[0]
+
+
+def get_merkle_message(root: bytes, chunk_size: int) -> bytes:
+    return MERKLE_SIGNATURE_PREFIX + struct.pack(">I", chunk_size) + root
+
+
+def get_signature_chunk_size(dl_file_signature: dict) -> Optional[int]:
+    if dl_file_signature.get("mode") != MERKLE_SIGNATURE_MODE:
+        return None
+
+    chunk_size = int(dl_file_signature.get("chunkSize") or MERKLE_CHUNK_SIZE)
+    if not MERKLE_MIN_CHUNK_SIZE <= chunk_size <= MERKLE_MAX_CHUNK_SIZE:
+        raise ValueError("Invalid Merkle chunk size")
+
+    return chunk_size
+
+
+class MerkleHasher:
+    def __init__(self, chunk_size: int):
+        self.chunk_size = chunk_size
+        self.buffer = bytearray()
+        self.leaf_hashes: List[Future] = []
+        self._pending: Deque[Future] = deque()
+        self._max_pending = max(MERKLE_HASH_WORKERS, 1) * 2
+
+    def update(self, data: bytes) -> None:
+        self.buffer += data
+        offset = 0
+        while len(self.buffer) - offset >= self.chunk_size:
+            self._submit(bytes(self.buffer[offset : offset + self.chunk_size]))
+            offset += self.chunk_size
+        del self.buffer[:offset]
+
+    def finalize(self) -> bytes:
+        if self.buffer or not self.leaf_hashes:
+            self._submit(bytes(self.buffer))
+            self.buffer.clear()
+
+        return get_merkle_root([leaf_hash.result() for leaf_hash in self.leaf_hashes])
+
+    def _submit(self, chunk: bytes) -> None:
+        while len(self._pending) >= self._max_pending:
+            self._pending.popleft().result()
+
+        leaf_hash = merkle_executor.submit(hash_leaf, chunk)
+        self.leaf_hashes.append(leaf_hash)
+        self._pending.append(leaf_hash)
+
+
+def compute_merkle_root(file_data: bytes, chunk_size: int = MERKLE_CHUNK_SIZE) -> bytes:
+    return get_merkle_root(
+        [
+            hash_leaf(file_data[offset : offset + chunk_size])
+            for offset in range(0, len(file_data), chunk_size)
+        ]
+    )
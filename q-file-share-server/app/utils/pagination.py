@@ -0,0 +1,33 @@
+import base64
+import binascii
+
+from datetime import datetime
+from typing import List, Optional, Sequence, Tuple
+
+
+def encode_cursor(sent_on: datetime, row_id: int) -> str:
+    return (
+        base64.urlsafe_b64encode(f"{sent_on.isoformat()}|{row_id}".encode("utf-8"))
+        .rstrip(b"=")
+        .decode("utf-8")
+    )
+
+
+def decode_cursor(cursor: str) -> Tuple[datetime, int]:
+    try:
+        sent_on, _, row_id = (
+            base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4))
+            .decode("utf-8")
+            .partition("|")
+        )
+        return datetime.fromisoformat(sent_on), int(row_id)
+    except (binascii.Error, UnicodeDecodeError, ValueError):
+        raise ValueError("Invalid cursor")
+
+
+def get_page(rows: Sequence, page_size: int) -> Tuple[List, Optional[str]]:
+    if len(rows) <= page_size:
+        return list(rows), None
+
+    rows = list(rows[:page_size])
+    return rows, encode_cursor(rows[-1].sent_on, rows[-1].id)
@@ -0,0 +1,225 @@
+import json
+import base64
+import struct
+import numpy as np
+
+from fastapi import Request
+from typing import Dict, Optional, Tuple
+
+from app.quantum_protocols.helpers import (
+    POLY_DTYPE,
+    compress_coefficients,
+    compress_poly_QK,
+    decompress_coefficients,
+    decompress_poly_QK,
+)
+from app.quantum_protocols.parameters import N, Q_K
+from app.utils.merkle import MERKLE_SIGNATURE_MODE
+
+PACKED_MEDIA_TYPE = "application/vnd.qfileshare.packed"
+
+PACKED_FORMAT_NAME = "packed-v1"
+
+MAGIC = b"QF"
+
+VERSION = 1
+
+KYBER_PUBLIC_KEY = 1
+KYBER_CIPHERTEXT = 2
+DILITHIUM_PUBLIC_KEY = 3
+DILITHIUM_SIGNATURE = 4
+
+FIELD_SEED = 1
+FIELD_T = 2
+FIELD_U = 3
+FIELD_V = 4
+FIELD_IV = 5
+FIELD_A = 6
+FIELD_Z = 7
+FIELD_CP = 8
+FIELD_WRAPPED_KEY = 9
+FIELD_MERKLE_CHUNK_SIZE = 10
+
+CODEC_RAW = 0
+CODEC_COMPRESSED = 1
+CODEC_NIBBLES = 2
+
+KYBER_U_BITS = 10
+KYBER_V_BITS = 4
+
+
+def pack_bits(values: np.ndarray, bits: int) -> bytes:
+    values = np.asarray(values, dtype=np.uint64).reshape(-1)
+    bit_matrix = (values[:, None] >> np.arange(bits, dtype=np.uint64)) & 1
+    return np.packbits(bit_matrix.astype(np.uint8), bitorder="little").tobytes()
+
+
+def unpack_bits(data: bytes, bits: int, count: int) -> np.ndarray:
+    bit_matrix = np.unpackbits(
+        np.frombuffer(data, dtype=np.uint8), count=count * bits, bitorder="little"
+    ).reshape(count, bits)
+    return bit_matrix.astype(POLY_DTYPE) @ (1 << np.arange(bits, dtype=POLY_DTYPE))
+
+
+def encode_array(array, codec: int = CODEC_RAW, bits: int = 0) -> bytes:
+    array = np.asarray(array, dtype=POLY_DTYPE)
+    offset = 0
+
+    if codec == CODEC_RAW:
+        offset = int(array.min()) if array.size else 0
+        bits = max(int(array.max()) - offset, 1).bit_length() if array.size else 1
+        payload = pack_bits(array - offset, bits)
+    elif codec == CODEC_COMPRESSED:
+        payload = pack_bits(compress_coefficients(array, bits), bits)
+    elif codec == CODEC_NIBBLES:
+        bits = KYBER_V_BITS
+        payload = compress_poly_QK(array).tobytes()
+    else:
+        raise ValueError("Unsupported coefficient codec.")
+
+    header = struct.pack(
+        f"<B{array.ndim}HBBq", array.ndim, *array.shape, codec, bits, offset
+    )
+    return header + payload
+
+
+def decode_array(data: bytes) -> np.ndarray:
+    ndim = data[0]
+    shape = struct.unpack_from(f"<{ndim}H", data, 1)
+    codec, bits, offset = struct.unpack_from("<BBq", data, 1 + 2 * ndim)
+    payload = data[1 + 2 * ndim + 10 :]
+    count = int(np.prod(shape))
+
+    if codec == CODEC_RAW:
+        array = unpack_bits(payload, bits, count) + offset
+    elif codec == CODEC_COMPRESSED:
+        array = decompress_coefficients(unpack_bits(payload, bits, count), bits)
+    elif codec == CODEC_NIBBLES:
+        compressed = np.frombuffer(payload, dtype=np.uint8, count=count // 2)
+        array = decompress_poly_QK(compressed.reshape(-1, N // 2))
+    else:
+        raise ValueError("Unsupported coefficient codec.")
+
+    return array.reshape(shape)
+
+
+def encode_container(object_type: int, fields: Dict[int, bytes]) -> bytes:
+    packed = bytearray(MAGIC + bytes([VERSION, object_type]))
+    for tag, value in fields.items():
+        packed += struct.pack("<BI", tag, len(value)) + value
+    return bytes(packed)
+
+
+def decode_container(data: bytes, object_type: int) -> Dict[int, bytes]:
+    if data[:2] != MAGIC or len(data) < 4:
+        raise ValueError("Invalid packed key format.")
+    if data[2] != VERSION:
+        raise ValueError(f"Unsupported packed key version: {data[2]}")
+    if data[3] != object_type:
+        raise ValueError("Unexpected packed key type.")
+
+    fields: Dict[int, bytes] = {}
+    position = 4
+    while position < len(data):
+        if position + 5 > len(data):
+            raise ValueError("Truncated packed key field.")
+        tag, length = struct.unpack_from("<BI", data, position)
+        position += 5
+        if position + length > len(data):
+            raise ValueError("Packed key field length exceeds the data.")
+        fields[tag] = data[position : position + length]
+        position += length
+
+    return fields
+
+
+def is_json_text(text: str) -> bool:
+    return text.lstrip()[:1] in ("{", "[")
+
+
+def accepts_packed(request: Request) -> bool:
+    return PACKED_MEDIA_TYPE in request.headers.get("accept", "")
+
+
+def encode_kyber_public_key(t, seed: bytes) -> bytes:
+    return encode_container(
+        KYBER_PUBLIC_KEY,
+        {
+            FIELD_SEED: seed,
+            FIELD_T: encode_array(np.mod(t, Q_K)),
+        },
+    )
+
+
+def decode_kyber_public_key(text: str) -> dict:
+    if is_json_text(text):
+        return json.loads(text)
+
+    fields = decode_container(base64.b64decode(text), KYBER_PUBLIC_KEY)
+    return {
+        "t": decode_array(fields[FIELD_T]),
+        "seed": base64.b64encode(fields[FIELD_SEED]).decode("utf-8"),
+    }
+
+
+def encode_kyber_ciphertext(
+    u, v, iv: Optional[str] = None, wrapped_key: Optional[str] = None
+) -> bytes:
+    fields = {
+        FIELD_U: encode_array(u, CODEC_COMPRESSED, KYBER_U_BITS),
+        FIELD_V: encode_array(v, CODEC_NIBBLES),
+    }
+    if iv:
+        fields[FIELD_IV] = base64.b64decode(iv)
+    if wrapped_key:
+        fields[FIELD_WRAPPED_KEY] = base64.b64decode(wrapped_key)
+
+    return encode_container(KYBER_CIPHERTEXT, fields)
+
+
+def decode_kyber_ciphertext(text: str) -> dict:
+    if is_json_text(text):
+        return json.loads(text)
+
+    fields = decode_container(base64.b64decode(text), KYBER_CIPHERTEXT)
+    return {"u": decode_array(fields[FIELD_U]), "v": decode_array(fields[FIELD_V])}
+
+
+def encode_dilithium_public_key(A, t) -> bytes:
+    return encode_container(
+        DILITHIUM_PUBLIC_KEY, {FIELD_A: encode_array(A), FIELD_T: encode_array(t)}
+    )
+
+
+def decode_dilithium_public_key(text: str) -> Tuple[np.ndarray, np.ndarray]:
+    if is_json_text(text):
+        return json.loads(text)
+
+    fields = decode_container(base64.b64decode(text), DILITHIUM_PUBLIC_KEY)
+    return decode_array(fields[FIELD_A]), decode_array(fields[FIELD_T])
+
+
+def encode_dilithium_signature(
+    z, cp: str, merkle_chunk_size: Optional[int] = None
+) -> bytes:
+    fields = {FIELD_Z: encode_array(z), FIELD_CP: base64.b64decode(cp)}
+    if merkle_chunk_size:
+        fields[FIELD_MERKLE_CHUNK_SIZE] = struct.pack("<I", merkle_chunk_size)
+
+    return encode_container(DILITHIUM_SIGNATURE, fields)
+
+
+def decode_dilithium_signature(text: str) -> dict:
+    if is_json_text(text):
+        return json.loads(text)
+
+    fields = decode_container(base64.b64decode(text), DILITHIUM_SIGNATURE)
+    signature = {
+        "z": decode_array(fields[FIELD_Z]),
+        "cp": base64.b64encode(fields[FIELD_CP]).decode("utf-8"),
+    }
+    if FIELD_MERKLE_CHUNK_SIZE in fields:
+        signature["mode"] = MERKLE_SIGNATURE_MODE
+        (signature["chunkSize"],) = struct.unpack("<I", fields[FIELD_MERKLE_CHUNK_SIZE])
+
+    return signature
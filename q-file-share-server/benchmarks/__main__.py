@@ -0,0 +1,105 @@
+import os
+import sys
+import json
+import secrets
+import argparse
+import platform
+import tempfile
+
+from datetime import datetime, timezone
+
+DEFAULT_SIZES = "1KB,64KB,1MB,16MB,256MB,1GB"
+
+SUITES = ("crypto", "files", "e2e")
+
+
+def parse_arguments() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(
+        prog="python -m benchmarks",
+        description="Benchmark the crypto primitives and file pipeline.",
+    )
+    parser.add_argument("--sizes", default=DEFAULT_SIZES)
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--only", choices=SUITES, action="append")
+    parser.add_argument("--output")
+    parser.add_argument("--compare")
+    parser.add_argument("--threshold", type=float, default=0.1)
+    return parser.parse_args()
+
+
+def set_default_environment() -> None:
+    temp_directory = tempfile.mkdtemp()
+    database_path = os.path.join(temp_directory, "benchmarks.sqlite")
+    os.environ.setdefault("DATABASE_URL", f"sqlite:///{database_path}")
+    os.environ.setdefault("BLOB_STORE_PATH", os.path.join(temp_directory, "blobs"))
+    os.environ.setdefault("AES_SECRET_KEY", secrets.token_hex(16))
+    os.environ.setdefault("SECRET_KEY", secrets.token_hex(32))
+    os.environ.setdefault("ALGORITHM", "HS256")
+    os.environ.setdefault("CRYPTO_EXECUTOR_MODE", "sync")
+
+
+def main() -> int:
+    arguments = parse_arguments()
+    set_default_environment()
+
+    import numpy as np
+
+    from .runner import compare_results, parse_size
+
+    sizes = [parse_size(size) for size in arguments.sizes.split(",") if size]
+    suites = arguments.only or SUITES
+    results = {}
+
+    if "crypto" in suites:
+        from .crypto_benchmarks import run_crypto_benchmarks
+
+        results.update(run_crypto_benchmarks(arguments.repeat))
+    if "files" in suites:
+        from .file_benchmarks import run_file_benchmarks
+
+        results.update(run_file_benchmarks(sizes, arguments.repeat))
+    if "e2e" in suites:
+        from .end_to_end_benchmarks import run_end_to_end_benchmarks
+
+        results.update(run_end_to_end_benchmarks(sizes, arguments.repeat))
+
+    report = {
+        "meta": {
+            "python": platform.python_version(),
+            "numpy": np.__version__,
+            "platform": platform.platform(),
+            "timestamp": datetime.now(timezone.utc).isoformat(),
+        },
+        "results": results,
+    }
+
+    for name, result in results.items():
+        print(f"{name:<60} {result['median_seconds'] * 1000:>12.3f} ms")
+
+    if arguments.output:
+        with open(arguments.output, "w") as output_file:
+            json.dump(report, output_file, indent=2)
+
+    if arguments.compare:
+        with open(arguments.compare) as baseline_file:
+            baseline = json.load(baseline_file)["results"]
+
+        comparisons = compare_results(baseline, results, arguments.threshold)
+        regressions = [
+            comparison for comparison in comparisons if comparison["regression"]
+        ]
+        for comparison in regressions:
+            print(
+                f"Regression in {comparison['name']}: "
+                f"{comparison['baseline_seconds'] * 1000:.3f} ms -> "
+                f"{comparison['current_seconds'] * 1000:.3f} ms "
+                f"({comparison['change']:+.1%})"
+            )
+        if regressions:
+            return 1
+
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,44 @@
+import os
+import base64
+
+from app.quantum_protocols.dilithium import Dilithium
+from app.quantum_protocols.generators import expand_a_kyber, get_random_seed
+from app.quantum_protocols.kyber import Kyber
+from app.quantum_protocols.parameters import K_K, Q_K
+from app.utils.file_handler import SIGNED_SEGMENT_LENGTH
+
+from .fixtures import generate_dilithium_key_pair, sign_with_dilithium
+from .runner import measure
+
+
+def run_crypto_benchmarks(repeat: int) -> dict:
+    kyber = Kyber()
+    key_pair = kyber.generate_key_pair()
+    t = key_pair["public_key"]["t"]
+    seed = key_pair["public_key"]["seed"]
+    ciphertext = kyber.cpa_encrypt(t, seed)
+
+    dl_public_key, dl_secret_key = generate_dilithium_key_pair()
+    message = os.urandom(SIGNED_SEGMENT_LENGTH)
+    signature = sign_with_dilithium(dl_secret_key, message)
+    dl_signature = (signature["z"], base64.b64decode(signature["cp"]))
+
+    return {
+        "kyber.generate_key_pair": measure(kyber.generate_key_pair, repeat),
+        "kyber.cpa_encrypt": measure(lambda: kyber.cpa_encrypt(t, seed), repeat),
+        "kyber.cpa_encrypt.new_seed": measure(
+            lambda: kyber.cpa_encrypt(t, get_random_seed()), repeat
+        ),
+        "kyber.cpa_decrypt": measure(
+            lambda: kyber.cpa_decrypt(key_pair["secret_key"], ciphertext), repeat
+        ),
+        "dilithium.verify_dilthium_signature": measure(
+            lambda: Dilithium().verify_dilthium_signature(
+                message, dl_signature, dl_public_key
+            ),
+            repeat,
+        ),
+        "generators.expand_a_kyber": measure(
+            lambda: expand_a_kyber(get_random_seed(), K_K, K_K, Q_K), repeat
+        ),
+    }
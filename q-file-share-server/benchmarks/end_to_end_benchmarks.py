@@ -0,0 +1,140 @@
+import os
+import json
+import base64
+import asyncio
+
+from typing import List
+
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+from sqlalchemy.pool import NullPool
+
+from app.db.config import ASYNC_DATABASE_URL, Base, SessionLocal, engine
+from app.models.db_models import FileLogs
+from app.models.dto import FileDownloadDTO, FileUploadDTO
+from app.quantum_protocols.kyber import Kyber
+from app.services.file_services import (
+    get_kyber_key_details,
+    process_download_file,
+    process_upload_files,
+)
+from app.utils.file_handler import DOWNLOAD_CHUNK_SIZE, SIGNED_SEGMENT_LENGTH
+
+from .fixtures import (
+    USER_EMAILS,
+    encrypt_for_server,
+    generate_dilithium_key_pair,
+    make_upload_file,
+    seed_users,
+    sign_with_dilithium,
+)
+from .runner import format_size, measure
+
+DOWNLOAD_COUNT = 1_000_000
+
+
+def run_end_to_end_benchmarks(sizes: List[int], repeat: int) -> dict:
+    Base.metadata.create_all(bind=engine)
+    session = SessionLocal()
+    seed_users(session)
+
+    # measure() runs every call in a new event loop, so connections are not pooled
+    async_engine = create_async_engine(ASYNC_DATABASE_URL, poolclass=NullPool)
+    AsyncSessionLocal = async_sessionmaker(async_engine, expire_on_commit=False)
+
+    async def upload(*args) -> None:
+        async with AsyncSessionLocal() as async_session:
+            await process_upload_files(async_session, *args)
+
+    sender_email, recipient_email = USER_EMAILS
+    dl_public_key, dl_secret_key = generate_dilithium_key_pair()
+    signed_prefix = os.urandom(SIGNED_SEGMENT_LENGTH)
+    file_signature = json.dumps(sign_with_dilithium(dl_secret_key, signed_prefix))
+    dl_public_key_text = json.dumps(
+        [dl_public_key[0].tolist(), dl_public_key[1].tolist()]
+    )
+
+    kyber = Kyber()
+    results = {}
+
+    for size in sizes:
+        label = format_size(size)
+
+        def prepare_upload() -> tuple:
+            kyber_key_details = asyncio.run(get_kyber_key_details())
+            kyber_key = kyber.cpa_encrypt(
+                kyber_key_details["t"], base64.b64decode(kyber_key_details["seed"])
+            )
+            file_data = signed_prefix + os.urandom(max(size - SIGNED_SEGMENT_LENGTH, 0))
+            init_vector, encrypted_file_data = encrypt_for_server(
+                file_data[:size], kyber_key["key"]
+            )
+            file_upload_dto = FileUploadDTO(
+                init_vectors=[init_vector],
+                file_names=[f"benchmark-{label}.bin"],
+                file_sizes=[size],
+                file_types=["application/octet-stream"],
+                file_signatures=[file_signature],
+                dl_public_key=dl_public_key_text,
+                kyber_key=json.dumps(
+                    {"u": kyber_key["u"].tolist(), "v": kyber_key["v"].tolist()}
+                ),
+                recipient_email=recipient_email,
+                expiration=1,
+                download_count=DOWNLOAD_COUNT,
+                anonymous=False,
+            )
+
+            return (
+                [make_upload_file(encrypted_file_data, f"benchmark-{label}.bin")],
+                file_upload_dto,
+                kyber_key_details["s"],
+                sender_email,
+            )
+
+        results[f"file_services.process_upload_files[{label}]"] = measure(
+            upload, repeat, setup=prepare_upload, size=size
+        )
+
+        file_log = (
+            session.query(FileLogs)
+            .filter(FileLogs.name == f"benchmark-{label}.bin")
+            .order_by(FileLogs.id.desc())
+            .first()
+        )
+        client_key_pair = kyber.generate_key_pair()
+        file_download_dto = FileDownloadDTO(
+            file_id=file_log.public_id,
+            kyber_key_pair=json.dumps(
+                {
+                    "t": client_key_pair["public_key"]["t"].tolist(),
+                    "seed": base64.b64encode(
+                        client_key_pair["public_key"]["seed"]
+                    ).decode("utf-8"),
+                }
+            ),
+        )
+
+        async def download(wrap_key: bool) -> None:
+            async with AsyncSessionLocal() as async_session:
+                downloaded_file_data = await process_download_file(
+                    async_session,
+                    file_download_dto.model_copy(update={"wrap_key": wrap_key}),
+                    recipient_email,
+                )
+            if downloaded_file_data["file_path"]:
+                with open(downloaded_file_data["file_path"], "rb") as stored_file:
+                    while stored_file.read(DOWNLOAD_CHUNK_SIZE):
+                        pass
+            else:
+                for _ in downloaded_file_data["file_data"]:
+                    pass
+
+        results[f"file_services.process_download_file[{label}]"] = measure(
+            lambda: download(False), repeat, size=size
+        )
+        results[f"file_services.process_download_file.wrap_key[{label}]"] = measure(
+            lambda: download(True), repeat, size=size
+        )
+
+    session.close()
+    return results
@@ -0,0 +1,74 @@
+import io
+import os
+import numpy as np
+
+from typing import List
+
+from app.utils.file_handler import (
+    DOWNLOAD_CHUNK_SIZE,
+    generate_data_key,
+    reencrypt_client_file_data,
+    reencrypt_stored_file_data,
+)
+from app.utils.merkle import MERKLE_CHUNK_SIZE, MerkleHasher
+
+from .fixtures import encrypt_for_server
+from .runner import format_size, measure
+
+
+def run_file_benchmarks(sizes: List[int], repeat: int) -> dict:
+    client_key = np.random.randint(0, 2, 256).tolist()
+    data_key = generate_data_key()
+    results = {}
+
+    for size in sizes:
+        label = format_size(size)
+        file_data = os.urandom(size)
+
+        init_vector, client_encrypted = encrypt_for_server(file_data, client_key)
+        results[f"file_handler.reencrypt_client_file_data[{label}]"] = measure(
+            lambda: reencrypt_client_file_data(
+                io.BytesIO(client_encrypted), init_vector, client_key, data_key
+            ),
+            repeat,
+            size=size,
+        )
+
+        stored = reencrypt_client_file_data(
+            io.BytesIO(client_encrypted), init_vector, client_key, data_key
+        )
+        del client_encrypted
+        stored_file_data = stored["encrypted_file_data"].read()
+        stored_file_chunks = [
+            stored_file_data[offset : offset + DOWNLOAD_CHUNK_SIZE]
+            for offset in range(0, len(stored_file_data), DOWNLOAD_CHUNK_SIZE)
+        ]
+        del stored_file_data
+
+        def reencrypt_stored_file() -> None:
+            for _ in reencrypt_stored_file_data(
+                stored_file_chunks,
+                stored["iv"],
+                data_key,
+                client_key,
+                stored["codec"],
+                stored["storage_format"],
+            )["encryptedFileChunks"]:
+                pass
+
+        results[f"file_handler.reencrypt_stored_file_data[{label}]"] = measure(
+            reencrypt_stored_file, repeat, size=size
+        )
+        del stored, stored_file_chunks
+
+        def hash_merkle_tree() -> bytes:
+            merkle_hasher = MerkleHasher(MERKLE_CHUNK_SIZE)
+            merkle_hasher.update(file_data)
+            return merkle_hasher.finalize()
+
+        results[f"merkle.MerkleHasher[{label}]"] = measure(
+            hash_merkle_tree, repeat, size=size
+        )
+        del file_data
+
+    return results
@@ -0,0 +1,102 @@
+import io
+import os
+import base64
+import numpy as np
+
+from fastapi import UploadFile
+
+from cryptography.hazmat.primitives import padding
+from cryptography.hazmat.primitives.ciphers import Cipher, algorithms, modes
+
+from app.quantum_protocols.generators import (
+    expand_a,
+    generate_poly_buffer,
+    get_polynomial_challenge,
+    get_random_seed,
+    get_random_vectors,
+)
+from app.quantum_protocols.helpers import (
+    add_polynomial_vectors,
+    decompose,
+    encode_polynomial_coefficients,
+    high_bits,
+    multiply_matrix_poly_vector,
+    multiply_polynomial_with_poly_vector,
+    reduce_poly_vector,
+    reduce_poly_vector_symmetric,
+    subtract_polynomial_vectors,
+    to_poly,
+)
+from app.quantum_protocols.parameters import BETA, GAMMA1, GAMMA2, K, L, N, Q
+
+DILITHIUM_ETA = 4
+
+USER_EMAILS = ("sender@benchmark.local", "recipient@benchmark.local")
+
+
+def generate_dilithium_key_pair() -> tuple:
+    A = expand_a(get_random_seed(), K, L, Q)
+    s1 = get_random_vectors(L, DILITHIUM_ETA)
+    s2 = get_random_vectors(K, DILITHIUM_ETA)
+    t = reduce_poly_vector(
+        add_polynomial_vectors(multiply_matrix_poly_vector(A, s1, Q), s2), Q
+    )
+
+    return (A, t), (A, t, s1, s2)
+
+
+def sign_with_dilithium(secret_key: tuple, message: bytes) -> dict:
+    A, _, s1, s2 = secret_key
+
+    while True:
+        y = get_random_vectors(L, GAMMA1 - 1)
+        Ay = multiply_matrix_poly_vector(A, y, Q)
+        cp = generate_poly_buffer(
+            message, encode_polynomial_coefficients(high_bits(Ay, 2 * GAMMA2), N)
+        )
+        c = to_poly(get_polynomial_challenge(cp))
+
+        z = reduce_poly_vector_symmetric(
+            add_polynomial_vectors(y, multiply_polynomial_with_poly_vector(c, s1, Q)),
+            Q,
+        )
+        low_bits = decompose(
+            subtract_polynomial_vectors(
+                Ay, multiply_polynomial_with_poly_vector(c, s2, Q)
+            ),
+            2 * GAMMA2,
+        )[1]
+
+        if np.abs(z).max() < GAMMA1 - BETA and np.abs(low_bits).max() < GAMMA2 - BETA:
+            return {"z": z.tolist(), "cp": base64.b64encode(cp).decode("utf-8")}
+
+
+def get_client_key_bytes(key) -> bytes:
+    return bytes(np.packbits(np.asarray(key, dtype=np.uint8))[:24])
+
+
+def encrypt_for_server(file_data: bytes, key) -> tuple:
+    init_vector = os.urandom(16)
+    padder = padding.PKCS7(128).padder()
+    encryptor = Cipher(
+        algorithms.AES(get_client_key_bytes(key)), modes.CBC(init_vector)
+    ).encryptor()
+
+    encrypted_file_data = (
+        encryptor.update(padder.update(file_data) + padder.finalize())
+        + encryptor.finalize()
+    )
+    return base64.b64encode(init_vector).decode("utf-8"), encrypted_file_data
+
+
+def make_upload_file(encrypted_file_data: bytes, file_name: str) -> UploadFile:
+    return UploadFile(file=io.BytesIO(encrypted_file_data), filename=file_name)
+
+
+def seed_users(session) -> None:
+    from app.models.db_models import Users
+
+    for email in USER_EMAILS:
+        if not session.query(Users).filter(Users.email == email).first():
+            session.add(Users(name=email, email=email, password_hash=""))
+    session.commit()
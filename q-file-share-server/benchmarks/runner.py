@@ -0,0 +1,83 @@
+import time
+import asyncio
+import statistics
+
+from typing import Callable, Dict, List, Optional
+
+SIZE_UNITS = {"B": 1, "KB": 1024, "MB": 1024**2, "GB": 1024**3}
+
+
+def parse_size(size: str) -> int:
+    size = size.strip().upper()
+    for unit in ("GB", "MB", "KB", "B"):
+        if size.endswith(unit):
+            return int(float(size[: -len(unit)]) * SIZE_UNITS[unit])
+    return int(size)
+
+
+def format_size(size: int) -> str:
+    for unit in ("GB", "MB", "KB"):
+        if size >= SIZE_UNITS[unit] and size % SIZE_UNITS[unit] == 0:
+            return f"{size // SIZE_UNITS[unit]}{unit}"
+    return f"{size}B"
+
+
+def measure(
+    function: Callable,
+    repeat: int,
+    warmup: int = 1,
+    setup: Optional[Callable] = None,
+    size: Optional[int] = None,
+) -> dict:
+    def run_once() -> float:
+        args = setup() if setup else ()
+        started_at = time.perf_counter()
+        result = function(*args)
+        if asyncio.iscoroutine(result):
+            asyncio.run(result)
+        return time.perf_counter() - started_at
+
+    for _ in range(warmup):
+        run_once()
+
+    timings: List[float] = [run_once() for _ in range(max(repeat, 1))]
+    median = statistics.median(timings)
+
+    result = {
+        "repeat": len(timings),
+        "min_seconds": min(timings),
+        "median_seconds": median,
+        "mean_seconds": statistics.fmean(timings),
+        "max_seconds": max(timings),
+    }
+    if size is not None:
+        result["bytes"] = size
+        result["throughput_mb_per_second"] = (
+            size / SIZE_UNITS["MB"] / median if median else None
+        )
+
+    return result
+
+
+def compare_results(
+    baseline: Dict[str, dict], current: Dict[str, dict], threshold: float
+) -> List[dict]:
+    comparisons = []
+    for name, result in sorted(current.items()):
+        if name not in baseline:
+            continue
+
+        before = baseline[name]["median_seconds"]
+        after = result["median_seconds"]
+        change = (after - before) / before if before else 0.0
+        comparisons.append(
+            {
+                "name": name,
+                "baseline_seconds": before,
+                "current_seconds": after,
+                "change": change,
+                "regression": change > threshold,
+            }
+        )
+
+    return comparisons
@@ -1,15 +1,41 @@
+from contextlib import asynccontextmanager
+
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 
 from app.api.auth import router as auth_router
 from app.api.file import router as file_router
+from app.api.metrics import router as metrics_router
+from app.api.upload_sessions import router as upload_sessions_router
 
-from app.db.config import engine
+from app.db.config import async_engine, engine
 from app.models import db_models
+from app.services.crypto_executor import crypto_executor
+from app.services.file_sweeper import file_sweeper
+from app.services.kyber_key_pool import kyber_key_pool
+from app.services.upload_session_services import upload_session_collector
+from app.storage.migrate import upgrade_files_table, upgrade_indexes
 
 db_models.Base.metadata.create_all(bind=engine)
+upgrade_files_table(engine)
+upgrade_indexes(engine)
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    crypto_executor.start()
+    kyber_key_pool.start()
+    upload_session_collector.start()
+    file_sweeper.start()
+    yield
+    file_sweeper.stop()
+    upload_session_collector.stop()
+    kyber_key_pool.stop()
+    crypto_executor.shutdown()
+    await async_engine.dispose()
+
 
-app = FastAPI()
+app = FastAPI(lifespan=lifespan)
 
 app.add_middleware(
     CORSMiddleware,
@@ -21,3 +47,5 @@ app.add_middleware(
 
 app.include_router(auth_router, prefix="/auth", tags=["auth"])
 app.include_router(file_router, prefix="/file", tags=["files"])
+app.include_router(upload_sessions_router, prefix="/file/uploads", tags=["files"])
+app.include_router(metrics_router, prefix="/metrics", tags=["metrics"])
@@ -0,0 +1,34 @@
+import os
+import asyncio
+import secrets
+import tempfile
+import pytest
+
+TEST_DIRECTORY = tempfile.mkdtemp(prefix="q-file-share-tests-")
+
+os.environ["DATABASE_URL"] = f"sqlite:///{os.path.join(TEST_DIRECTORY, 'tests.sqlite')}"
+os.environ["BLOB_STORE_PATH"] = os.path.join(TEST_DIRECTORY, "blobs")
+os.environ["UPLOAD_STAGING_PATH"] = os.path.join(TEST_DIRECTORY, "uploads")
+os.environ.pop("ASYNC_DATABASE_URL", None)
+os.environ.setdefault("AES_SECRET_KEY", secrets.token_hex(16))
+os.environ.setdefault("SECRET_KEY", secrets.token_hex(32))
+os.environ.setdefault("ALGORITHM", "HS256")
+os.environ.setdefault("CRYPTO_EXECUTOR_MODE", "sync")
+
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+from sqlalchemy.pool import NullPool
+
+from app.db.config import ASYNC_DATABASE_URL, Base, engine
+
+
+@pytest.fixture(scope="session")
+def database():
+    Base.metadata.create_all(bind=engine)
+    yield engine
+
+
+@pytest.fixture(scope="module")
+def session_factory(database):
+    async_engine = create_async_engine(ASYNC_DATABASE_URL, poolclass=NullPool)
+    yield async_sessionmaker(async_engine, autoflush=False, expire_on_commit=False)
+    asyncio.run(async_engine.dispose())
@@ -0,0 +1,120 @@
+import io
+import json
+import base64
+import secrets
+
+from datetime import datetime, timedelta, timezone
+from functools import lru_cache
+from sqlalchemy import update
+
+from app.db.db_session import db_session_scope
+from app.models.db_models import Files, FileKeys, FileLogs, Users
+from app.storage.blob_store import blob_store
+from app.utils.chunked_container import ChunkedEncryptor
+from app.utils.file_handler import (
+    SIGNED_SEGMENT_LENGTH,
+    STORAGE_FORMAT_CHUNKED,
+    generate_data_key,
+    get_file_hash_key,
+    wrap_data_key,
+)
+from benchmarks.fixtures import generate_dilithium_key_pair, sign_with_dilithium
+
+SENDER = "sender@example.com"
+RECIPIENT = "recipient@example.com"
+OTHER_RECIPIENT = "other-recipient@example.com"
+
+FILE_SIZE = 5000
+
+
+def share_file(download_count: int) -> str:
+    file_id = secrets.token_hex(32)
+    data_key = generate_data_key()
+    encrypted_file_data = io.BytesIO()
+    chunked_encryptor = ChunkedEncryptor(data_key, encrypted_file_data, 1024)
+    chunked_encryptor.update(secrets.token_bytes(FILE_SIZE))
+    chunked_encryptor.finalize()
+    encrypted_file_size = encrypted_file_data.tell()
+    encrypted_file_data.seek(0)
+
+    hash_key = get_file_hash_key(RECIPIENT, SENDER)
+    file_log = FileLogs(
+        name="file.txt",
+        size=FILE_SIZE,
+        from_email=SENDER,
+        to_email=RECIPIENT,
+        sent_on=datetime.now(timezone.utc),
+        expiry=datetime.now(timezone.utc) + timedelta(days=1),
+        download_count=download_count,
+        updated_download_count=download_count,
+        file_id=file_id,
+    )
+    with db_session_scope() as db:
+        db.add(
+            Files(
+                file_id=file_id,
+                iv=base64.b64encode(chunked_encryptor.nonce_prefix).decode("utf-8"),
+                storage_pointer=blob_store.put(file_id, encrypted_file_data),
+                size=encrypted_file_size,
+                ref_count=1,
+                codec="none",
+                storage_format=STORAGE_FORMAT_CHUNKED,
+            )
+        )
+        db.add(
+            FileKeys(
+                file_id=file_id,
+                relationship_hash=hash_key,
+                wrapped_key=wrap_data_key(data_key, hash_key),
+            )
+        )
+        db.add(file_log)
+        db.commit()
+        return file_log.public_id
+
+
+def get_downloads_left(public_id: str) -> int:
+    with db_session_scope() as db:
+        return (
+            db.query(FileLogs.updated_download_count)
+            .filter(FileLogs.public_id == public_id)
+            .scalar()
+        )
+
+
+def get_file_log(public_id: str):
+    with db_session_scope() as db:
+        return db.query(FileLogs).filter(FileLogs.public_id == public_id).one()
+
+
+def update_file_log(public_id: str, **values) -> None:
+    with db_session_scope() as db:
+        db.execute(
+            update(FileLogs).where(FileLogs.public_id == public_id).values(**values)
+        )
+        db.commit()
+
+
+def add_users() -> None:
+    with db_session_scope() as db:
+        for email in (SENDER, RECIPIENT, OTHER_RECIPIENT):
+            if not db.query(Users).filter(Users.email == email).count():
+                db.add(Users(name=email, email=email, password_hash=""))
+        db.commit()
+
+
+@lru_cache(maxsize=None)
+def get_dilithium_key_pair() -> tuple:
+    return generate_dilithium_key_pair()
+
+
+def sign_file(file_data: bytes) -> dict:
+    dl_public_key, dl_secret_key = get_dilithium_key_pair()
+    return {
+        "file_signature": json.dumps(
+            sign_with_dilithium(dl_secret_key, file_data[:SIGNED_SEGMENT_LENGTH])
+        ),
+        "dl_public_key": json.dumps(
+            [dl_public_key[0].tolist(), dl_public_key[1].tolist()]
+        ),
+    }
@@ -0,0 +1,74 @@
+import io
+import secrets
+import pytest
+
+from app.utils.chunked_container import (
+    CONTAINER_HEADER,
+    CONTAINER_TAG_SIZE,
+    ChunkedEncryptor,
+    decrypt_container_chunks,
+)
+
+CHUNK_SIZE = 1024
+
+
+def encrypt_container(data_key: bytes, plaintext: bytes) -> bytes:
+    output = io.BytesIO()
+    chunked_encryptor = ChunkedEncryptor(data_key, output, CHUNK_SIZE)
+    chunked_encryptor.update(plaintext)
+    chunked_encryptor.finalize()
+    return output.getvalue()
+
+
+def split(data: bytes, size: int) -> list:
+    return [data[offset : offset + size] for offset in range(0, len(data), size)]
+
+
+@pytest.mark.parametrize("size", [0, CHUNK_SIZE, CHUNK_SIZE + 1, 3 * CHUNK_SIZE])
+@pytest.mark.parametrize("read_size", [7, CHUNK_SIZE + CONTAINER_TAG_SIZE, 1 << 20])
+def test_round_trip(size, read_size):
+    data_key = secrets.token_bytes(32)
+    plaintext = secrets.token_bytes(size)
+    container = encrypt_container(data_key, plaintext)
+
+    decrypted = b"".join(
+        decrypt_container_chunks(split(container, read_size), data_key)
+    )
+
+    assert decrypted == plaintext
+
+
+def test_rejects_truncated_container():
+    data_key = secrets.token_bytes(32)
+    container = encrypt_container(data_key, secrets.token_bytes(3 * CHUNK_SIZE))
+    stored_chunk_size = CHUNK_SIZE + CONTAINER_TAG_SIZE
+
+    with pytest.raises(ValueError):
+        b"".join(decrypt_container_chunks([container[:-stored_chunk_size]], data_key))
+    with pytest.raises(ValueError):
+        b"".join(decrypt_container_chunks([container[:-1]], data_key))
+    with pytest.raises(ValueError):
+        b"".join(
+            decrypt_container_chunks([container[: CONTAINER_HEADER.size]], data_key)
+        )
+
+
+def test_rejects_reordered_chunks():
+    data_key = secrets.token_bytes(32)
+    container = encrypt_container(data_key, secrets.token_bytes(3 * CHUNK_SIZE))
+    header = container[: CONTAINER_HEADER.size]
+    chunks = split(container[CONTAINER_HEADER.size :], CHUNK_SIZE + CONTAINER_TAG_SIZE)
+
+    with pytest.raises(ValueError):
+        b"".join(
+            decrypt_container_chunks(
+                [header, chunks[1], chunks[0], *chunks[2:]], data_key
+            )
+        )
+
+
+def test_rejects_wrong_key():
+    container = encrypt_container(secrets.token_bytes(32), b"secret")
+
+    with pytest.raises(ValueError):
+        b"".join(decrypt_container_chunks([container], secrets.token_bytes(32)))
@@ -0,0 +1,124 @@
+import io
+import base64
+import secrets
+import numpy as np
+import pytest
+
+from cryptography.hazmat.primitives import padding
+from cryptography.hazmat.primitives.ciphers import Cipher, algorithms, modes
+
+from app.utils import compression, file_handler
+from app.utils.compression import choose_codec
+from benchmarks.fixtures import encrypt_for_server, get_client_key_bytes
+
+TEXT = b"the quick brown fox jumps over the lazy dog\n" * 200
+
+
+@pytest.fixture(autouse=True)
+def zlib_compression(monkeypatch):
+    monkeypatch.setattr(compression, "FILE_COMPRESSION", compression.CODEC_ZLIB)
+
+
+def pad(file_data: bytes) -> bytes:
+    padder = padding.PKCS7(algorithms.AES.block_size).padder()
+    return padder.update(file_data) + padder.finalize()
+
+
+def decrypt_client_file(encrypted_file_chunks, init_vector: str, key) -> bytes:
+    decryptor = Cipher(
+        algorithms.AES(get_client_key_bytes(key)),
+        modes.CBC(base64.b64decode(init_vector)),
+    ).decryptor()
+    unpadder = padding.PKCS7(algorithms.AES.block_size).unpadder()
+    padded_file_data = (
+        b"".join(decryptor.update(chunk) for chunk in encrypted_file_chunks)
+        + decryptor.finalize()
+    )
+    return unpadder.update(padded_file_data) + unpadder.finalize()
+
+
+@pytest.mark.parametrize(
+    "file_type, codec",
+    [
+        ("text/plain", "zlib"),
+        ("Text/Plain; charset=utf-8", "zlib"),
+        ("", "zlib"),
+        ("application/json", "zlib"),
+        ("image/png", "none"),
+        ("video/mp4", "none"),
+        ("application/zip", "none"),
+        ("application/pdf", "none"),
+        (
+            "application/vnd.openxmlformats-officedocument.wordprocessingml.document",
+            "none",
+        ),
+        ("image/svg+xml", "zlib"),
+        ("image/bmp", "zlib"),
+        ("audio/wav", "zlib"),
+    ],
+)
+def test_choose_codec_by_file_type(file_type, codec):
+    assert choose_codec(file_type, TEXT) == codec
+
+
+def test_choose_codec_skips_high_entropy_samples(monkeypatch):
+    assert choose_codec("text/plain", secrets.token_bytes(64 * 1024)) == "none"
+
+    monkeypatch.setattr(compression, "COMPRESSION_ENTROPY_THRESHOLD", 1.0)
+    assert choose_codec("text/plain", TEXT) == "none"
+
+
+def test_choose_codec_when_compression_is_off(monkeypatch):
+    monkeypatch.setattr(compression, "FILE_COMPRESSION", compression.CODEC_NONE)
+
+    assert choose_codec("text/plain", TEXT) == "none"
+
+
+@pytest.mark.parametrize(
+    "storage_format",
+    [file_handler.STORAGE_FORMAT_CBC, file_handler.STORAGE_FORMAT_CHUNKED],
+)
+@pytest.mark.parametrize(
+    "file_data, file_type, codec",
+    [
+        (TEXT, "text/plain", "zlib"),
+        (TEXT, "image/png", "none"),
+        (secrets.token_bytes(len(TEXT)), "text/plain", "none"),
+    ],
+    ids=["text", "image", "random"],
+)
+def test_round_trip(monkeypatch, storage_format, file_data, file_type, codec):
+    monkeypatch.setattr(file_handler, "STORAGE_FORMAT", storage_format)
+    monkeypatch.setattr(file_handler, "UPLOAD_CHUNK_SIZE", 1000)
+    key = np.random.randint(0, 2, 256).tolist()
+    data_key = file_handler.generate_data_key()
+    init_vector, encrypted_file_data = encrypt_for_server(file_data, key)
+
+    stored = file_handler.reencrypt_client_file_data(
+        io.BytesIO(encrypted_file_data), init_vector, key, data_key, file_type
+    )
+    stored_file_data = stored["encrypted_file_data"].read()
+
+    assert stored["codec"] == codec
+    assert stored["storage_format"] == storage_format
+    if codec == "zlib":
+        assert stored["encrypted_file_size"] < len(file_data) // 2
+    else:
+        assert stored["encrypted_file_size"] > len(file_data)
+
+    download_key = np.random.randint(0, 2, 256).tolist()
+    downloaded = file_handler.reencrypt_stored_file_data(
+        [
+            stored_file_data[offset : offset + 1000]
+            for offset in range(0, len(stored_file_data), 1000)
+        ],
+        stored["iv"],
+        data_key,
+        download_key,
+        stored["codec"],
+        stored["storage_format"],
+    )
+
+    assert decrypt_client_file(
+        downloaded["encryptedFileChunks"], downloaded["iv"], download_key
+    ) == pad(file_data)
@@ -0,0 +1,342 @@
+import io
+import json
+import base64
+import asyncio
+import secrets
+import numpy as np
+import pytest
+
+from datetime import datetime, timezone
+from fastapi import HTTPException, UploadFile
+from sqlalchemy import select
+
+from app.db.db_session import db_session_scope
+from app.models.db_models import Files, FileKeys, FileLogs
+from app.models.dto import FileDownloadDTO, FileUploadDTO
+from app.quantum_protocols.kyber import Kyber
+from app.services.file_services import (
+    claim_file,
+    parse_byte_range,
+    process_download_file,
+    process_upload_files,
+)
+from app.storage.blob_store import blob_store
+from app.utils.file_handler import get_file_hash_key, unwrap_data_key
+from benchmarks.fixtures import encrypt_for_server
+from tests.fixtures import (
+    OTHER_RECIPIENT,
+    RECIPIENT,
+    SENDER,
+    add_users,
+    get_downloads_left,
+    get_file_log,
+    share_file,
+    sign_file,
+)
+
+
+@pytest.fixture(scope="module")
+def kyber_key_pair() -> str:
+    public_key = Kyber().generate_key_pair()["public_key"]
+    return json.dumps(
+        {
+            "t": public_key["t"].tolist(),
+            "seed": base64.b64encode(public_key["seed"]).decode("utf-8"),
+        }
+    )
+
+
+async def download(
+    session_factory,
+    public_id: str,
+    kyber_key_pair: str,
+    range_header=None,
+    download_session=None,
+    user_email: str = RECIPIENT,
+) -> dict:
+    async with session_factory() as db:
+        return await process_download_file(
+            db,
+            FileDownloadDTO(
+                file_id=public_id, kyber_key_pair=kyber_key_pair, wrap_key=True
+            ),
+            user_email,
+            range_header,
+            download_session,
+        )
+
+
+def upload(
+    session_factory,
+    file_data: bytes,
+    recipient_email: str = RECIPIENT,
+    file_signature: dict = None,
+) -> tuple:
+    add_users()
+    shared_key = np.random.randint(0, 2, 256).tolist()
+    init_vector, encrypted_file_data = encrypt_for_server(file_data, shared_key)
+    file_name = f"{secrets.token_hex(8)}.bin"
+    file_signature = file_signature or sign_file(file_data)
+
+    async def upload_file() -> list:
+        async with session_factory() as db:
+            return await process_upload_files(
+                db,
+                [UploadFile(file=io.BytesIO(encrypted_file_data), filename=file_name)],
+                FileUploadDTO(
+                    init_vectors=[init_vector],
+                    file_names=[file_name],
+                    file_sizes=[len(file_data)],
+                    file_types=["application/octet-stream"],
+                    file_signatures=[file_signature["file_signature"]],
+                    dl_public_key=file_signature["dl_public_key"],
+                    kyber_key="{}",
+                    recipient_email=recipient_email,
+                    expiration=1,
+                    download_count=1,
+                    anonymous=False,
+                ),
+                None,
+                SENDER,
+                shared_key,
+            )
+
+    rejected_files = asyncio.run(upload_file())
+    with db_session_scope() as db:
+        file_log = db.query(FileLogs).filter(FileLogs.name == file_name).first()
+        return rejected_files, file_log
+
+
+def get_data_keys(file_id: str) -> dict:
+    with db_session_scope() as db:
+        return {
+            file_key.relationship_hash: unwrap_data_key(
+                file_key.wrapped_key, file_key.relationship_hash
+            )
+            for file_key in db.query(FileKeys).filter(FileKeys.file_id == file_id)
+        }
+
+
+def get_ref_count(file_id: str) -> int:
+    with db_session_scope() as db:
+        return db.query(Files.ref_count).filter(Files.file_id == file_id).scalar()
+
+
+@pytest.mark.parametrize(
+    "range_header, expected",
+    [
+        (None, None),
+        ("bytes=0-99", (0, 99)),
+        ("bytes=100-", (100, 999)),
+        ("bytes=900-5000", (900, 999)),
+        ("bytes=-10", (990, 999)),
+        ("bytes=-5000", (0, 999)),
+        ("items=0-1", None),
+        ("bytes=0-1,4-5", None),
+        ("bytes=a-b", None),
+    ],
+)
+def test_parse_byte_range(range_header, expected):
+    assert parse_byte_range(range_header, 1000) == expected
+
+
+@pytest.mark.parametrize(
+    "range_header", ["bytes=1000-", "bytes=1000-1001", "bytes=5-4"]
+)
+def test_parse_byte_range_unsatisfiable(range_header):
+    with pytest.raises(HTTPException) as error:
+        parse_byte_range(range_header, 1000)
+
+    assert error.value.status_code == 416
+    assert error.value.headers == {"Content-Range": "bytes */1000"}
+
+
+def test_every_range_without_a_session_is_billed(session_factory, kyber_key_pair):
+    public_id = share_file(download_count=3)
+
+    for range_header in ("bytes=1-", "bytes=1-", "bytes=-10"):
+        asyncio.run(download(session_factory, public_id, kyber_key_pair, range_header))
+
+    assert get_downloads_left(public_id) == 0
+    with pytest.raises(HTTPException):
+        asyncio.run(download(session_factory, public_id, kyber_key_pair, "bytes=1-"))
+
+
+def test_ranges_in_a_download_session_are_billed_once(session_factory, kyber_key_pair):
+    public_id = share_file(download_count=1)
+
+    first = asyncio.run(
+        download(session_factory, public_id, kyber_key_pair, "bytes=0-1023")
+    )
+    for range_header in ("bytes=1024-2047", "bytes=2048-", "bytes=1-"):
+        result = asyncio.run(
+            download(
+                session_factory,
+                public_id,
+                kyber_key_pair,
+                range_header,
+                first["download_session"],
+            )
+        )
+        assert result["download_session"] == first["download_session"]
+
+    assert get_downloads_left(public_id) == 0
+
+
+def test_download_session_is_bound_to_the_share(session_factory, kyber_key_pair):
+    public_id = share_file(download_count=2)
+    other_public_id = share_file(download_count=2)
+
+    first = asyncio.run(
+        download(session_factory, public_id, kyber_key_pair, "bytes=0-")
+    )
+    asyncio.run(
+        download(
+            session_factory,
+            other_public_id,
+            kyber_key_pair,
+            "bytes=1-",
+            first["download_session"],
+        )
+    )
+    asyncio.run(
+        download(
+            session_factory,
+            public_id,
+            kyber_key_pair,
+            "bytes=1-",
+            first["download_session"] + "x",
+        )
+    )
+
+    assert get_downloads_left(public_id) == 0
+    assert get_downloads_left(other_public_id) == 1
+
+
+def test_sender_downloads_are_not_billed(session_factory, kyber_key_pair):
+    public_id = share_file(download_count=1)
+
+    result = asyncio.run(
+        download(session_factory, public_id, kyber_key_pair, user_email=SENDER)
+    )
+
+    assert result["download_session"] is None
+    assert get_downloads_left(public_id) == 1
+
+
+def test_parallel_downloads_use_exactly_the_downloads_left(
+    session_factory, kyber_key_pair
+):
+    public_id = share_file(download_count=3)
+
+    async def download_in_parallel() -> list:
+        return await asyncio.gather(
+            *(download(session_factory, public_id, kyber_key_pair) for _ in range(8)),
+            return_exceptions=True,
+        )
+
+    results = asyncio.run(download_in_parallel())
+
+    assert sum(isinstance(result, dict) for result in results) == 3
+    assert all(
+        isinstance(result, dict) or result.detail == "Download limit reached."
+        for result in results
+    )
+    assert get_downloads_left(public_id) == 0
+
+
+def test_failed_download_is_refunded(session_factory):
+    public_id = share_file(download_count=1)
+
+    with pytest.raises(HTTPException):
+        asyncio.run(download(session_factory, public_id, "{}"))
+
+    assert get_downloads_left(public_id) == 1
+
+
+def test_reserve_and_refund_stamp_updated_at_in_utc(session_factory, kyber_key_pair):
+    public_id = share_file(download_count=2)
+
+    started_at = datetime.now(timezone.utc).replace(tzinfo=None)
+    asyncio.run(download(session_factory, public_id, kyber_key_pair))
+    reserved_at = get_file_log(public_id).updated_at
+    with pytest.raises(HTTPException):
+        asyncio.run(download(session_factory, public_id, "{}"))
+    refunded_at = get_file_log(public_id).updated_at
+    finished_at = datetime.now(timezone.utc).replace(tzinfo=None)
+
+    assert started_at <= reserved_at <= refunded_at <= finished_at
+
+
+def test_upload_stores_and_shares_the_file(session_factory):
+    rejected_files, file_log = upload(session_factory, secrets.token_bytes(3000))
+
+    assert rejected_files == []
+    assert (file_log.from_email, file_log.to_email) == (SENDER, RECIPIENT)
+    assert file_log.status == "active"
+    assert get_ref_count(file_log.file_id) == 1
+    assert list(get_data_keys(file_log.file_id)) == [
+        get_file_hash_key(RECIPIENT, SENDER)
+    ]
+    assert blob_store.exists(file_log.file_id)
+
+
+def test_upload_with_a_bad_signature_is_rejected(session_factory):
+    file_signature = sign_file(secrets.token_bytes(3000))
+
+    with pytest.raises(ValueError, match="Corrupted file"):
+        upload(
+            session_factory, secrets.token_bytes(3000), file_signature=file_signature
+        )
+
+
+def test_same_file_from_another_pair_reuses_the_blob(session_factory):
+    file_data = secrets.token_bytes(3000)
+
+    first_file_log = upload(session_factory, file_data)[1]
+    second_file_log = upload(session_factory, file_data, OTHER_RECIPIENT)[1]
+    third_file_log = upload(session_factory, file_data)[1]
+
+    file_id = first_file_log.file_id
+    assert second_file_log.file_id == third_file_log.file_id == file_id
+    with db_session_scope() as db:
+        assert db.query(Files).filter(Files.file_id == file_id).count() == 1
+    assert get_ref_count(file_id) == 3
+
+    data_keys = get_data_keys(file_id)
+    assert set(data_keys) == {
+        get_file_hash_key(RECIPIENT, SENDER),
+        get_file_hash_key(OTHER_RECIPIENT, SENDER),
+    }
+    assert len(set(data_keys.values())) == 1
+
+
+def test_claim_file_loses_a_race_without_breaking_the_session(session_factory):
+    file_id = get_file_log(share_file(download_count=1)).file_id
+    reencrypted_file = {
+        "iv": "",
+        "encrypted_file_size": 0,
+        "codec": "none",
+        "file_size": 0,
+        "storage_format": "chunked",
+    }
+
+    async def claim_after_a_racing_upload() -> tuple:
+        async with session_factory() as db:
+            scalar = db.scalar
+
+            async def miss_the_racing_upload(*args, **kwargs):
+                db.scalar = scalar
+                return None
+
+            db.scalar = miss_the_racing_upload
+            claimed = await claim_file(db, file_id, reencrypted_file)
+            ref_count = await db.scalar(
+                select(Files.ref_count).where(Files.file_id == file_id)
+            )
+            await db.commit()
+            return claimed, ref_count
+
+    assert asyncio.run(claim_after_a_racing_upload()) == (False, 1)
+    with db_session_scope() as db:
+        assert db.query(Files).filter(Files.file_id == file_id).count() == 1
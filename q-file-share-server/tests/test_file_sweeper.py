@@ -0,0 +1,88 @@
+import asyncio
+
+from datetime import datetime, timedelta, timezone
+from sqlalchemy import update
+
+from app.db.db_session import db_session_scope
+from app.models.db_models import DeletedBlobs, Files
+from app.services.file_services import claim_file, refund_download
+from app.services.file_sweeper import (
+    FILE_SWEEP_GRACE,
+    delete_blobs,
+    delete_unreferenced_files,
+    sweep_files,
+)
+from app.storage.blob_store import blob_store
+from tests.fixtures import get_file_log, share_file, update_file_log
+
+
+def test_exhausted_share_is_kept_for_the_grace_period(database):
+    public_id = share_file(download_count=1)
+    update_file_log(
+        public_id,
+        updated_download_count=0,
+        updated_at=datetime.now(timezone.utc)
+        - timedelta(seconds=FILE_SWEEP_GRACE - 60),
+    )
+
+    sweep_files()
+    assert get_file_log(public_id).status == "active"
+
+    update_file_log(
+        public_id,
+        updated_at=datetime.now(timezone.utc)
+        - timedelta(seconds=FILE_SWEEP_GRACE + 60),
+    )
+    sweep_files()
+
+    file_log = get_file_log(public_id)
+    assert file_log.status == "exhausted"
+    with db_session_scope() as db:
+        assert not db.query(Files).filter(Files.file_id == file_log.file_id).count()
+    assert not blob_store.exists(file_log.file_id)
+
+
+def test_refund_after_the_share_is_retired_is_a_no_op(session_factory):
+    public_id = share_file(download_count=1)
+    update_file_log(public_id, updated_download_count=0, status="exhausted")
+
+    async def refund() -> None:
+        async with session_factory() as db:
+            await refund_download(db, get_file_log(public_id).id)
+
+    asyncio.run(refund())
+
+    assert get_file_log(public_id).updated_download_count == 0
+
+
+def test_reupload_cancels_a_pending_blob_deletion(session_factory):
+    file_id = get_file_log(share_file(download_count=1)).file_id
+    with db_session_scope() as db:
+        db.execute(update(Files).where(Files.file_id == file_id).values(ref_count=0))
+        db.commit()
+        delete_unreferenced_files(db)
+
+        assert db.query(DeletedBlobs).filter(DeletedBlobs.file_id == file_id).count()
+        assert blob_store.exists(file_id)
+
+    async def upload_again() -> bool:
+        async with session_factory() as db:
+            claimed = await claim_file(
+                db,
+                file_id,
+                {
+                    "iv": "",
+                    "encrypted_file_size": 0,
+                    "codec": "none",
+                    "file_size": 0,
+                    "storage_format": None,
+                },
+            )
+            await db.commit()
+            return claimed
+
+    assert asyncio.run(upload_again())
+    with db_session_scope() as db:
+        delete_blobs(db)
+
+    assert blob_store.exists(file_id)
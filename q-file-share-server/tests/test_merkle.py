@@ -0,0 +1,60 @@
+import io
+import base64
+import secrets
+import pytest
+
+from cryptography.hazmat.primitives import padding
+from cryptography.hazmat.primitives.ciphers import Cipher, algorithms, modes
+
+from app.utils import file_handler
+from app.utils.merkle import MerkleHasher, compute_merkle_root, hash_leaf
+
+CHUNK_SIZE = 4096
+
+SIZES = [0, 1, CHUNK_SIZE, 3 * CHUNK_SIZE, 3 * CHUNK_SIZE + 5]
+
+
+def encrypt_client_file(file_data: bytes, byte_key: bytes, iv: bytes) -> bytes:
+    padder = padding.PKCS7(algorithms.AES.block_size).padder()
+    encryptor = Cipher(algorithms.AES(byte_key), modes.CBC(iv)).encryptor()
+    return (
+        encryptor.update(padder.update(file_data) + padder.finalize())
+        + encryptor.finalize()
+    )
+
+
+def test_empty_file_root_is_empty_leaf():
+    assert MerkleHasher(CHUNK_SIZE).finalize() == hash_leaf(b"")
+    assert compute_merkle_root(b"", CHUNK_SIZE) == hash_leaf(b"")
+
+
+@pytest.mark.parametrize("size", SIZES)
+@pytest.mark.parametrize("update_size", [1000, CHUNK_SIZE, 10 * CHUNK_SIZE])
+def test_hasher_matches_compute_merkle_root(size, update_size):
+    file_data = secrets.token_bytes(size)
+    merkle_hasher = MerkleHasher(CHUNK_SIZE)
+    for offset in range(0, size, update_size):
+        merkle_hasher.update(file_data[offset : offset + update_size])
+
+    assert merkle_hasher.finalize() == compute_merkle_root(file_data, CHUNK_SIZE)
+
+
+@pytest.mark.parametrize("size", SIZES)
+def test_upload_root_strips_padding(monkeypatch, size):
+    monkeypatch.setattr(file_handler, "UPLOAD_CHUNK_SIZE", 1000)
+    key = [secrets.randbelow(2) for _ in range(256)]
+    byte_key = bytes(
+        int("".join(map(str, key[i * 8 : (i + 1) * 8])), 2) for i in range(24)
+    )
+    iv = secrets.token_bytes(16)
+    file_data = secrets.token_bytes(size)
+
+    result = file_handler.reencrypt_client_file_data(
+        io.BytesIO(encrypt_client_file(file_data, byte_key, iv)),
+        base64.b64encode(iv).decode("utf-8"),
+        key,
+        secrets.token_bytes(32),
+        merkle_chunk_size=CHUNK_SIZE,
+    )
+
+    assert result["merkle_root"] == compute_merkle_root(file_data, CHUNK_SIZE)
@@ -0,0 +1,85 @@
+import numpy as np
+import pytest
+
+from app.quantum_protocols.helpers import (
+    multiply_matrix_poly_vector,
+    multiply_poly_vectors,
+    multiply_polynomial_with_poly_vector,
+)
+from app.quantum_protocols.ntt import inverse_ntt, ntt
+from app.quantum_protocols.parameters import N, Q, Q_K
+
+
+def schoolbook_multiply(polynomial1, polynomial2, q: int) -> np.ndarray:
+    product = np.convolve(polynomial1[::-1], polynomial2[::-1])
+    reduced = product[:N].copy()
+    reduced[: N - 1] -= product[N:]
+    return np.mod(reduced, q)[::-1]
+
+
+def random_polynomials(rng, q: int, *shape) -> np.ndarray:
+    return rng.integers(0, q, size=shape + (N,), dtype=np.int64)
+
+
+@pytest.mark.parametrize("q", [Q, Q_K])
+def test_inverse_ntt_round_trip(q):
+    rng = np.random.default_rng(q)
+    polynomials = random_polynomials(rng, q, 4)
+
+    assert np.array_equal(inverse_ntt(ntt(polynomials, q), q), polynomials)
+
+
+@pytest.mark.parametrize("q", [Q, Q_K])
+def test_polynomial_times_vector_matches_schoolbook(q):
+    rng = np.random.default_rng(q + 1)
+    polynomial = random_polynomials(rng, q)
+    poly_vector = random_polynomials(rng, q, 3)
+
+    expected = [schoolbook_multiply(polynomial, poly, q) for poly in poly_vector]
+
+    assert np.array_equal(
+        multiply_polynomial_with_poly_vector(polynomial, poly_vector, q), expected
+    )
+
+
+@pytest.mark.parametrize("q", [Q, Q_K])
+def test_vector_product_matches_schoolbook(q):
+    rng = np.random.default_rng(q + 2)
+    poly_vector1 = random_polynomials(rng, q, 3)
+    poly_vector2 = random_polynomials(rng, q, 3)
+
+    expected = np.mod(
+        sum(
+            schoolbook_multiply(poly1, poly2, q)
+            for poly1, poly2 in zip(poly_vector1, poly_vector2)
+        ),
+        q,
+    )
+
+    assert np.array_equal(
+        multiply_poly_vectors(poly_vector1, poly_vector2, q), expected
+    )
+
+
+@pytest.mark.parametrize("q", [Q, Q_K])
+@pytest.mark.parametrize("transpose", [False, True])
+def test_matrix_product_matches_schoolbook(q, transpose):
+    rng = np.random.default_rng(q + 3)
+    matrix = random_polynomials(rng, q, 3, 2)
+    poly_vector = random_polynomials(rng, q, 3 if transpose else 2)
+
+    rows = matrix.swapaxes(0, 1) if transpose else matrix
+    expected = [
+        np.mod(
+            sum(
+                schoolbook_multiply(entry, poly, q)
+                for entry, poly in zip(row, poly_vector)
+            ),
+            q,
+        )
+        for row in rows
+    ]
+
+    assert np.array_equal(
+        multiply_matrix_poly_vector(matrix, poly_vector, q, transpose), expected
+    )
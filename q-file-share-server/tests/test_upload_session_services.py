@@ -0,0 +1,281 @@
+import os
+import json
+import asyncio
+import secrets
+import pytest
+
+from datetime import datetime, timedelta, timezone
+from fastapi import HTTPException
+from sqlalchemy import update
+
+from app.db.db_session import db_session_scope
+from app.models.db_models import FileLogs, UploadChunks, UploadSessions
+from app.models.dto import UploadSessionDTO
+from app.quantum_protocols.kyber import Kyber
+from app.services import upload_session_services
+from app.services.upload_session_services import (
+    UPLOAD_SESSION_TTL,
+    collect_abandoned_upload_sessions,
+    create_upload_session,
+    finalize_upload_session,
+    get_staging_path,
+    get_upload_session_status,
+    write_upload_chunk,
+)
+from benchmarks.fixtures import encrypt_for_server
+from tests.fixtures import RECIPIENT, SENDER, add_users, sign_file
+
+CHUNK_SIZE = 1024
+
+FILE_SIZE = 3000
+
+
+@pytest.fixture(autouse=True)
+def small_chunks(monkeypatch):
+    monkeypatch.setattr(
+        upload_session_services, "UPLOAD_SESSION_CHUNK_SIZE", CHUNK_SIZE
+    )
+
+
+@pytest.fixture(scope="module")
+def kyber_key_pair() -> dict:
+    return Kyber().generate_key_pair()
+
+
+async def stream(chunk_data: bytes):
+    yield chunk_data[: len(chunk_data) // 2]
+    yield chunk_data[len(chunk_data) // 2 :]
+
+
+def create(session_factory, kyber_key_pair: dict) -> tuple:
+    add_users()
+    public_key = kyber_key_pair["public_key"]
+    ciphertext = Kyber().cpa_encrypt(public_key["t"], public_key["seed"])
+    file_data = secrets.token_bytes(FILE_SIZE)
+    init_vector, encrypted_file_data = encrypt_for_server(file_data, ciphertext["key"])
+    file_name = f"{secrets.token_hex(8)}.bin"
+    file_signature = sign_file(file_data)
+
+    async def create_session() -> dict:
+        async with session_factory() as db:
+            return await create_upload_session(
+                db,
+                UploadSessionDTO(
+                    init_vector=init_vector,
+                    file_name=file_name,
+                    file_size=FILE_SIZE,
+                    file_type="application/octet-stream",
+                    file_signature=file_signature["file_signature"],
+                    dl_public_key=file_signature["dl_public_key"],
+                    kyber_key=json.dumps(
+                        {
+                            "u": ciphertext["u"].tolist(),
+                            "v": ciphertext["v"].tolist(),
+                        }
+                    ),
+                    recipient_email=RECIPIENT,
+                    expiration=1,
+                    download_count=1,
+                    anonymous=False,
+                    total_size=len(encrypted_file_data),
+                ),
+                kyber_key_pair["secret_key"],
+                SENDER,
+            )
+
+    return asyncio.run(create_session()), encrypted_file_data, file_name
+
+
+def write(session_factory, upload_id: str, chunk_number: int, chunks) -> dict:
+    async def write_chunk() -> dict:
+        async with session_factory() as db:
+            return await write_upload_chunk(
+                db, upload_id, chunk_number, None, chunks, SENDER
+            )
+
+    return asyncio.run(write_chunk())
+
+
+def write_chunk(
+    session_factory, upload_id: str, encrypted_file_data: bytes, chunk_number: int
+) -> dict:
+    offset = chunk_number * CHUNK_SIZE
+    return write(
+        session_factory,
+        upload_id,
+        chunk_number,
+        stream(encrypted_file_data[offset : offset + CHUNK_SIZE]),
+    )
+
+
+def finalize(session_factory, upload_id: str) -> list:
+    async def finalize_session() -> list:
+        async with session_factory() as db:
+            return await finalize_upload_session(db, upload_id, SENDER)
+
+    return asyncio.run(finalize_session())
+
+
+def get_status(session_factory, upload_id: str) -> dict:
+    async def get_session_status() -> dict:
+        async with session_factory() as db:
+            return await get_upload_session_status(db, upload_id, SENDER)
+
+    return asyncio.run(get_session_status())
+
+
+def update_upload_session(upload_id: str, **values) -> None:
+    with db_session_scope() as db:
+        db.execute(
+            update(UploadSessions)
+            .where(UploadSessions.public_id == upload_id)
+            .values(**values)
+        )
+        db.commit()
+
+
+def test_create_upload_session(session_factory, kyber_key_pair):
+    details, encrypted_file_data, _ = create(session_factory, kyber_key_pair)
+
+    assert details["chunkSize"] == CHUNK_SIZE
+    assert details["totalSize"] == len(encrypted_file_data)
+    assert details["status"] == "open"
+    assert details["receivedRanges"] == []
+    assert os.path.getsize(get_staging_path(details["uploadId"])) == 0
+
+
+def test_out_of_order_chunks_merge_received_ranges(session_factory, kyber_key_pair):
+    details, encrypted_file_data, _ = create(session_factory, kyber_key_pair)
+    upload_id = details["uploadId"]
+    total_size = len(encrypted_file_data)
+
+    details = write_chunk(session_factory, upload_id, encrypted_file_data, 2)
+    assert details["receivedRanges"] == [[2 * CHUNK_SIZE, total_size]]
+
+    details = write_chunk(session_factory, upload_id, encrypted_file_data, 0)
+    assert details["receivedRanges"] == [
+        [0, CHUNK_SIZE],
+        [2 * CHUNK_SIZE, total_size],
+    ]
+
+    write_chunk(session_factory, upload_id, encrypted_file_data, 1)
+    details = write_chunk(session_factory, upload_id, encrypted_file_data, 1)
+    assert details["receivedRanges"] == [[0, total_size]]
+
+    with open(get_staging_path(upload_id), "rb") as staged_file:
+        assert staged_file.read() == encrypted_file_data
+
+
+def test_rejects_chunks_of_the_wrong_size(session_factory, kyber_key_pair):
+    details, encrypted_file_data, _ = create(session_factory, kyber_key_pair)
+
+    with pytest.raises(ValueError):
+        write(session_factory, details["uploadId"], 0, stream(b"x" * (CHUNK_SIZE + 1)))
+    with pytest.raises(ValueError):
+        write(session_factory, details["uploadId"], 0, stream(b"x" * 16))
+    with pytest.raises(ValueError):
+        write(session_factory, details["uploadId"], 3, stream(b"x" * 16))
+
+
+def test_incomplete_upload_is_not_finalized(session_factory, kyber_key_pair):
+    details, encrypted_file_data, _ = create(session_factory, kyber_key_pair)
+    upload_id = details["uploadId"]
+    write_chunk(session_factory, upload_id, encrypted_file_data, 0)
+
+    with pytest.raises(ValueError, match="Upload is incomplete"):
+        finalize(session_factory, upload_id)
+
+    assert get_status(session_factory, upload_id)["status"] == "open"
+    write_chunk(session_factory, upload_id, encrypted_file_data, 1)
+
+
+def test_failed_finalize_reopens_the_session(session_factory, kyber_key_pair):
+    details, encrypted_file_data, _ = create(session_factory, kyber_key_pair)
+    upload_id = details["uploadId"]
+    for chunk_number in range(3):
+        write_chunk(session_factory, upload_id, encrypted_file_data, chunk_number)
+    update_upload_session(upload_id, upload_details="{}")
+
+    with pytest.raises(ValueError):
+        finalize(session_factory, upload_id)
+
+    assert get_status(session_factory, upload_id)["status"] == "open"
+
+
+def test_finalize_shares_the_file(session_factory, kyber_key_pair):
+    details, encrypted_file_data, file_name = create(session_factory, kyber_key_pair)
+    upload_id = details["uploadId"]
+    for chunk_number in (1, 2, 0):
+        write_chunk(session_factory, upload_id, encrypted_file_data, chunk_number)
+
+    assert finalize(session_factory, upload_id) == []
+
+    with db_session_scope() as db:
+        file_log = db.query(FileLogs).filter(FileLogs.name == file_name).one()
+        assert (file_log.from_email, file_log.to_email) == (SENDER, RECIPIENT)
+        assert not (
+            db.query(UploadSessions)
+            .filter(UploadSessions.public_id == upload_id)
+            .count()
+        )
+    assert not os.path.exists(get_staging_path(upload_id))
+    with pytest.raises(HTTPException) as error:
+        finalize(session_factory, upload_id)
+    assert error.value.status_code == 404
+
+
+def test_finalizing_session_rejects_chunks_in_flight(session_factory, kyber_key_pair):
+    details, encrypted_file_data, _ = create(session_factory, kyber_key_pair)
+    upload_id = details["uploadId"]
+
+    async def finalize_while_streaming():
+        yield encrypted_file_data[: CHUNK_SIZE // 2]
+        update_upload_session(upload_id, status="finalizing")
+        yield encrypted_file_data[CHUNK_SIZE // 2 : CHUNK_SIZE]
+
+    with pytest.raises(HTTPException) as error:
+        write(session_factory, upload_id, 0, finalize_while_streaming())
+
+    assert error.value.status_code == 409
+    with db_session_scope() as db:
+        assert not (
+            db.query(UploadChunks)
+            .join(UploadSessions, UploadSessions.id == UploadChunks.session_id)
+            .filter(UploadSessions.public_id == upload_id)
+            .count()
+        )
+
+
+def test_collector_removes_expired_sessions_and_orphaned_files(
+    session_factory, kyber_key_pair
+):
+    expired_upload_id = create(session_factory, kyber_key_pair)[0]["uploadId"]
+    upload_id = create(session_factory, kyber_key_pair)[0]["uploadId"]
+    update_upload_session(
+        expired_upload_id,
+        updated_at=datetime.now(timezone.utc)
+        - timedelta(seconds=UPLOAD_SESSION_TTL + 60),
+    )
+    expired_at = (
+        datetime.now(timezone.utc) - timedelta(seconds=UPLOAD_SESSION_TTL + 60)
+    ).timestamp()
+    orphaned_path = get_staging_path(secrets.token_hex(8))
+    recent_orphaned_path = get_staging_path(secrets.token_hex(8))
+    open(orphaned_path, "wb").close()
+    open(recent_orphaned_path, "wb").close()
+    os.utime(orphaned_path, (expired_at, expired_at))
+    os.utime(get_staging_path(upload_id), (expired_at, expired_at))
+
+    assert collect_abandoned_upload_sessions() >= 1
+
+    with db_session_scope() as db:
+        assert not (
+            db.query(UploadSessions)
+            .filter(UploadSessions.public_id == expired_upload_id)
+            .count()
+        )
+    assert not os.path.exists(get_staging_path(expired_upload_id))
+    assert not os.path.exists(orphaned_path)
+    assert os.path.exists(recent_orphaned_path)
+    assert os.path.exists(get_staging_path(upload_id))
+    assert get_status(session_factory, upload_id)["status"] == "open"
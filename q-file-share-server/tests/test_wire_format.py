@@ -0,0 +1,65 @@
+import base64
+import struct
+import numpy as np
+import pytest
+
+from app.quantum_protocols.kyber import Kyber
+from app.utils.wire_format import (
+    KYBER_CIPHERTEXT,
+    MAGIC,
+    VERSION,
+    decode_container,
+    decode_kyber_ciphertext,
+    encode_container,
+    encode_kyber_ciphertext,
+)
+
+
+def test_kyber_ciphertext_round_trip_recovers_key():
+    kyber = Kyber()
+    for _ in range(50):
+        key_pair = kyber.generate_key_pair()
+        public_key = key_pair["public_key"]
+        ciphertext = kyber.cpa_encrypt(public_key["t"], public_key["seed"])
+
+        packed = base64.b64encode(
+            encode_kyber_ciphertext(ciphertext["u"], ciphertext["v"])
+        ).decode("utf-8")
+        decoded = decode_kyber_ciphertext(packed)
+
+        assert np.array_equal(
+            kyber.cpa_decrypt(key_pair["secret_key"], decoded), ciphertext["key"]
+        )
+
+
+def test_decode_container_round_trip():
+    fields = {1: b"seed", 2: b"", 3: bytes(range(256))}
+
+    assert decode_container(encode_container(KYBER_CIPHERTEXT, fields), 2) == fields
+
+
+@pytest.mark.parametrize(
+    "data",
+    [
+        MAGIC + bytes([VERSION, KYBER_CIPHERTEXT]) + b"\x01\x04\x00",
+        MAGIC + bytes([VERSION, KYBER_CIPHERTEXT]) + struct.pack("<BI", 1, 5) + b"1234",
+        MAGIC
+        + bytes([VERSION, KYBER_CIPHERTEXT])
+        + struct.pack("<BI", 1, 0xFFFFFFFF)
+        + b"1234",
+    ],
+    ids=["truncated-header", "truncated-value", "oversized-length"],
+)
+def test_decode_container_rejects_bad_field_lengths(data):
+    with pytest.raises(ValueError):
+        decode_container(data, KYBER_CIPHERTEXT)
+
+
+def test_decode_container_rejects_truncated_ciphertext():
+    kyber = Kyber()
+    public_key = kyber.generate_key_pair()["public_key"]
+    ciphertext = kyber.cpa_encrypt(public_key["t"], public_key["seed"])
+    packed = encode_kyber_ciphertext(ciphertext["u"], ciphertext["v"])
+
+    with pytest.raises(ValueError):
+        decode_container(packed[:-1], KYBER_CIPHERTEXT)